@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Sequence, Tuple
+import warnings
+
+from .common import Model, parse_texts, registry
+from .config import DEFAULT_MODEL
+from .lazy import lazy_module
+from .planner import Plan
+
+if TYPE_CHECKING:
+    import numpy as np
+else:
+    np = lazy_module('numpy')
+
+# Measurements with a single value, used as features by default
+SCALAR_FEATURES = ('average_word_length', 'type_token_ratio', 'yule_k', 'root_type_token_ratio',
+                   'log_type_token_ratio', 'honore_r', 'sichel_s', 'summer_s', 'get_entropy',
+                   'average_sentence_length_in_words', 'average_sentence_length_in_characters')
+# Distributions used as features by default, with the parameters that fix their bins
+DISTRIBUTION_FEATURES = {
+    'word_length_distribution': {'min_length': 1, 'max_length': 21},
+    'sentence_length_in_words_distribution': {'min_length': 1, 'max_length': 61},
+    'sentence_length_in_characters_distribution': {'min_length': 1, 'max_length': 401, 'interval': 20},
+}
+# Distributions whose bins are ranges of the given interval rather than single lengths
+RANGE_DISTRIBUTIONS = {'sentence_length_in_characters_distribution'}
+
+# Errors of measurements that are undefined for a text, such as an average over no sentences
+UNDEFINED = (ZeroDivisionError, ValueError, OverflowError)
+
+METRICS = ('delta', 'quadratic', 'cosine')
+BLOCK_ELEMENTS = 2 ** 22
+
+
+class FeatureMatrix(object):
+    """ Stylometric features of a corpus: values holds one row per text and one column per feature, and columns
+    the name of every feature.  A distribution contributes one column per bin, named after the measurement and the
+    bin, holding the share of the text in that bin.  A measurement that is undefined for a text, such as Honore's R
+    of a text whose words all occur once, is NaN. """
+
+    def __init__(self, values: np.ndarray, columns: List[str]):
+        self.values = values
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def column(self, name: str) -> np.ndarray:
+        return self.values[:, self.columns.index(name)]
+
+
+def distribution_bins(name: str, params: Dict[str, Any]) -> List[Tuple[Any, str]]:
+    """ The bins of a distribution with the given parameters, as (key, column name) pairs.  Keys are lengths, or
+    (first, last) ranges for RANGE_DISTRIBUTIONS. """
+    min_length, max_length = params['min_length'], params['max_length']
+    if name in RANGE_DISTRIBUTIONS:
+        interval = params['interval']
+        keys = [(k * interval + 1, (k + 1) * interval) for k in range(min_length // interval,
+                                                                     (max_length - 1) // interval + 1)]
+        return [(key, f'{name}[{key[0]}-{key[1]}]') for key in keys]
+    return [(length, f'{name}[{length}]') for length in range(min_length, max_length)]
+
+
+def feature_matrix(texts: Iterable[str], scalars: Sequence[str] = SCALAR_FEATURES,
+                   distributions: Dict[str, Dict[str, Any]] = None, model: Model = None, batch_size: int = 64,
+                   n_process: int = 1, rule_based_sentences: bool = False) -> FeatureMatrix:
+    """ Computes the features of every text, or of every document of a ColumnStore: the scalar measurements, and
+    the bins of the distributions, which map a distribution measurement to the parameters it is called with
+    (DISTRIBUTION_FEATURES by default).  Texts are parsed in batches, with a model trimmed for the features unless
+    one is given, and measured with a single Plan so intermediate statistics are shared. """
+    distributions = DISTRIBUTION_FEATURES if distributions is None else distributions
+    plan = Plan(list(scalars) + list(distributions), params=distributions)
+
+    columns = list(scalars)
+    bins = {}
+    for name, params in distributions.items():
+        bins[name] = {}
+        for key, column in distribution_bins(name, dict(registry[name]['params'], **params)):
+            bins[name][key] = len(columns)
+            columns.append(column)
+
+    values = []
+    config = plan.config(DEFAULT_MODEL, rule_based_sentences=rule_based_sentences)
+    for text in parse_texts(texts, model, config, batch_size, n_process):
+        results = plan.run(text, catch=UNDEFINED)
+        row = np.full(len(columns), np.nan)
+        for i, name in enumerate(scalars):
+            if not isinstance(results[name], Exception):
+                row[i] = results[name]
+        for name, index in bins.items():
+            # A distribution with nothing to count, such as the word lengths of an empty text, is missing too
+            if isinstance(results[name], Exception) or not results[name]:
+                continue
+            row[list(index.values())] = 0.0
+            for item in results[name]:
+                # Range distributions report (first, last, share) and the others (length, share)
+                key = item[0] if len(item) == 2 else item[:2]
+                row[index[key]] = item[-1]
+        values.append(row)
+    values = np.vstack(values) if values else np.empty((0, len(columns)))
+    values[np.isinf(values)] = np.nan
+    return FeatureMatrix(values, columns)
+
+
+class NearestAuthor(object):
+    """ Nearest-author classifier over feature vectors.
+
+    Features are standardized with the mean and standard deviation of the training texts (z-scores), and every
+    author is represented by the mean z-scores of their texts.  A query is scored against every author with
+    metric: 'delta' is Burrows' Delta, the mean absolute difference of the z-scores; 'quadratic' is Argamon's
+    quadratic Delta, their mean squared difference; 'cosine' is Cosine Delta, the cosine distance between the
+    z-score vectors.  The nearest author has the lowest score.  Missing (NaN) features count as average.
+
+    Scores are computed for blocks of queries and authors at once with NumPy, holding about block_elements
+    numbers at a time, so thousands of queries can be scored against thousands of authors. """
+
+    def __init__(self, metric: str = 'delta', block_elements: int = BLOCK_ELEMENTS):
+        if metric not in METRICS:
+            raise ValueError(f'Unknown metric: {metric}')
+        self.metric = metric
+        self.block_elements = block_elements
+        self.mean = self.std = self.profiles = self.authors = None
+
+    def fit(self, features, authors: Sequence) -> 'NearestAuthor':
+        """ Learns the standardization and the author profiles from the features of texts of known authorship. """
+        values = _values(features)
+        if len(values) == 0 or len(values) != len(authors):
+            raise ValueError('There must be one author per row of features, and at least one row')
+        with warnings.catch_warnings():
+            # Features missing from every text leave NaN statistics, which are replaced below
+            warnings.simplefilter('ignore', RuntimeWarning)
+            self.mean = np.nan_to_num(np.nanmean(values, axis=0))
+            std = np.nanstd(values, axis=0)
+        # Features that do not vary carry no information: an infinite deviation keeps their z-scores at 0
+        self.std = np.where(np.isfinite(std) & (std > 0), std, np.inf)
+
+        self.authors, inverse = np.unique(np.asarray(authors), return_inverse=True)
+        inverse = inverse.ravel()
+        z = self.standardize(values)
+        self.profiles = np.zeros((len(self.authors), z.shape[1]))
+        np.add.at(self.profiles, inverse, z)
+        self.profiles /= np.bincount(inverse, minlength=len(self.authors))[:, None]
+        return self
+
+    def standardize(self, features) -> np.ndarray:
+        """ z-scores of the features, with missing features at 0. """
+        self._require_fit()
+        return np.nan_to_num((_values(features) - self.mean) / self.std, nan=0.0, posinf=0.0, neginf=0.0)
+
+    def scores(self, features) -> np.ndarray:
+        """ Scores of every query (row of features) against every author, as a queries x authors matrix. """
+        self._require_fit()
+        queries = self.standardize(features)
+        profiles = self.profiles
+        scores = np.empty((len(queries), len(profiles)))
+        n_features = max(profiles.shape[1], 1)
+
+        if self.metric == 'delta':
+            # |q - p| cannot be a matrix product, so the differences are formed for blocks of queries and authors
+            authors_per_block = max(1, min(len(profiles), self.block_elements // n_features))
+            queries_per_block = max(1, self.block_elements // (authors_per_block * n_features))
+            for a in range(0, len(profiles), authors_per_block):
+                block = profiles[a:a + authors_per_block]
+                for q in range(0, len(queries), queries_per_block):
+                    differences = np.abs(queries[q:q + queries_per_block, None, :] - block[None, :, :])
+                    scores[q:q + queries_per_block, a:a + authors_per_block] = differences.mean(axis=2)
+            return scores
+
+        queries_per_block = max(1, self.block_elements // max(len(profiles), 1))
+        if self.metric == 'quadratic':
+            profile_norms = (profiles ** 2).sum(axis=1)
+            for q in range(0, len(queries), queries_per_block):
+                block = queries[q:q + queries_per_block]
+                squared = (block ** 2).sum(axis=1)[:, None] + profile_norms[None, :] - 2 * block @ profiles.T
+                scores[q:q + queries_per_block] = np.maximum(squared, 0) / n_features
+            return scores
+
+        profiles = _normalize(profiles)
+        for q in range(0, len(queries), queries_per_block):
+            scores[q:q + queries_per_block] = 1 - _normalize(queries[q:q + queries_per_block]) @ profiles.T
+        return scores
+
+    def rank(self, features, k: int = None) -> np.ndarray:
+        """ Indices into authors of the k nearest authors of every query, nearest first (all of them by default). """
+        scores = self.scores(features)
+        k = scores.shape[1] if k is None else min(k, scores.shape[1])
+        if k < scores.shape[1]:
+            nearest = np.argpartition(scores, k - 1, axis=1)[:, :k]
+        else:
+            nearest = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+        order = np.argsort(np.take_along_axis(scores, nearest, axis=1), axis=1, kind='stable')
+        return np.take_along_axis(nearest, order, axis=1)
+
+    def predict(self, features) -> np.ndarray:
+        """ The nearest author of every query. """
+        return self.authors[np.argmin(self.scores(features), axis=1)]
+
+    def _require_fit(self):
+        if self.mean is None:
+            raise ValueError('The classifier has not been fitted')
+
+
+def _values(features) -> np.ndarray:
+    values = features.values if isinstance(features, FeatureMatrix) else features
+    return np.atleast_2d(np.asarray(values, dtype=np.float64))
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict
+from unicodedata import combining
+
+from .lazy import lazy_module
+
+if TYPE_CHECKING:
+    import numpy as np
+else:
+    np = lazy_module('numpy')
+
+# Every character with a non-zero combining class lies in the first two planes
+LAST_COMBINING = 0x20000
+
+_combining_characters = None
+_strip_table = None
+_combining_flags = None
+
+
+def combining_characters() -> str:
+    """ Every combining character (diacritic), read from unicodedata the first time it is needed. """
+    global _combining_characters
+    if _combining_characters is None:
+        _combining_characters = ''.join(chr(c) for c in range(LAST_COMBINING) if combining(chr(c)))
+    return _combining_characters
+
+
+def strip_table() -> Dict[int, None]:
+    """ Table for str.translate that deletes combining characters. """
+    global _strip_table
+    if _strip_table is None:
+        _strip_table = dict.fromkeys(map(ord, combining_characters()))
+    return _strip_table
+
+
+def combining_flags() -> np.ndarray:
+    """ Boolean array that is True at the code point of every combining character, up to LAST_COMBINING. """
+    global _combining_flags
+    if _combining_flags is None:
+        flags = np.zeros(LAST_COMBINING, dtype=bool)
+        flags[list(map(ord, combining_characters()))] = True
+        _combining_flags = flags
+    return _combining_flags
+
+
+def strip_combining(string: str) -> str:
+    """ The string without its combining characters. """
+    if string.isascii():
+        return string
+    return string.translate(strip_table())
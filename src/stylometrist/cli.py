@@ -0,0 +1,374 @@
+""" The stylometrist command: computes measurements of every document of text files, directories, gzip files or
+JSON Lines records, and writes the results as JSON Lines or CSV as they are computed.
+
+Every document is identified by an id: the path of a text file, or the id field of a JSON Lines record (its path and
+line number if it has none).  With --resume, documents whose ids are already in the output are skipped and results
+are appended, so a run that was interrupted picks up where it stopped.  Measurements that are undefined for a
+document, such as richness measures of a text without words, are written as null, with the error under "errors". """
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+import argparse
+import csv
+import gzip
+import json
+import math
+import numbers
+import os
+import sys
+import time
+import warnings
+
+from .attribution import UNDEFINED
+from .common import Model, Text, get_model
+from .config import DEFAULT_MODEL, TOKENIZERS
+from .lazy import lazy_module
+from .planner import Plan, registry
+
+np = lazy_module('numpy')
+
+Document = Tuple[str, str]
+
+TEXT_SUFFIXES = ('.txt',)
+JSONL_SUFFIXES = ('.jsonl', '.ndjson')
+FORMATS = ('jsonl', 'csv')
+MAX_JSON_INT = 2 ** 63 - 1
+# Measurements whose results are vectors as wide as the hashed feature space, left out unless asked for
+VECTOR_MEASUREMENTS = frozenset({'character_ngrams', 'word_ngrams'})
+
+
+def is_jsonl(path: str) -> bool:
+    """ Whether a path names a JSON Lines file, compressed or not, by its suffix. """
+    name = path[:-3] if path.endswith('.gz') else path
+    return name.endswith(JSONL_SUFFIXES)
+
+
+def open_text(path: str, encoding: str = 'utf-8') -> TextIO:
+    """ Opens a text file for reading, decompressing it if its name ends in .gz. """
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding=encoding)
+    return open(path, encoding=encoding)
+
+
+def input_files(paths: Iterable[str]) -> Iterator[str]:
+    """ The files given, and the text and JSON Lines files (compressed or not) found in the directories given, in
+    sorted order. """
+    suffixes = tuple(s + gz for s in TEXT_SUFFIXES + JSONL_SUFFIXES for gz in ('', '.gz'))
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith(suffixes):
+                    yield os.path.join(root, name)
+
+
+def read_documents(paths: Iterable[str], encoding: str = 'utf-8', id_field: str = 'id',
+                   text_field: str = 'text') -> Iterator[Document]:
+    """ (id, text) of every document of the inputs, read one file at a time.  A text file is one document; every
+    line of a JSON Lines file is a record with the text under text_field and the id under id_field. """
+    for path in input_files(paths):
+        if not is_jsonl(path):
+            with open_text(path, encoding) as f:
+                yield path, f.read()
+            continue
+        with open_text(path, encoding) as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f'{path}:{number}: {e}') from None
+                if not isinstance(record.get(text_field), str):
+                    raise ValueError(f'{path}:{number}: the record has no text in the field {text_field!r}')
+                doc_id = record.get(id_field)
+                yield (f'{path}:{number}' if doc_id is None else str(doc_id)), record[text_field]
+
+
+def measure_documents(documents: Iterable[Document], plan: Plan, model: Model, batch_size: int = 64,
+                      n_process: int = 1) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """ (id, results) of every document, in input order.  Documents are parsed in batches with the model, using
+    n_process worker processes, and a measurement that is undefined for a document has the exception as its
+    result (see Plan.run). """
+    ids = deque()
+
+    def texts():
+        for doc_id, text in documents:
+            ids.append(doc_id)
+            yield text
+
+    for doc in model.pipe(texts(), batch_size=batch_size, n_process=n_process):
+        yield ids.popleft(), plan.run(Text(doc.text, model=model, doc=doc), catch=UNDEFINED)
+
+
+def split_errors(results: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """ The results with undefined measurements set to None, and the errors of those measurements.  Integers too
+    large for JSON readers are converted to floats (see json_value), and ones too large even for a float count as
+    undefined, as do NaN and infinite results. """
+    written, errors = {}, {}
+    for name, value in results.items():
+        if not isinstance(value, Exception):
+            try:
+                written[name] = json_value(value)
+                continue
+            except (OverflowError, ValueError) as e:
+                value = e
+        written[name] = None
+        errors[name] = f'{type(value).__name__}: {value}'
+    return written, errors
+
+
+def drop_unwritable(results: Dict[str, Any], errors: Dict[str, str]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """ The results with the ones that cannot be written as JSON set to None, and their errors added. """
+    errors = dict(errors)
+    for name, value in results.items():
+        try:
+            to_json(value)
+        except (TypeError, ValueError) as e:
+            errors[name] = f'{type(e).__name__}: {e}'
+    return {name: None if name in errors else value for name, value in results.items()}, errors
+
+
+def json_value(value: Any) -> Any:
+    """ A result as it is written: integers of more than MAX_JSON_INT are floats, since JSON readers hold numbers
+    in a double or a 64-bit integer (and Python will not even write one of thousands of digits).  Raises
+    OverflowError if the integer is too large for a float, and ValueError for NaN or infinity, which JSON has no
+    numbers for. """
+    if isinstance(value, int) and not isinstance(value, bool) and abs(value) > MAX_JSON_INT:
+        return float(value)
+    if isinstance(value, numbers.Real) and not isinstance(value, numbers.Integral) and not math.isfinite(value):
+        raise ValueError(f'{value} is not a finite number')
+    return value
+
+
+def _json_default(value):
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def to_json(value) -> str:
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, default=_json_default)
+
+
+class JsonLinesWriter(object):
+    """ Writes one JSON object per document: its id, every measurement by name and, if any measurement was
+    undefined, their errors.  Every line is flushed as it is written. """
+
+    def __init__(self, file: TextIO, measurements: List[str]):
+        self.file = file
+        self.measurements = measurements
+
+    def write(self, doc_id: str, results: Dict[str, Any]) -> None:
+        results, errors = split_errors(results)
+        try:
+            line = self.line(doc_id, results, errors)
+        except (TypeError, ValueError):
+            line = self.line(doc_id, *drop_unwritable(results, errors))
+        self.file.write(line + '\n')
+        self.file.flush()
+
+    @staticmethod
+    def line(doc_id: str, results: Dict[str, Any], errors: Dict[str, str]) -> str:
+        record = {'id': doc_id, **results}
+        if errors:
+            record['errors'] = errors
+        return to_json(record)
+
+    @staticmethod
+    def read_ids(file: TextIO) -> Set[str]:
+        return {json.loads(line)['id'] for line in file if line.strip()}
+
+
+class CsvWriter(object):
+    """ Writes one row per document, with columns id, every measurement and errors.  Values that are not numbers
+    or strings, such as distributions, are written as JSON.  Every row is flushed as it is written. """
+
+    def __init__(self, file: TextIO, measurements: List[str], header: bool = True):
+        self.file = file
+        self.measurements = measurements
+        self.writer = csv.writer(file)
+        if header:
+            self.writer.writerow(self.columns(measurements))
+            self.file.flush()
+
+    @staticmethod
+    def columns(measurements: List[str]) -> List[str]:
+        return ['id'] + measurements + ['errors']
+
+    def write(self, doc_id: str, results: Dict[str, Any]) -> None:
+        results, errors = split_errors(results)
+        try:
+            cells = [self.cell(results[name]) for name in self.measurements]
+        except (TypeError, ValueError):
+            results, errors = drop_unwritable(results, errors)
+            cells = [self.cell(results[name]) for name in self.measurements]
+        row = [doc_id] + cells
+        self.writer.writerow(row + [to_json(errors) if errors else ''])
+        self.file.flush()
+
+    @staticmethod
+    def cell(value) -> Any:
+        if value is None:
+            return ''
+        if isinstance(value, (str, int, float)):
+            return value
+        if isinstance(value, np.generic):
+            return value.item()
+        return to_json(value)
+
+    @staticmethod
+    def read_ids(file: TextIO) -> Set[str]:
+        rows = csv.reader(file)
+        next(rows, None)
+        return {row[0] for row in rows if row}
+
+
+WRITERS = {'jsonl': JsonLinesWriter, 'csv': CsvWriter}
+
+
+def output_format(path: Optional[str], fmt: Optional[str]) -> str:
+    """ The format given, or the one the output path's suffix names (JSON Lines by default). """
+    if fmt:
+        return fmt
+    return 'csv' if path and path.endswith('.csv') else 'jsonl'
+
+
+def resume(path: str, fmt: str, measurements: List[str]) -> Set[str]:
+    """ Ids of the documents already written to the output, which is first cut after its last complete line, in
+    case the run was interrupted in the middle of one. """
+    if not os.path.exists(path) or not os.path.getsize(path):
+        return set()
+    _cut_partial_line(path)
+    with open(path, encoding='utf-8', newline='') as f:
+        if fmt == 'csv':
+            header = next(csv.reader(f), None)
+            if header and header != CsvWriter.columns(measurements):
+                raise ValueError(f'{path} was written with different measurements: {", ".join(header[1:-1])}')
+            f.seek(0)
+        return WRITERS[fmt].read_ids(f)
+
+
+def _cut_partial_line(path: str, block_size: int = 2 ** 16) -> None:
+    # Reads back from the end a block at a time, since the output may be large
+    with open(path, 'rb+') as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(position - block_size, 0)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b'\n')
+            if newline >= 0:
+                position = start + newline + 1
+                break
+            position = start
+        if position < end:
+            f.truncate(position)
+
+
+def default_measurements() -> List[str]:
+    """ Every registered measurement but the hashed n-gram vectors, which are mostly zeros and would make up nearly
+    all of the output. """
+    return [name for name in registry.names() if name not in VECTOR_MEASUREMENTS]
+
+
+def list_measurements(file: TextIO) -> None:
+    for name, entry in registry.items():
+        params = ', '.join(f'{k}={v!r}' for k, v in entry['params'].items())
+        print(f'{name:45s} requires {",".join(sorted(entry["requires"])):20s} {params}', file=file)
+
+
+def parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog='stylometrist', description=__doc__.splitlines()[0],
+                                epilog='Text files in directories are found by the suffixes .txt, .jsonl and '
+                                       '.ndjson, optionally followed by .gz.')
+    p.add_argument('inputs', nargs='*', help='Text files, JSON Lines files and directories of them')
+    p.add_argument('-m', '--measurements',
+                   help='Comma-separated measurement names (all registered but the n-gram vectors by default)')
+    p.add_argument('--params', type=json.loads, default=None,
+                   help='Keyword arguments of measurements, as JSON such as \'{"yule_k": {...}}\'')
+    p.add_argument('-o', '--output', help='Output file (standard output by default)')
+    p.add_argument('-f', '--format', choices=FORMATS, help='Output format (by the output suffix, else jsonl)')
+    p.add_argument('--resume', action='store_true', help='Skip documents already in the output, and append')
+    p.add_argument('--model', default=DEFAULT_MODEL)
+    p.add_argument('--tokenizer', choices=TOKENIZERS, help='Tokenizer (see Config; the model\'s by default)')
+    p.add_argument('--rule-based-sentences', action='store_true')
+    p.add_argument('--doc-cache', help='Directory to cache parsed Docs in')
+    p.add_argument('--batch-size', type=int, default=64)
+    p.add_argument('--workers', type=int, default=1, help='Worker processes that parse')
+    p.add_argument('--encoding', default='utf-8')
+    p.add_argument('--id-field', default='id', help='Field of the document id in JSON Lines records')
+    p.add_argument('--text-field', default='text', help='Field of the text in JSON Lines records')
+    p.add_argument('--list', action='store_true', help='List the registered measurements and exit')
+    p.add_argument('-q', '--quiet', action='store_true', help='Do not report progress on standard error')
+    return p
+
+
+def run(args) -> Tuple[int, int]:
+    """ Runs the command for parsed arguments, and returns the number of documents written and skipped. """
+    measurements = args.measurements.split(',') if args.measurements else default_measurements()
+    plan = Plan(measurements, args.params)
+    names = list(plan.functions)
+    fmt = output_format(args.output, args.format)
+    done = resume(args.output, fmt, names) if args.resume else set()
+
+    kw = {'doc_cache': args.doc_cache}
+    if args.tokenizer:
+        kw['tokenizer'] = args.tokenizer
+    model = get_model(plan.config(args.model, rule_based_sentences=args.rule_based_sentences, **kw))
+
+    skipped = 0
+
+    def pending():
+        nonlocal skipped
+        for doc_id, text in read_documents(args.inputs, args.encoding, args.id_field, args.text_field):
+            if doc_id in done:
+                skipped += 1
+            else:
+                yield doc_id, text
+
+    append = args.resume and os.path.exists(args.output) and os.path.getsize(args.output) > 0
+    out = open(args.output, 'a' if append else 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+    writer = CsvWriter(out, names, header=not append) if fmt == 'csv' else JsonLinesWriter(out, names)
+
+    written = 0
+    start = time.perf_counter()
+    try:
+        with warnings.catch_warnings():
+            # Results such as the mean of no sentence lengths are NaN, and written as undefined rather than warned
+            # about for every document
+            warnings.simplefilter('ignore', RuntimeWarning)
+            for doc_id, results in measure_documents(pending(), plan, model, args.batch_size, args.workers):
+                writer.write(doc_id, results)
+                written += 1
+                if not args.quiet and written % 1000 == 0:
+                    rate = written / (time.perf_counter() - start)
+                    print(f'{written} documents, {rate:.1f} docs/s', file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if not args.quiet:
+        print(f'{written} documents written, {skipped} skipped in {time.perf_counter() - start:.1f} s',
+              file=sys.stderr)
+    return written, skipped
+
+
+def main(argv: List[str] = None) -> None:
+    p = parser()
+    args = p.parse_args(argv)
+    if args.list:
+        list_measurements(sys.stdout)
+        return
+    if not args.inputs:
+        p.error('no inputs given')
+    missing = [path for path in args.inputs if not os.path.exists(path)]
+    if missing:
+        p.error(f'no such file or directory: {", ".join(missing)}')
+    if args.resume and not args.output:
+        p.error('--resume needs an --output file')
+    try:
+        run(args)
+    except ValueError as e:
+        p.exit(2, f'stylometrist: error: {e}\n')
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, Optional, Tuple
+import json
+import os
+import uuid
+
+from .common import Model, Summary, Text, get_model
+from .lazy import lazy_module
+from .planner import Measurement, Plan
+
+if TYPE_CHECKING:
+    import numpy as np
+    from spacy.strings import StringStore
+    from spacy.tokens import Doc
+else:
+    np = lazy_module('numpy')
+spacy = lazy_module('spacy')
+
+FORMAT_VERSION = 1
+META = 'meta.json'
+STRINGS = 'strings.json'
+BLOCK_SIZE = 2 ** 22
+
+# Per-token columns, with their NumPy dtypes
+TOKEN_COLUMNS = {
+    'word_length': 'int32',
+    'is_word': 'bool',
+    'type_id': 'uint64',
+    'sentence': 'int32',
+}
+# Per-sentence columns
+SENTENCE_COLUMNS = {
+    'sentence_length': 'int32',
+    'sentence_length_with_combining': 'int32',
+}
+# Document offset index: the first token and the first sentence of every document, plus one past the last
+INDEX_COLUMNS = {
+    'token_offsets': 'int64',
+    'sentence_offsets': 'int64',
+}
+
+
+class ColumnStoreWriter(object):
+    """ Writes the per-token features of parsed Docs to a ColumnStore directory.  Columns are appended to raw files
+    as Docs are added, so memory use does not grow with the corpus, and turned into .npy files on close. """
+
+    def __init__(self, path, model_id: str = '', tokenizer_key: Tuple = ()):
+        self.path = os.fspath(path)
+        self.model_id = model_id
+        self.tokenizer_key = tokenizer_key
+        self.strings = spacy.strings.StringStore()
+        self.documents = 0
+        self._tokens = 0
+        self._sentences = 0
+        os.makedirs(self.path, exist_ok=True)
+        self._files = {name: open(self._part(name), 'wb') for name in {**TOKEN_COLUMNS, **SENTENCE_COLUMNS}}
+        self._index = {'token_offsets': [0], 'sentence_offsets': [0]}
+
+    def add(self, doc: Doc) -> None:
+        summary = Summary.from_doc(doc)
+        columns = {
+            'word_length': summary.token_lengths,
+            'is_word': summary.word_flags,
+            'type_id': doc.to_array(spacy.attrs.ORTH).astype(np.uint64, copy=False),
+        }
+        if summary.has_sentences:
+            sentence_count = summary.sentence_count
+            columns['sentence'] = np.repeat(np.arange(sentence_count, dtype=np.int32),
+                                            np.diff(summary.sentence_offsets))
+            columns['sentence_length'] = summary.sentence_lengths(exclude_combining=True)
+            columns['sentence_length_with_combining'] = summary.sentence_lengths(exclude_combining=False)
+        else:
+            sentence_count = 0
+            columns['sentence'] = np.full(len(doc), -1, dtype=np.int32)
+
+        for name, values in columns.items():
+            dtype = TOKEN_COLUMNS.get(name) or SENTENCE_COLUMNS[name]
+            np.asarray(values, dtype=dtype).tofile(self._files[name])
+        # Only words are ever looked up, so only their strings are kept
+        for word_id in summary.vocabulary.ids.tolist():
+            self.strings.add(doc.vocab.strings[word_id])
+
+        self._tokens += len(doc)
+        self._sentences += sentence_count
+        self._index['token_offsets'].append(self._tokens)
+        self._index['sentence_offsets'].append(self._sentences)
+        self.documents += 1
+
+    def add_all(self, docs: Iterable[Doc]) -> 'ColumnStoreWriter':
+        for doc in docs:
+            self.add(doc)
+        return self
+
+    def close(self) -> None:
+        if self._files is None:
+            return
+        for name, f in self._files.items():
+            f.close()
+            dtype = TOKEN_COLUMNS.get(name) or SENTENCE_COLUMNS[name]
+            self._finish(name, dtype)
+        self._files = None
+        for name, dtype in INDEX_COLUMNS.items():
+            np.save(self._column(name), np.asarray(self._index[name], dtype=dtype))
+        self.strings.to_disk(os.path.join(self.path, STRINGS))
+        # The id tells stores written to the same path apart, for caches of results derived from a store
+        meta = {'version': FORMAT_VERSION, 'id': uuid.uuid4().hex, 'documents': self.documents,
+                'model_id': self.model_id, 'tokenizer_key': list(self.tokenizer_key)}
+        with open(os.path.join(self.path, META), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+    def __enter__(self) -> 'ColumnStoreWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _finish(self, name: str, dtype) -> None:
+        """ Copies a raw column into a .npy file, a block at a time. """
+        part = self._part(name)
+        size = os.path.getsize(part) // np.dtype(dtype).itemsize
+        column = np.lib.format.open_memmap(self._column(name), mode='w+', dtype=dtype, shape=(size,))
+        if size:
+            raw = np.memmap(part, dtype=dtype, mode='r', shape=(size,))
+            for start in range(0, size, BLOCK_SIZE):
+                column[start:start + BLOCK_SIZE] = raw[start:start + BLOCK_SIZE]
+            del raw
+        column.flush()
+        del column
+        os.remove(part)
+
+    def _column(self, name: str) -> str:
+        return os.path.join(self.path, name + '.npy')
+
+    def _part(self, name: str) -> str:
+        return os.path.join(self.path, name + '.part')
+
+
+class ColumnStore(object):
+    """ Per-token features of a corpus, stored as one memory-mapped .npy file per column with a document offset
+    index: the length of every token, whether it is a word, its type id (StringStore hash) and the index of its
+    sentence within the document (-1 without sentence boundaries), plus the character lengths of every sentence.
+
+    Measurements run directly on the stored documents: store[i] is a Text whose Summary is made of slices of the
+    mapped columns, so nothing is re-tokenized and token columns are not copied.  Only the ids of the words are
+    gathered, when the vocabulary of a document is needed. """
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        with open(os.path.join(self.path, META), encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta['version'] != FORMAT_VERSION:
+            raise ValueError(f'Unsupported column store version: {meta["version"]}')
+        self.id = meta['id']
+        self.model_id = meta['model_id']
+        self.tokenizer_key = tuple(meta['tokenizer_key'])
+        self.columns = {name: np.load(os.path.join(self.path, name + '.npy'), mmap_mode='r')
+                        for name in {**TOKEN_COLUMNS, **SENTENCE_COLUMNS}}
+        self.token_offsets = np.load(os.path.join(self.path, 'token_offsets.npy'))
+        self.sentence_offsets = np.load(os.path.join(self.path, 'sentence_offsets.npy'))
+        self._strings = None
+
+    @property
+    def language(self) -> Optional[str]:
+        """ The language of the pipeline the documents were parsed with, as recorded in its model id. """
+        return self.model_id.split('_', 1)[0] or None
+
+    @classmethod
+    def ingest(cls, path, texts: Iterable[str], model: Model = None, batch_size: int = 64,
+               n_process: int = 1) -> 'ColumnStore':
+        """ Parses the texts with the model's pipe and writes their columns to a new store at path.  The model
+        needs sentence boundaries for the sentence_length measurements to run on the store. """
+        model = model if model else get_model()
+        with ColumnStoreWriter(path, model.model_id, model.config.tokenizer_key()) as writer:
+            writer.add_all(model.pipe((str(t) for t in texts), batch_size=batch_size, n_process=n_process))
+        return cls(path)
+
+    @property
+    def strings(self) -> StringStore:
+        """ Strings of the stored words, read the first time a word is looked up. """
+        if self._strings is None:
+            self._strings = spacy.strings.StringStore().from_disk(os.path.join(self.path, STRINGS))
+        return self._strings
+
+    def __len__(self) -> int:
+        return len(self.token_offsets) - 1
+
+    def __getitem__(self, index: int) -> 'StoredText':
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('Document index out of range')
+        return StoredText(self, index)
+
+    def __iter__(self) -> Iterator['StoredText']:
+        for index in range(len(self)):
+            yield StoredText(self, index)
+
+    def column(self, name: str, index: int) -> np.ndarray:
+        """ The slice of a column that belongs to a document, as a view of the mapped file. """
+        offsets = self.token_offsets if name in TOKEN_COLUMNS else self.sentence_offsets
+        return self.columns[name][offsets[index]:offsets[index + 1]]
+
+    def summary(self, index: int) -> Summary:
+        is_word = self.column('is_word', index)
+        word_ids = self.column('type_id', index)[is_word]
+        if self.sentence_offsets[index + 1] == self.sentence_offsets[index]:
+            return Summary(self.column('word_length', index), is_word, word_ids, self.strings)
+
+        sentence = self.column('sentence', index)
+        sentence_offsets = np.concatenate(([0], np.flatnonzero(np.diff(sentence)) + 1, [len(sentence)]))
+        return Summary(self.column('word_length', index), is_word, word_ids, self.strings, sentence_offsets,
+                       self.column('sentence_length', index), self.column('sentence_length_with_combining', index))
+
+    def analyze(self, measurements: Iterable[Measurement],
+                params: Dict[str, Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """ Yields the requested measurements for every stored document, in order, as Corpus.analyze. """
+        plan = Plan(measurements, params)
+        for text in self:
+            yield plan.run(text)
+
+
+class StoredText(Text):
+    """ A document of a ColumnStore.  Its Summary comes from the store, so there is no raw text and no Doc. """
+
+    def __init__(self, store: ColumnStore, index: int):
+        self.store = store
+        self.index = index
+        self._init(None, 'utf-8', None, False, None)
+
+    @property
+    def language(self) -> Optional[str]:
+        return self.store.language
+
+    def nlp(self):
+        raise ValueError('Stored documents have no Doc, only the columns of a ColumnStore')
+
+    def summary(self) -> Summary:
+        if self._summary is None:
+            self._summary = self.store.summary(self.index)
+        return self._summary
+
+    def cache_key(self) -> Tuple:
+        return 'columns', self.store.id, self.index
+
+    def clear(self) -> None:
+        self._summary = None
+        self._intermediates = {}
@@ -1,66 +1,732 @@
-from collections import Counter
+from __future__ import annotations
+
+from collections import Counter, OrderedDict, deque
 from functools import lru_cache
-from typing import List, Tuple
-from unicodedata import combining
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import hashlib
+import inspect
+import itertools
+import os
 import re
-
-import spacy
-
-from .config import Config
-
-registry = {}
+import threading
+import time
+
+from .characters import strip_combining
+from .config import Config, MODEL_TOKENIZER, REGEX_TOKENIZER
+from .doc_cache import DocCache
+from .instrumentation import state
+from .languages import LANGUAGE_MODELS, detect_language
+from .lazy import lazy_module
+from .tokenizers import RegexTokenizer
+
+if TYPE_CHECKING:
+    import numpy as np
+    from spacy.strings import StringStore
+    from spacy.tokens import Doc
+else:
+    np = lazy_module('numpy')
+spacy = lazy_module('spacy')
+
+
+class Registry(object):
+    """ Every measurement by name, registered when its module is imported.  Each entry is a dict holding the
+    function, what it requires from the pipeline ('requires'), the intermediate statistics it is computed from
+    ('uses') and its parameters with their defaults ('params').  Registration and lookups are safe across
+    threads. """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def register(self, f: Callable, requires: Iterable[str], uses: Iterable[str]) -> dict:
+        parameters = list(inspect.signature(f).parameters.values())[1:]
+        entry = {'function': f, 'requires': frozenset(requires), 'uses': frozenset(uses),
+                 'params': {p.name: p.default for p in parameters
+                            if p.kind in (p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY)}}
+        with self._lock:
+            self._entries[f.__name__] = entry
+        return entry
+
+    def __getitem__(self, name: str) -> dict:
+        with self._lock:
+            return self._entries[name]
+
+    def get(self, name: str, default=None):
+        with self._lock:
+            return self._entries.get(name, default)
+
+    def names(self) -> List[str]:
+        """ Names of the registered measurements, in order of registration. """
+        with self._lock:
+            return list(self._entries)
+
+    def items(self) -> List[Tuple[str, dict]]:
+        with self._lock:
+            return list(self._entries.items())
+
+    def __contains__(self, name: str) -> bool:
+        with self._lock:
+            return name in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+registry = Registry()
 
 NUMBER_PATTERN = re.compile(r'^[+-]{0,1}\d+\.{0,1}\d*$')
-SENTENCE_ENDING_PATTERN = re.compile('^[¿¡]{0,1}(.*?)[.!? \n]*$')
+SENTENCE_ENDING_PATTERN = re.compile('^[¿¡]{0,1}(.*?)[.!? \n]*$', re.DOTALL)
+SENTENCE_OPENINGS = '¿¡'
+SENTENCE_ENDINGS = '.!? \n'
+SENTENCE_COMPONENTS = {'parser', 'senter', 'sentencizer'}
+# Distinct token strings whose isword and word_length results are kept
+TOKEN_CACHE_SIZE = 2 ** 18
 
 
 class Model(object):
-    """ SpaCy Model """
+    """ SpaCy Model.  The pipeline (and spaCy itself) is only loaded when the first text is parsed, or by load.  If
+    the configuration names a doc_cache directory, parsed Docs are kept there and texts that were parsed before are
+    read back instead of being parsed again.  With a blank or regex tokenizer (see Config), the model is a blank
+    pipeline for the language that only tokenizes. """
 
     def __init__(self, config: Config = None):
         self.config = config if config else Config()
-
-        self._nlp = spacy.load(self.config.model)
+        self.doc_cache = None
+        if self.config.doc_cache:
+            self.doc_cache = DocCache(self.config.doc_cache, self.config.doc_cache_bytes)
+        self._pipeline = None
+        self._model_id = None
+        self._load_lock = threading.Lock()
+
+    def load(self) -> 'Model':
+        """ Loads the pipeline, which otherwise happens when the first text is parsed. """
+        if self._pipeline is not None:
+            return self
+        with self._load_lock:
+            if self._pipeline is not None:
+                return self
+            start = time.perf_counter()
+            if self.config.tokenizer == MODEL_TOKENIZER:
+                nlp = spacy.load(self.config.model, exclude=self.config.exclude)
+            else:
+                nlp = spacy.blank(self.config.lang)
+                if self.config.tokenizer == REGEX_TOKENIZER:
+                    nlp.tokenizer = RegexTokenizer(nlp.vocab)
+            if self.config.sentencizer and not SENTENCE_COMPONENTS.intersection(nlp.pipe_names):
+                nlp.add_pipe('sentencizer')
+
+            meta = nlp.meta
+            model_id = f"{meta.get('lang')}_{meta.get('name')}-{meta.get('version')}:{','.join(nlp.pipe_names)}"
+            if self.config.tokenizer != MODEL_TOKENIZER:
+                model_id += f'|{self.config.tokenizer}'
+            self._model_id = model_id
+            self._pipeline = nlp
+        if state.active is not None:
+            state.active.model_loaded(model_id, time.perf_counter() - start)
+        return self
+
+    @property
+    def loaded(self) -> bool:
+        return self._pipeline is not None
+
+    @property
+    def _nlp(self):
+        return self._pipeline if self._pipeline is not None else self.load()._pipeline
+
+    @property
+    def model_id(self) -> str:
+        """ Identifies the loaded pipeline and tokenizer, for cached Docs.  Loads the pipeline. """
+        return self._model_id if self._model_id is not None else self.load()._model_id
 
     def nlp(self, text: str):
-        return self._nlp(text)
+        if state.active is None:
+            return self._parse(text)
+        start = time.perf_counter()
+        doc = self._parse(text)
+        state.active.parsed(time.perf_counter() - start, len(doc))
+        return doc
+
+    def _parse(self, text: str):
+        if self.doc_cache is None:
+            return self._nlp(text)
+        key = self.doc_cache.key(text, self.model_id)
+        doc = self.doc_cache.get(key, self._nlp.vocab)
+        if doc is None:
+            doc = self._nlp(text)
+            self.doc_cache.put(key, doc)
+        return doc
+
+    def pipe(self, texts: Iterable[str], batch_size: int = 64, n_process: int = 1) -> Iterator[Doc]:
+        """ Parses a stream of texts in batches, optionally across several processes.  Docs are yielded in the
+        order of the input texts. """
+        if self.doc_cache is None:
+            docs = self._nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
+        else:
+            docs = self._cached_pipe(texts, batch_size, n_process)
+        return docs if state.active is None else state.active.pipe(docs)
+
+    def _cached_pipe(self, texts: Iterable[str], batch_size: int, n_process: int) -> Iterator[Doc]:
+        # Only texts missing from the cache go through the pipeline.  Texts read so far are queued in input order,
+        # marked as cached or not, and cached Docs are only loaded when their turn comes.
+        queue = deque()
+
+        def missing():
+            for text in texts:
+                key = self.doc_cache.key(text, self.model_id)
+                cached = self.doc_cache.has(key)
+                queue.append((text, key, cached))
+                if not cached:
+                    yield text
+
+        # Parsed Docs are cached a batch at a time, as one DocBin
+        parsed = []
+        try:
+            for doc in self._nlp.pipe(missing(), batch_size=batch_size, n_process=n_process):
+                text, key, cached = queue.popleft()
+                while cached:
+                    yield self._read_cached(text, key)
+                    text, key, cached = queue.popleft()
+                parsed.append((key, doc))
+                if len(parsed) >= batch_size:
+                    self.doc_cache.put_many(*zip(*parsed))
+                    parsed.clear()
+                yield doc
+        finally:
+            if parsed:
+                self.doc_cache.put_many(*zip(*parsed))
+        for text, key, _ in queue:
+            yield self._read_cached(text, key)
+
+    def _read_cached(self, text: str, key: str) -> Doc:
+        doc = self.doc_cache.get(key, self._nlp.vocab)
+        if doc is None:
+            # The entry was evicted after it was looked up
+            doc = self._nlp(text)
+            self.doc_cache.put(key, doc)
+        return doc
+
+
+class ModelPool(object):
+    """ Process-wide pool of loaded models, keyed by Config.  Each pipeline is loaded once and then shared by
+    every Text and every thread that asks for the same configuration. """
+
+    def __init__(self):
+        self._models = {}
+        self._loading = {}
+        self._lock = threading.Lock()
+
+    def get(self, config: Config = None) -> Model:
+        """ Returns the pooled model for the configuration, loading it on first use. """
+        config = config if config else Config()
+        model = self._models.get(config)
+        if model is not None:
+            return model
+
+        # Only threads asking for the same configuration wait on each other
+        with self._lock:
+            loading = self._loading.setdefault(config, threading.Lock())
+        with loading:
+            model = self._models.get(config)
+            if model is None:
+                model = Model(config)
+                with self._lock:
+                    self._models[config] = model
+                    self._loading.pop(config, None)
+        return model
+
+    def warm_up(self, *configs: Config) -> None:
+        """ Loads the models for the given configurations (or the default configuration) ahead of time. """
+        for config in configs or (Config(),):
+            self.get(config).load()
+
+    def evict(self, config: Config = None) -> int:
+        """ Drops the model for the configuration from the pool, or every model if no configuration is given.
+        Returns the number of models evicted.  Texts already holding an evicted model keep working. """
+        with self._lock:
+            if config is None:
+                count = len(self._models)
+                self._models.clear()
+                return count
+            return 1 if self._models.pop(config, None) is not None else 0
+
+    def models(self) -> List[Model]:
+        """ The models in the pool. """
+        with self._lock:
+            return list(self._models.values())
+
+    def __contains__(self, config: Config) -> bool:
+        return config in self._models
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+
+model_pool = ModelPool()
+
+
+def get_model(config: Config = None) -> Model:
+    """ Returns the shared model for the configuration from the process-wide pool. """
+    return model_pool.get(config)
+
+
+# Nominal size of a pipeline that is not loaded from disk, such as a blank one, for memory budgets
+BLANK_PIPELINE_BYTES = 2 ** 20
+
+
+def pipeline_bytes(model: Model) -> int:
+    """ Estimated memory of a model's loaded pipeline: the size on disk of its vocabulary, tokenizer and the
+    components that were loaded, which grows with the memory they take once loaded. """
+    path = model._nlp.path
+    if path is None:
+        return BLANK_PIPELINE_BYTES
+    loaded = set(model._nlp.pipe_names) | {'vocab', 'tokenizer'}
+    size = 0
+    for entry in os.scandir(path):
+        if entry.is_file():
+            size += entry.stat().st_size
+        elif entry.name in loaded:
+            size += sum(os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(entry.path)
+                        for name in files)
+    return max(size, BLANK_PIPELINE_BYTES)
+
+
+def _blank_available(lang: str) -> bool:
+    # Some languages, such as Japanese, Korean and Thai, need a package of their own to build a tokenizer
+    try:
+        spacy.util.get_lang_class(lang)()
+    except ImportError:
+        return False
+    return True
+
+
+class ModelRouter(object):
+    """ Routes texts to the model of their language, for corpora in several languages.  Every text is tagged with
+    its language, given or detected (see languages.detect_language), and parsed with the pipeline of that language:
+    the one in models (LANGUAGE_MODELS by default), configured like config otherwise.  A language without an
+    installed pipeline goes to default_language, the language of config unless given.  With a blank or regex
+    tokenizer, which need no trained pipeline, so does a language that spaCy cannot build a blank pipeline for, such
+    as Japanese or Thai without their tokenizer packages.
+
+    Pipelines are loaded the first time a text in their language comes along.  Once more than max_models are
+    loaded, or their estimated memory (see pipeline_bytes) exceeds memory_budget bytes, the least recently used
+    pipelines are dropped; Texts that hold a dropped model keep working, and it is loaded again if needed. """
+
+    def __init__(self, config: Config = None, models: Dict[str, str] = None, default_language: str = None,
+                 detect: Callable[[str], Optional[str]] = detect_language, memory_budget: int = None,
+                 max_models: int = None):
+        self.config = config if config else Config()
+        self.models = dict(LANGUAGE_MODELS if models is None else models)
+        self.models[self.config.lang] = self.config.model
+        self.default_language = default_language if default_language else self.config.lang
+        if self.default_language not in self.models:
+            raise ValueError(f'No model for the default language: {self.default_language}')
+        self.detect = detect
+        self.memory_budget = memory_budget
+        self.max_models = max_models
+        self.evictions = 0
+        self._loaded: OrderedDict = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._available: Dict[str, bool] = {}
+        self._lock = threading.RLock()
+
+    def route(self, lang: Optional[str]) -> str:
+        """ The language whose pipeline parses texts tagged lang: lang itself if its pipeline is available, else
+        the default language. """
+        if lang and (lang in self.models or self.config.tokenizer != MODEL_TOKENIZER) and self.available(lang):
+            return lang
+        return self.default_language
+
+    def available(self, lang: str) -> bool:
+        """ Whether the pipeline of a language is installed, as a package or a directory, or with a blank or regex
+        tokenizer, whether spaCy can build a blank pipeline for it.  The default language is taken to be, so that a
+        missing default pipeline fails to load rather than going unnoticed. """
+        with self._lock:
+            found = self._available.get(lang)
+            if found is None:
+                if lang == self.default_language:
+                    found = True
+                elif self.config.tokenizer != MODEL_TOKENIZER:
+                    found = _blank_available(lang)
+                else:
+                    model = self.models[lang]
+                    found = os.path.isdir(model) or spacy.util.is_package(model)
+                self._available[lang] = found
+            return found
+
+    def language(self, text: str) -> str:
+        """ The routed language of a text, as detected. """
+        return self.route(self.detect(text) if self.detect else None)
+
+    def config_for(self, lang: str) -> Config:
+        lang = self.route(lang)
+        return self.config.for_model(self.models.get(lang, self.config.model), lang)
+
+    def model(self, lang: Optional[str]) -> Model:
+        """ The model of a language, loaded if it is not, dropping the least recently used ones beyond the
+        limits.  Loads happen one at a time. """
+        lang = self.route(lang)
+        with self._lock:
+            model = self._loaded.get(lang)
+            if model is not None:
+                self._loaded.move_to_end(lang)
+                return model
+            try:
+                model = Model(self.config_for(lang)).load()
+            except (OSError, ImportError):
+                # Installed, but not loadable as a pipeline, or missing a package its tokenizer needs
+                if lang == self.default_language:
+                    raise
+                self._available[lang] = False
+                return self.model(self.default_language)
+            self._loaded[lang] = model
+            self._sizes[lang] = pipeline_bytes(model)
+            self._evict()
+            return model
+
+    def _evict(self) -> None:
+        while len(self._loaded) > 1 and (self.max_models and len(self._loaded) > self.max_models or
+                                         self.memory_budget and self.nbytes > self.memory_budget):
+            lang, _ = self._loaded.popitem(last=False)
+            del self._sizes[lang]
+            self.evictions += 1
+
+    @property
+    def nbytes(self) -> int:
+        """ Estimated memory of the loaded pipelines. """
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def loaded(self) -> List[str]:
+        """ The languages whose pipelines are loaded, least recently used first. """
+        with self._lock:
+            return list(self._loaded)
+
+    def text(self, text: str, lang: str = None) -> Text:
+        """ A Text parsed with the model of its language, detected unless given. """
+        return Text(text, model=self.model(lang if lang else self.language(text)))
+
+    def parse(self, texts: Iterable[Union[str, Tuple[str, Optional[str]]]], batch_size: int = 64,
+              n_process: int = 1, group_size: int = 1024) -> Iterator[Text]:
+        """ Texts of strings, or of (string, language tag) pairs, in input order.  The strings are read group_size
+        at a time and grouped by language, and every group is parsed in batches by its own model, the ones already
+        loaded first. """
+        texts = iter(texts)
+        while True:
+            chunk = list(itertools.islice(texts, group_size))
+            if not chunk:
+                return
+            groups = OrderedDict()
+            for i, item in enumerate(chunk):
+                text, lang = (item, None) if isinstance(item, str) else item
+                lang = self.route(lang) if lang else self.language(text)
+                groups.setdefault(lang, []).append((i, text))
+            loaded = self.loaded()
+            parsed = [None] * len(chunk)
+            for lang in sorted(groups, key=lambda lang: lang not in loaded):
+                model = self.model(lang)
+                members = groups[lang]
+                docs = model.pipe((text for _, text in members), batch_size=batch_size, n_process=n_process)
+                for (i, _), doc in zip(members, docs):
+                    parsed[i] = Text(doc.text, model=model, doc=doc)
+            yield from parsed
+
+    def __repr__(self):
+        return f'ModelRouter(loaded={self.loaded()!r}, default_language={self.default_language!r})'
 
 
 class Text(object):
-    """ Arbitrary text class. """
-
-    def __init__(self, text: str, encoding: str = 'utf-8', model: Model = None):
-        self.text = text
+    """ Arbitrary text class.  The text is parsed on first use and the Doc is kept, so every measurement run on
+    the same Text shares a single parse.  Changing the text or the model discards the Doc.  Set cache_doc to False
+    to parse on every call instead of holding the Doc in memory.  A Doc already produced by the model, for example
+    by Model.pipe, can be passed in to skip parsing. """
+
+    def __init__(self, text: str, encoding: str = 'utf-8', model: Model = None, cache_doc: bool = True,
+                 doc: Doc = None):
+        self._init(text, encoding, model if model else get_model(), cache_doc, doc)
+
+    def _init(self, text: Optional[str], encoding: str, model: Optional[Model], cache_doc: bool,
+              doc: Optional[Doc]) -> None:
+        """ Sets up the state of a Text.  Subclasses without a model, such as stored texts, call this rather than
+        __init__, so that they get every field a Text has. """
+        self._text = text
         self.encoding = encoding
+        self.cache_doc = cache_doc
 
-        self.model = model if model else Model()
+        self._model = model
+        self._doc = doc
+        self._summary = None
+        self._content_hash = None
+        self._intermediates = {}
 
-        self._nlp = self.model.nlp
+    @property
+    def text(self) -> str:
+        return self._text
 
-    def nlp(self):
-        return self._nlp(self.text)
+    @text.setter
+    def text(self, text: str):
+        self._text = text
+        self.clear()
+
+    @property
+    def model(self) -> Model:
+        return self._model
 
+    @model.setter
+    def model(self, model: Model):
+        self._model = model
+        self.clear()
 
+    @property
+    def language(self) -> Optional[str]:
+        """ The language tag of the text: the language of its model, or None without one. """
+        return self._model.config.lang if self._model is not None else None
+
+    def nlp(self):
+        if self._doc is not None:
+            return self._doc
+        doc = self._model.nlp(self._text)
+        if self.cache_doc:
+            self._doc = doc
+        return doc
+
+    def summary(self) -> 'Summary':
+        """ Token and sentence statistics of the parsed text, collected in one pass.  The summary is kept even
+        when the Doc is not, since it is much smaller. """
+        if self._summary is None:
+            self._summary = Summary.from_doc(self.nlp())
+        return self._summary
+
+    def content_hash(self) -> str:
+        """ Digest of the text, used to look up cached results for the same content. """
+        if self._content_hash is None:
+            self._content_hash = hashlib.blake2b(self._text.encode('utf-8', 'surrogatepass'),
+                                                 digest_size=16).hexdigest()
+        return self._content_hash
+
+    def cache_key(self) -> Tuple:
+        """ Identifies the content and the tokenization of the text, for caches of results derived from it. """
+        return (self.content_hash(),) + self._model.config.tokenizer_key()
+
+    def intermediate(self, name: str, compute: Callable[['Text'], Any]) -> Any:
+        """ The named intermediate statistic of the text (see config), computed with compute(text) the first time
+        it is needed and shared by every measurement afterwards. """
+        try:
+            return self._intermediates[name]
+        except KeyError:
+            if state.active is None:
+                value = self._intermediates[name] = compute(self)
+            else:
+                value = self._intermediates[name] = state.active.call('intermediate', name, lambda: compute(self), self)
+            return value
+
+    def clear(self) -> None:
+        """ Discards the parsed Doc and anything derived from it. """
+        self._doc = None
+        self._summary = None
+        self._content_hash = None
+        self._intermediates = {}
+
+
+def parse_texts(texts: Iterable[Union[str, Text]], model: Union[Model, ModelRouter] = None, config: Config = None,
+                batch_size: int = 64, n_process: int = 1) -> Iterator[Text]:
+    """ Texts of an iterable of strings, parsed in batches with the model, or a pooled model for config if none is
+    given.  An iterable of Text objects, such as a ColumnStore, is passed through as it is, without loading a
+    model.  With a ModelRouter, every text is parsed by the model of its language (see ModelRouter.parse). """
+    texts = iter(texts)
+    for first in texts:
+        if isinstance(first, Text):
+            yield first
+            yield from texts
+            return
+        if isinstance(model, ModelRouter):
+            yield from model.parse(itertools.chain([first], texts), batch_size, n_process)
+            return
+        model = model if model else get_model(config)
+        for doc in model.pipe((str(t) for t in itertools.chain([first], texts)), batch_size=batch_size,
+                              n_process=n_process):
+            yield Text(doc.text, model=model, doc=doc)
+        return
+
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
 def isword(word: str) -> bool:
     """ Simple test for words.  A word consists of only graphemes and numbers, except leading positive or negative
-      signs.  May need to be refined for languages other than English """
+      signs.  May need to be refined for languages other than English.  Results are memoized per string. """
     if word.isalnum():
         return True
     if NUMBER_PATTERN.match(word):
         return True
-    if all(w.isalnum() or combining(w) > 0 for w in word):
-        return True
-    return False
+    # Graphemes, numbers and combining characters only
+    stripped = strip_combining(word)
+    return not stripped or stripped.isalnum()
 
 
 def get_word_count(text: Text) -> int:
     """ Total count of words. """
-    return len([t for t in text.nlp() if isword(t.text)])
+    return get_vocabulary(text).word_count
+
+
+class Vocabulary(object):
+    """ Word frequencies with the words interned as integer ids: spaCy's StringStore hashes (Token.orth) when the
+    words come from a Doc, so a large text holds one integer and one count per distinct word in two NumPy arrays
+    instead of a Counter of str.  Words are in order of first occurrence and are only looked up in the StringStore
+    when asked for. """
+
+    def __init__(self, ids, counts, strings: StringStore = None):
+        self.ids = np.asarray(ids, dtype=np.uint64)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.strings = strings
+
+    @classmethod
+    def from_ids(cls, ids, strings: StringStore = None) -> 'Vocabulary':
+        """ Vocabulary of a sequence of word ids, one per word token. """
+        ids = np.asarray(ids, dtype=np.uint64)
+        unique, first, counts = np.unique(ids, return_index=True, return_counts=True)
+        order = np.argsort(first, kind='stable')
+        return cls(unique[order], counts[order], strings)
+
+    @classmethod
+    def from_counter(cls, vocab: Counter, strings: StringStore = None) -> 'Vocabulary':
+        """ Interns the words of a Counter, adding them to the StringStore. """
+        strings = strings if strings is not None else spacy.strings.StringStore()
+        return cls([strings.add(word) for word in vocab], list(vocab.values()), strings)
+
+    @classmethod
+    def merge_all(cls, vocabularies: Iterable['Vocabulary']) -> 'Vocabulary':
+        """ Vocabulary of the texts of several vocabularies together, with the words in order of first occurrence
+        as if the texts had been read one after the other.  Vocabularies that share a StringStore keep it; otherwise
+        the words of all of them are interned in a new one. """
+        vocabularies = list(vocabularies)
+        stores = []
+        for vocabulary in vocabularies:
+            if vocabulary.strings is not None and not any(s is vocabulary.strings for s in stores):
+                stores.append(vocabulary.strings)
+        if len(stores) > 1:
+            strings = spacy.strings.StringStore()
+            for vocabulary in vocabularies:
+                for i in vocabulary.ids.tolist():
+                    strings.add(vocabulary.strings[i])
+        else:
+            strings = stores[0] if stores else None
+        if not vocabularies:
+            return cls([], [], strings)
+        ids = np.concatenate([v.ids for v in vocabularies])
+        unique, first, inverse = np.unique(ids, return_index=True, return_inverse=True)
+        totals = np.zeros(len(unique), dtype=np.int64)
+        np.add.at(totals, inverse.ravel(), np.concatenate([v.counts for v in vocabularies]))
+        order = np.argsort(first, kind='stable')
+        return cls(unique[order], totals[order], strings)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, word: str) -> int:
+        found = np.flatnonzero(self.ids == np.uint64(spacy.strings.hash_string(word)))
+        return int(self.counts[found[0]]) if len(found) else 0
+
+    @property
+    def word_count(self) -> int:
+        return int(self.counts.sum())
+
+    @property
+    def nbytes(self) -> int:
+        return self.ids.nbytes + self.counts.nbytes
+
+    def spectrum(self) -> np.ndarray:
+        """ Frequencies of frequencies: element i is the number of words that occur exactly i times. """
+        return np.bincount(self.counts, minlength=2)
+
+    def to_counter(self) -> Counter:
+        """ The word frequencies keyed by the words themselves. """
+        return Counter({self.strings[int(i)]: int(c) for i, c in zip(self.ids, self.counts)})
+
+
+class VocabularyCache(object):
+    """ Least recently used cache of vocabularies, keyed by a digest of the text together with the tokenizer
+    configuration, so equal texts share an entry whether or not they are the same Text object.  Entries are evicted
+    once more than maxsize entries or more than max_bytes are held. """
+
+    def __init__(self, maxsize: int = 1024, max_bytes: int = 64 * 2 ** 20):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text: Text) -> Tuple:
+        return text.cache_key()
+
+    def get(self, key: Tuple):
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Tuple, value: Vocabulary) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key).nbytes
+            if self.maxsize <= 0 or value.nbytes > self.max_bytes:
+                return
+            self._entries[key] = value
+            self._bytes += value.nbytes
+            self._evict()
+
+    def configure(self, maxsize: int = None, max_bytes: int = None) -> None:
+        """ Changes the limits, evicting entries as needed. """
+        with self._lock:
+            self.maxsize = self.maxsize if maxsize is None else maxsize
+            self.max_bytes = self.max_bytes if max_bytes is None else max_bytes
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / lookups if lookups else 0.0,
+                    'entries': len(self._entries), 'bytes': self._bytes}
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.maxsize or self._bytes > self.max_bytes):
+            self._bytes -= self._entries.popitem(last=False)[1].nbytes
+
+
+vocabulary_cache = VocabularyCache()
+
+
+def get_vocabulary(text: Text) -> Vocabulary:
+    """ Returns the interned word frequencies of the text.  Results are cached in vocabulary_cache, so texts that
+    were seen before are not parsed again. """
+    key = VocabularyCache.key(text)
+    vocabulary = vocabulary_cache.get(key)
+    if vocabulary is None:
+        vocabulary = text.summary().vocabulary
+        vocabulary_cache.put(key, vocabulary)
+    return vocabulary
 
 
-@lru_cache(maxsize=10)
 def get_vocabulary_items(text: Text) -> Tuple[Counter, Counter, dict, int]:
-    vocab = Counter([t.text for t in text.nlp() if isword(t.text)])
+    """ Returns the word frequencies, the number of vocabulary items that occur exactly i times, the share of
+    vocabulary items that occur exactly i times and the size of the vocabulary. """
+    vocabulary = get_vocabulary(text)
+    vocab = vocabulary.to_counter()
     vocab_i = Counter()
     for k, v in vocab.items():
         vocab_i[v] += 1
@@ -70,13 +736,15 @@ def get_vocabulary_items(text: Text) -> Tuple[Counter, Counter, dict, int]:
     return vocab, vocab_i, prob_i, vocab_len
 
 
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
 def word_length(string: str, exclude_combining: bool = True) -> int:
     """ Length of a word, with or without combining characters (diacritics).
-    A word is a 'continuous string of graphemes and/or digits.' (Grieve, 2007) """
+    A word is a 'continuous string of graphemes and/or digits.' (Grieve, 2007)  Results are memoized per string. """
     if exclude_combining:
-        return len([s for s in string if s.isalnum() and not combining(s)])
-    else:
-        return len([s for s in string if s.isalnum()])
+        string = strip_combining(string)
+    if string.isalnum():
+        return len(string)
+    return sum(1 for s in string if s.isalnum())
 
 
 def sentence_length_in_words(sent: spacy.tokens.doc.Doc):
@@ -106,7 +774,129 @@ def sentence_length_in_characters(sent: str, exclude_combining: bool = True) ->
 
     # TODO: Improve implementation for better support of non-English languages
 
-    text = SENTENCE_ENDING_PATTERN.search(sent).group(1)
+    # Same as SENTENCE_ENDING_PATTERN.search(sent).group(1), without the backtracking of its lazy group
+    text = (sent[1:] if sent[:1] in SENTENCE_OPENINGS else sent).rstrip(SENTENCE_ENDINGS)
     if exclude_combining:
-        text = [t for t in text if not combining(t)]
+        text = strip_combining(text)
     return len(text)
+
+
+class Summary(object):
+    """ Everything the measurements need from a parsed text, collected in a single pass over its tokens and kept
+    as arrays: the length of every token (int32), whether it is a word (bool), the id of every word in order
+    (uint64 StringStore hashes, from which the Vocabulary is built), the token offsets of the sentences and the
+    length of every sentence in characters, with and without combining characters.  Sentence statistics are only
+    available when the Doc has sentence boundaries. """
+
+    def __init__(self, token_lengths, word_flags, word_ids, strings: StringStore = None, sentence_offsets=None,
+                 sentence_lengths=None, sentence_lengths_with_combining=None):
+        self.token_lengths = np.asarray(token_lengths, dtype=np.int32)
+        self.word_flags = np.asarray(word_flags, dtype=bool)
+        self.word_ids = np.asarray(word_ids, dtype=np.uint64)
+        self.strings = strings
+        self.sentence_offsets = None if sentence_offsets is None else np.asarray(sentence_offsets, dtype=np.int64)
+        self._sentence_lengths = {
+            True: None if sentence_lengths is None else np.asarray(sentence_lengths, dtype=np.int32),
+            False: None if sentence_lengths_with_combining is None else np.asarray(sentence_lengths_with_combining,
+                                                                                   dtype=np.int32)}
+        self._vocabulary = None
+        self._sentence_word_counts = None
+
+    @classmethod
+    def from_doc(cls, doc: Doc) -> 'Summary':
+        # Read the token columns as arrays and classify every distinct string once, instead of creating a Token
+        # object for every token
+        orths = doc.to_array(spacy.attrs.ORTH)
+        unique, inverse = np.unique(orths, return_inverse=True)
+        strings = doc.vocab.strings
+        texts = [strings[orth] for orth in unique.tolist()]
+        word_flags = np.array([isword(t) for t in texts], dtype=bool)[inverse.ravel()]
+        token_lengths = np.array([word_length(t) for t in texts], dtype=np.int32)[inverse.ravel()]
+        word_ids = orths[word_flags]
+
+        if not doc.has_annotation('SENT_START'):
+            return cls(token_lengths, word_flags, word_ids, strings)
+
+        # Sentences start at the first token and wherever SENT_START is 1, as in Doc.sents
+        sentence_starts = doc.to_array(spacy.attrs.SENT_START).view(np.int64)
+        sentence_starts[:1] = 1
+        sentence_offsets = np.append(np.flatnonzero(sentence_starts == 1), len(doc))
+        positions = doc.to_array([spacy.attrs.IDX, spacy.attrs.LENGTH]).astype(np.int64)
+        start_chars = positions[sentence_offsets[:-1], 0]
+        end_chars = positions[sentence_offsets[1:] - 1].sum(axis=1)
+        # Doc.text would create every Token as well, so the text is joined from the strings and the trailing spaces
+        spaces = doc.to_array(spacy.attrs.SPACY).astype(bool).tolist()
+        text = ''.join([texts[i] + ' ' if space else texts[i] for i, space in zip(inverse.ravel().tolist(), spaces)])
+        sentence_lengths = []
+        sentence_lengths_with_combining = []
+        for start, end in zip(start_chars.tolist(), end_chars.tolist()):
+            sentence = text[start:end]
+            sentence_lengths.append(sentence_length_in_characters(sentence, exclude_combining=True))
+            sentence_lengths_with_combining.append(sentence_length_in_characters(sentence, exclude_combining=False))
+        return cls(token_lengths, word_flags, word_ids, strings, sentence_offsets, sentence_lengths,
+                   sentence_lengths_with_combining)
+
+    @property
+    def vocabulary(self) -> Vocabulary:
+        if self._vocabulary is None:
+            self._vocabulary = Vocabulary.from_ids(self.word_ids, self.strings)
+        return self._vocabulary
+
+    @property
+    def word_count(self) -> int:
+        return int(np.count_nonzero(self.word_flags))
+
+    @property
+    def has_sentences(self) -> bool:
+        return self.sentence_offsets is not None
+
+    @property
+    def sentence_count(self) -> int:
+        self._require_sentences()
+        return len(self.sentence_offsets) - 1
+
+    @property
+    def sentence_word_counts(self) -> np.ndarray:
+        """ Length of every sentence in words. """
+        self._require_sentences()
+        if self._sentence_word_counts is None:
+            words = np.concatenate(([0], np.cumsum(self.word_flags, dtype=np.int64)))
+            self._sentence_word_counts = words[self.sentence_offsets[1:]] - words[self.sentence_offsets[:-1]]
+        return self._sentence_word_counts
+
+    def sentence_lengths(self, exclude_combining: bool = True) -> np.ndarray:
+        """ Length of every sentence in characters, as sentence_length_in_characters. """
+        self._require_sentences()
+        return self._sentence_lengths[exclude_combining]
+
+    def _require_sentences(self):
+        if not self.has_sentences:
+            raise ValueError('Sentence boundaries are not set.  Parse the text with a model that has a parser, '
+                             'senter or sentencizer.')
+
+
+def counts(values: np.ndarray, min_value: int = None, max_value: int = None) -> Counter:
+    """ Counts non-negative integers that are greater than or equal to min_value and less than max_value, if
+    given.  The keys are in order of first occurrence, as if the values had been counted one at a time. """
+    values = _between(values, min_value, max_value)
+    if not len(values):
+        return Counter()
+    frequencies = np.bincount(values)
+    _, first = np.unique(values, return_index=True)
+    return Counter({int(v): int(frequencies[v]) for v in values[np.sort(first)]})
+
+
+def interval_counts(values: np.ndarray, interval: int, min_value: int = None, max_value: int = None) -> Counter:
+    """ Counts non-negative integers as counts does, but in buckets of interval values keyed by the (from, to)
+    range of the bucket, i.e. (1, 10), (11, 20) and so on for an interval of 10. """
+    buckets = counts(_between(values, min_value, max_value) // interval)
+    return Counter({(b * interval + 1, (b + 1) * interval): v for b, v in buckets.items()})
+
+
+def _between(values: np.ndarray, min_value: int = None, max_value: int = None) -> np.ndarray:
+    values = np.asarray(values)
+    if min_value is not None:
+        values = values[values >= min_value]
+    if max_value is not None:
+        values = values[values < max_value]
+    return values
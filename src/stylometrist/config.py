@@ -1,10 +1,112 @@
-import spacy
+from typing import Iterable, Tuple
+import os
 
 DEFAULT_MODEL = 'en_core_web_sm'
+DEFAULT_DOC_CACHE_BYTES = 2 ** 30
+
+# What a measurement can require from the pipeline
+TOKENS = 'tokens'
+SENTENCES = 'sentences'
+LEMMAS = 'lemmas'
+
+# Intermediate statistics that measurements are computed from, shared between the measurements of a text
+TOKEN_STREAM = 'token_stream'
+VOCABULARY = 'vocabulary'
+SPECTRUM = 'spectrum'
+SENTENCE_LENGTHS = 'sentence_lengths'
+
+# Tokenizers: the model's own, spaCy's rule-based tokenizer for the model's language without loading the model, or
+# the compiled-regex RegexTokenizer.  Only the model's tokenizer comes with a parser, tagger and lemmatizer.
+MODEL_TOKENIZER = 'model'
+BLANK_TOKENIZER = 'blank'
+REGEX_TOKENIZER = 'regex'
+TOKENIZERS = (MODEL_TOKENIZER, BLANK_TOKENIZER, REGEX_TOKENIZER)
+
+# Components found in the trained spaCy pipelines, and the ones each requirement depends on
+PIPELINE_COMPONENTS = ('transformer', 'tok2vec', 'tagger', 'morphologizer', 'parser', 'senter', 'sentencizer',
+                       'attribute_ruler', 'lemmatizer', 'trainable_lemmatizer', 'ner', 'entity_ruler',
+                       'entity_linker', 'textcat', 'textcat_multilabel', 'spancat')
+REQUIRED_COMPONENTS = {
+    TOKENS: (),
+    SENTENCES: ('transformer', 'tok2vec', 'parser', 'senter', 'sentencizer'),
+    LEMMAS: ('transformer', 'tok2vec', 'tagger', 'morphologizer', 'attribute_ruler', 'lemmatizer',
+             'trainable_lemmatizer'),
+}
 
 
 class Config(object):
-    """ Configuration class.  Provides reasonable defaults for English. """
+    """ Configuration class.  Provides reasonable defaults for English.  Configurations that name the same model,
+    exclude the same pipeline components and agree on the sentencizer are equal, so a Config can be used as a key
+    for loaded models.  With sentencizer set, a rule-based sentencizer is added to pipelines that are left without
+    a parser or senter.  With doc_cache set to a directory, parsed Docs are cached there, up to doc_cache_bytes.
+
+    With tokenizer set to BLANK_TOKENIZER or REGEX_TOKENIZER, the statistical model is not loaded at all: texts are
+    only tokenized, by spaCy's rules for lang (taken from the model name by default) or by RegexTokenizer.  This is
+    enough for measurements that require only TOKENS, and much faster. """
 
-    def __init__(self, model=DEFAULT_MODEL):
+    def __init__(self, model=DEFAULT_MODEL, exclude: Iterable[str] = (), sentencizer: bool = False,
+                 doc_cache: str = None, doc_cache_bytes: int = DEFAULT_DOC_CACHE_BYTES,
+                 tokenizer: str = MODEL_TOKENIZER, lang: str = None):
+        if tokenizer not in TOKENIZERS:
+            raise ValueError(f'Unknown tokenizer: {tokenizer}')
         self.model = model
+        self.exclude = tuple(sorted(set(exclude)))
+        self.sentencizer = sentencizer
+        self.doc_cache = None if doc_cache is None else os.fspath(doc_cache)
+        self.doc_cache_bytes = doc_cache_bytes
+        self.tokenizer = tokenizer
+        self.lang = lang if lang else os.path.basename(os.fspath(model)).split('_')[0]
+
+    @classmethod
+    def for_requirements(cls, requirements: Iterable[str], model=DEFAULT_MODEL,
+                         rule_based_sentences: bool = False, **kw) -> 'Config':
+        """ Returns the configuration that loads only the components needed for the requirements (TOKENS,
+        SENTENCES and/or LEMMAS).  Sentence boundaries come from the model's parser, unless rule_based_sentences is
+        set, in which case the much cheaper rule-based sentencizer is used and the boundaries may differ.  Other
+        keyword arguments are passed on to the Config. """
+        keep = set()
+        sentencizer = False
+        tokenizer = kw.get('tokenizer', MODEL_TOKENIZER)
+        for requirement in requirements:
+            try:
+                components = REQUIRED_COMPONENTS[requirement]
+            except KeyError:
+                raise ValueError(f'Unknown requirement: {requirement}') from None
+            if requirement == SENTENCES and rule_based_sentences:
+                sentencizer = True
+            elif components and tokenizer != MODEL_TOKENIZER:
+                raise ValueError(f'The {tokenizer} tokenizer cannot provide {requirement}' +
+                                 (', unless rule_based_sentences is set' if requirement == SENTENCES else ''))
+            else:
+                keep.update(components)
+        return cls(model, exclude=[c for c in PIPELINE_COMPONENTS if c not in keep], sentencizer=sentencizer, **kw)
+
+    def for_model(self, model, lang: str = None) -> 'Config':
+        """ The same configuration for another model, such as the pipeline of another language. """
+        return Config(model, self.exclude, self.sentencizer, self.doc_cache, self.doc_cache_bytes, self.tokenizer,
+                      lang)
+
+    def key(self) -> Tuple:
+        return self.model, self.exclude, self.sentencizer, self.doc_cache, self.doc_cache_bytes, self.tokenizer, \
+            self.lang
+
+    def tokenizer_key(self) -> Tuple:
+        """ The part of the configuration that determines tokenization.  Trimming components does not change the
+        tokens, so trimmed and full pipelines of the same model share a key. """
+        if self.tokenizer == MODEL_TOKENIZER:
+            return self.model,
+        if self.tokenizer == BLANK_TOKENIZER:
+            return self.tokenizer, self.lang
+        return self.tokenizer,
+
+    def __eq__(self, other):
+        if not isinstance(other, Config):
+            return NotImplemented
+        return self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        return f'Config(model={self.model!r}, exclude={self.exclude!r}, sentencizer={self.sentencizer!r}, ' \
+               f'doc_cache={self.doc_cache!r}, tokenizer={self.tokenizer!r})'
@@ -0,0 +1,57 @@
+from typing import Any, Dict, Iterable, Iterator
+
+from .common import Model, Text, get_model
+from .config import Config, DEFAULT_MODEL, MODEL_TOKENIZER
+from .planner import Measurement, Plan, resolve_measurements
+
+
+def config_for(measurements: Iterable[Measurement], model=DEFAULT_MODEL, rule_based_sentences: bool = False,
+               **kw) -> Config:
+    """ Returns the configuration that loads only the pipeline components the measurements require.  Other
+    keyword arguments are passed on to the Config. """
+    return Plan(measurements).config(model=model, rule_based_sentences=rule_based_sentences, **kw)
+
+
+def analyze_many(texts: Iterable[str], measurements: Iterable[Measurement], batch_size: int = 64,
+                 n_process: int = 1, model: Model = None, params: Dict[str, Dict[str, Any]] = None,
+                 rule_based_sentences: bool = False, doc_cache: str = None,
+                 tokenizer: str = MODEL_TOKENIZER) -> Iterator[Dict[str, Any]]:
+    """ Computes the requested measurements for every text.  Texts are parsed in batches with the model's pipe,
+    using n_process worker processes, and results are yielded in input order as dicts keyed by measurement name.
+    params optionally maps a measurement name to the keyword arguments it is called with.
+
+    Without a model, a pooled model trimmed to the components the measurements require is used (see config_for),
+    caching parsed Docs in the doc_cache directory if one is given.  Measurements that require only TOKENS can set
+    tokenizer to BLANK_TOKENIZER or REGEX_TOKENIZER to skip loading the statistical model (see Config).
+    """
+    measurements = list(measurements)
+    if not model:
+        model = get_model(config_for(measurements, rule_based_sentences=rule_based_sentences, doc_cache=doc_cache,
+                                     tokenizer=tokenizer))
+    return Corpus(texts, model=model).analyze(measurements, batch_size=batch_size, n_process=n_process,
+                                              params=params)
+
+
+class Corpus(object):
+    """ A stream of texts that are parsed together.  The texts are only consumed when the corpus is iterated or
+    analyzed, so generators over large collections are fine. """
+
+    def __init__(self, texts: Iterable[str], model: Model = None):
+        self.texts = texts
+        self.model = model if model else get_model()
+
+    def parse(self, batch_size: int = 64, n_process: int = 1) -> Iterator[Text]:
+        """ Yields a parsed Text for every text, in input order. """
+        for doc in self.model.pipe((str(t) for t in self.texts), batch_size=batch_size, n_process=n_process):
+            yield Text(doc.text, model=self.model, doc=doc)
+
+    def __iter__(self) -> Iterator[Text]:
+        return self.parse()
+
+    def analyze(self, measurements: Iterable[Measurement], batch_size: int = 64, n_process: int = 1,
+                params: Dict[str, Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """ Yields the requested measurements for every text, in input order, sharing their intermediate
+        statistics (see Plan).  See analyze_many. """
+        plan = Plan(measurements, params)
+        for text in self.parse(batch_size=batch_size, n_process=n_process):
+            yield plan.run(text)
@@ -1,26 +1,42 @@
-from typing import Callable
+from typing import Callable, Iterable
 from functools import wraps
 
-from .common import Text, registry
+from .common import Text, get_model, registry
+from .config import Config, TOKENS, TOKEN_STREAM
+from .instrumentation import state
 
 
-def measurement(f: Callable) -> Callable:
-    """ Logs measurement to registry and converts text as str to Text instance """
+def as_text(text, requires: Iterable[str] = (TOKENS,)) -> Text:
+    """ Returns text if it already is a Text, otherwise wraps it in a Text parsed with a pooled model that loads
+    only the components needed for the requirements. """
+    if isinstance(text, Text):
+        return text
+    return Text(str(text), model=get_model(Config.for_requirements(requires)))
+
+
+def measurement(f: Callable = None, requires: Iterable[str] = (TOKENS,),
+                uses: Iterable[str] = (TOKEN_STREAM,)) -> Callable:
+    """ Logs measurement to registry and converts text as str to Text instance.  requires declares what the
+    measurement needs from the pipeline (TOKENS, SENTENCES and/or LEMMAS); a str is parsed with a pooled model that
+    loads only those components.  uses declares the intermediate statistics it is computed from (TOKEN_STREAM,
+    VOCABULARY, SPECTRUM and/or SENTENCE_LENGTHS), so that a Plan can compute them once for several measurements.
+    Can be used bare or as measurement(requires=..., uses=...).  Calls are timed while an Instrumentation runs (see
+    instrumentation), and cost a single check otherwise. """
+    if f is None:
+        return lambda g: measurement(g, requires=requires, uses=uses)
+
+    requires = registry.register(f, requires, uses)['requires']
 
     @wraps(f)  # For some unknown reason, this makes Sphinx automodule work on a decorated function
     def wrapper(*args, **kw):
-        registry[f.__name__] = {'function': f}
-
         try:
-            text = kw['text']
-            start_arg = 0
+            text = kw.pop('text')
         except KeyError:
-            text = args[0]
-            start_arg = 1
-
-        if not isinstance(text, Text):
-            kw['text'] = Text(str(text))
+            text, args = args[0], args[1:]
 
-        return f(*args[start_arg:], **kw)
+        if state.active is None:
+            return f(as_text(text, requires), *args, **kw)
+        text = as_text(text, requires)
+        return state.active.call('measurement', f.__name__, lambda: f(text, *args, **kw), text)
 
     return wrapper
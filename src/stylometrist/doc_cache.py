@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+import hashlib
+import os
+import threading
+import uuid
+
+from .config import DEFAULT_DOC_CACHE_BYTES
+from .lazy import lazy_module
+
+if TYPE_CHECKING:
+    from spacy.tokens import Doc
+    from spacy.vocab import Vocab
+spacy = lazy_module('spacy')
+
+SUFFIX = '.spacy'
+INDEX_SUFFIX = '.index'
+SHARD_BYTES = 2 ** 26
+
+
+class _Shard(object):
+    __slots__ = ('name', 'bytes', 'mtime')
+
+    def __init__(self, name: str, size: int, mtime: float):
+        self.name = name
+        self.bytes = size
+        self.mtime = mtime
+
+
+class DocCache(object):
+    """ On-disk cache of parsed Docs, stored as serialized DocBins appended to shard files under path.  Entries are
+    keyed by a digest of the text and of the model that parsed it (its name, version and configuration).  Every
+    shard file has an index file next to it that maps each key to the offset and length of its DocBin and to the
+    Doc's position in it, so the index of the whole cache is read from a few files and a Doc is only read when it
+    is requested.  put_many writes several Docs as one DocBin, which shares their strings.
+
+    Each cache appends to shard files of its own, starting a new one once the current one holds shard_bytes, so
+    processes can share a directory; entries written by others after the index was read are not seen.  Once the
+    shards take more than max_bytes, the least recently used ones are deleted. """
+
+    def __init__(self, path, max_bytes: int = DEFAULT_DOC_CACHE_BYTES, shard_bytes: int = SHARD_BYTES):
+        self.path = os.fspath(path)
+        self.max_bytes = max_bytes
+        self.shard_bytes = min(shard_bytes, max(max_bytes // 16, 1))
+        self.hits = 0
+        self.misses = 0
+        self._index = None
+        self._shards = {}
+        self._bytes = 0
+        self._writing = None
+        self._writer_pid = None
+        self._record = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text: str, model_id: str) -> str:
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(model_id.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(text.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+
+    def get(self, key: str, vocab: Vocab) -> Optional[Doc]:
+        """ Returns the cached Doc, with its strings added to vocab, or None. """
+        with self._lock:
+            entry = self._load_index().get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            shard, offset, length, position = entry
+            record = self._record
+            if record is not None and record[0] == (shard, offset) and record[1] is vocab and position in record[2]:
+                # Docs written together are usually read together, so the rest of their DocBin is kept around
+                self.hits += 1
+                self._touch(shard)
+                return record[2].pop(position)
+        try:
+            with open(self._shard_path(shard), 'rb') as f:
+                f.seek(offset)
+                data = f.read(length)
+        except FileNotFoundError:
+            data = b''
+        with self._lock:
+            if len(data) < length:
+                # Another process evicted the shard
+                self._drop(shard)
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touch(shard)
+        docs = dict(enumerate(spacy.tokens.DocBin().from_bytes(data).get_docs(vocab)))
+        doc = docs.pop(position)
+        if docs:
+            with self._lock:
+                self._record = ((shard, offset), vocab, docs)
+        return doc
+
+    def has(self, key: str) -> bool:
+        """ Whether the key is cached, without reading the Doc.  Counts a miss if it is not. """
+        with self._lock:
+            if key in self._load_index():
+                return True
+            self.misses += 1
+        return False
+
+    def put(self, key: str, doc: Doc) -> None:
+        self.put_many([key], [doc])
+
+    def put_many(self, keys: Sequence[str], docs: Sequence[Doc]) -> None:
+        """ Caches the Docs under their keys, as one DocBin. """
+        if not docs:
+            return
+        data = spacy.tokens.DocBin(docs=docs).to_bytes()
+        with self._lock:
+            index = self._load_index()
+            shard = self._writable_shard()
+            with open(self._shard_path(shard.name), 'ab') as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(data)
+            # The index is written after the data, so that other readers never see an entry without its Doc
+            lines = ''.join(f'{key} {offset} {len(data)} {i}\n' for i, key in enumerate(keys))
+            with open(self._index_path(shard.name), 'a', encoding='ascii') as f:
+                f.write(lines)
+            for i, key in enumerate(keys):
+                index[key] = (shard.name, offset, len(data), i)
+            shard.bytes += len(data)
+            self._bytes += len(data)
+            self._touch(shard.name)
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._load_index()
+            self._remove(list(self._shards))
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            index = self._load_index()
+            return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / lookups if lookups else 0.0,
+                    'entries': len(index), 'shards': len(self._shards), 'bytes': self._bytes}
+
+    def _shard_path(self, name: str) -> str:
+        return os.path.join(self.path, name + SUFFIX)
+
+    def _index_path(self, name: str) -> str:
+        return os.path.join(self.path, name + INDEX_SUFFIX)
+
+    def _writable_shard(self) -> _Shard:
+        shard = self._shards.get(self._writing)
+        # A forked process starts shards of its own rather than appending to its parent's
+        if shard is None or shard.bytes >= self.shard_bytes or self._writer_pid != os.getpid():
+            os.makedirs(self.path, exist_ok=True)
+            shard = _Shard(f'docs-{uuid.uuid4().hex}', 0, 0.0)
+            self._shards[shard.name] = shard
+            self._writing = shard.name
+            self._writer_pid = os.getpid()
+        return shard
+
+    def _touch(self, name: str) -> None:
+        shard = self._shards.get(name)
+        if shard is None:
+            return
+        try:
+            os.utime(self._shard_path(name))
+            shard.mtime = os.stat(self._shard_path(name)).st_mtime
+        except FileNotFoundError:
+            pass
+
+    def _load_index(self) -> Dict[str, tuple]:
+        """ The shard, offset, length and position of every cached Doc, read from the index files the first time
+        it is needed.  Entries whose data is missing, such as the last one of a shard that is being written, are
+        skipped. """
+        if self._index is None:
+            self._index = {}
+            names = []
+            if os.path.isdir(self.path):
+                names = [e.name[:-len(INDEX_SUFFIX)] for e in os.scandir(self.path) if e.name.endswith(INDEX_SUFFIX)]
+            for name in names:
+                try:
+                    stat = os.stat(self._shard_path(name))
+                    with open(self._index_path(name), encoding='ascii') as f:
+                        lines = f.read().split('\n')
+                except FileNotFoundError:
+                    continue
+                self._shards[name] = _Shard(name, stat.st_size, stat.st_mtime)
+                # The last line is either empty or a line that is still being written
+                for line in lines[:-1]:
+                    fields = line.split(' ')
+                    if len(fields) != 4:
+                        continue
+                    key, offset, length, position = fields[0], int(fields[1]), int(fields[2]), int(fields[3])
+                    if offset + length <= stat.st_size:
+                        self._index[key] = (name, offset, length, position)
+            self._bytes = sum(shard.bytes for shard in self._shards.values())
+        return self._index
+
+    def _evict(self) -> None:
+        # Evict down to 90% of the limit, so that eviction does not run on every put once the cache is full
+        target = self.max_bytes * 0.9
+        evicted, size = [], self._bytes
+        for shard in sorted(self._shards.values(), key=lambda shard: shard.mtime):
+            if size <= target:
+                break
+            evicted.append(shard.name)
+            size -= shard.bytes
+        self._remove(evicted)
+
+    def _remove(self, names: List[str]) -> None:
+        for name in names:
+            for path in (self._index_path(name), self._shard_path(name)):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        self._drop(*names)
+
+    def _drop(self, *names: str) -> None:
+        """ Forgets the shards and their entries. """
+        names = set(names)
+        for name in names:
+            shard = self._shards.pop(name, None)
+            if shard is not None:
+                self._bytes -= shard.bytes
+        if self._index:
+            for key in [key for key, entry in self._index.items() if entry[0] in names]:
+                del self._index[key]
+        if self._record is not None and self._record[0][0] in names:
+            self._record = None
+        if self._writing in names:
+            self._writing = None
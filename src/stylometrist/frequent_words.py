@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, Iterable, List, Sequence, Tuple, Union
+
+from .common import Model, Text, Vocabulary, get_vocabulary, parse_texts
+from .config import Config, TOKENS, VOCABULARY
+from .decorators import measurement
+from .lazy import lazy_module
+
+if TYPE_CHECKING:
+    import numpy as np
+    from spacy.strings import StringStore
+else:
+    np = lazy_module('numpy')
+spacy = lazy_module('spacy')
+
+# The function words of Mosteller and Wallace (1964), the usual starting point for function word profiles
+FUNCTION_WORDS = ('a', 'all', 'also', 'an', 'and', 'any', 'are', 'as', 'at', 'be', 'been', 'but', 'by', 'can', 'do',
+                  'down', 'even', 'every', 'for', 'from', 'had', 'has', 'have', 'her', 'his', 'if', 'in', 'into',
+                  'is', 'it', 'its', 'may', 'more', 'must', 'my', 'no', 'not', 'now', 'of', 'on', 'one', 'only',
+                  'or', 'our', 'shall', 'should', 'so', 'some', 'such', 'than', 'that', 'the', 'their', 'then',
+                  'there', 'things', 'this', 'to', 'up', 'upon', 'was', 'were', 'what', 'when', 'which', 'who',
+                  'will', 'with', 'would', 'your')
+
+
+@measurement(uses=[VOCABULARY])
+def word_frequencies(text: Text, words: Sequence[str] = FUNCTION_WORDS,
+                     lowercase: bool = True) -> List[Tuple[str, float]]:
+    """ Relative frequency of each of the words (function words by default): its count divided by the total count
+    of words, in the order of words.  With lowercase, words are counted regardless of case. """
+    return vocabulary_frequencies(get_vocabulary(text), words, lowercase)
+
+
+def vocabulary_frequencies(vocabulary: Vocabulary, words: Sequence[str] = FUNCTION_WORDS,
+                           lowercase: bool = True) -> List[Tuple[str, float]]:
+    """ Relative frequency of each of the words in a vocabulary, as word_frequencies computes it. """
+    total = vocabulary.word_count
+    if total == 0:
+        return [(word, 0.0) for word in words]
+    ids, counts = word_counts(vocabulary, lowercase)
+    frequencies = dict(zip(ids.tolist(), counts.tolist()))
+    hash_string = spacy.strings.hash_string
+    return [(word, frequencies.get(hash_string(word.lower() if lowercase else word), 0) / total) for word in words]
+
+
+def word_counts(vocabulary: Vocabulary, lowercase: bool = True,
+                folded: Dict[int, int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """ Ids and counts of the words of a vocabulary.  With lowercase, the words are lowercased and their counts
+    summed; the lowercase words are added to the vocabulary's StringStore, and folded optionally caches the
+    lowercase id of every word id across calls. """
+    if not lowercase or not len(vocabulary):
+        return vocabulary.ids, vocabulary.counts
+    strings = vocabulary.strings
+    folded = {} if folded is None else folded
+    lower = []
+    for i in vocabulary.ids.tolist():
+        f = folded.get(i)
+        if f is None:
+            f = folded[i] = strings.add(strings[i].lower())
+        lower.append(f)
+    ids, inverse = np.unique(np.array(lower, dtype=np.uint64), return_inverse=True)
+    return ids, np.bincount(inverse.ravel(), weights=vocabulary.counts, minlength=len(ids)).astype(np.int64)
+
+
+class WordProfiles(object):
+    """ Relative word frequencies of a corpus, one row per document and one column per word, stored like a
+    compressed sparse row (CSR) matrix in NumPy arrays: the columns (int32) and frequencies (float32) of the non-zero
+    entries of every row, one row after the other, and indptr (int64), where row i starts and ends.  Only the words a
+    document uses take memory, so 100,000 documents by 5,000 words take a few hundred megabytes rather than the
+    gigabytes of a dense matrix, and slicing a range of rows copies nothing.  word_counts holds the total number of
+    words of every document. """
+
+    def __init__(self, words: List[str], indptr, indices, data, word_counts):
+        self.words = words
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.data = np.asarray(data, dtype=np.float32)
+        self.word_counts = np.asarray(word_counts, dtype=np.int64)
+        self._columns = None
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self.indptr) - 1, len(self.words)
+
+    @property
+    def nnz(self) -> int:
+        return int(self.indptr[-1] - self.indptr[0])
+
+    @property
+    def nbytes(self) -> int:
+        return self.indptr.nbytes + self.indices.nbytes + self.data.nbytes + self.word_counts.nbytes
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __getitem__(self, index: Union[int, slice, Sequence[int]]) -> Union[np.ndarray, 'WordProfiles']:
+        """ A document's frequencies as a dense vector for an int, or the profiles of a subset of the documents for
+        a slice (sharing the arrays when the step is 1) or a sequence of indices. """
+        if isinstance(index, (int, np.integer)):
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError('Document index out of range')
+            row = np.zeros(len(self.words), dtype=np.float32)
+            start, end = self.indptr[index], self.indptr[index + 1]
+            row[self.indices[start:end]] = self.data[start:end]
+            return row
+        if isinstance(index, slice) and index.step in (None, 1):
+            start, stop, _ = index.indices(len(self))
+            stop = max(start, stop)
+            return WordProfiles(self.words, self.indptr[start:stop + 1], self.indices, self.data,
+                                self.word_counts[start:stop])
+
+        rows = np.arange(len(self))[index]
+        starts, ends = self.indptr[rows], self.indptr[rows + 1]
+        lengths = ends - starts
+        indptr = np.concatenate(([0], np.cumsum(lengths)))
+        # Positions of the entries of every selected row, gathered in one go
+        positions = np.repeat(starts - indptr[:-1], lengths) + np.arange(indptr[-1])
+        return WordProfiles(self.words, indptr, self.indices[positions], self.data[positions],
+                            self.word_counts[rows])
+
+    def toarray(self) -> np.ndarray:
+        """ The frequencies as a dense documents x words matrix. """
+        dense = np.zeros(self.shape, dtype=np.float32)
+        rows = np.repeat(np.arange(len(self)), np.diff(self.indptr))
+        entries = slice(self.indptr[0], self.indptr[-1])
+        dense[rows, self.indices[entries]] = self.data[entries]
+        return dense
+
+    def column(self, word: str) -> np.ndarray:
+        """ The frequency of a word in every document. """
+        if self._columns is None:
+            self._columns = {w: i for i, w in enumerate(self.words)}
+        try:
+            column = self._columns[word]
+        except KeyError:
+            raise KeyError(f'Not a profiled word: {word}') from None
+        entries = slice(self.indptr[0], self.indptr[-1])
+        found = np.flatnonzero(self.indices[entries] == column)
+        frequencies = np.zeros(len(self), dtype=np.float32)
+        frequencies[np.searchsorted(self.indptr[1:] - self.indptr[0], found, side='right')] = self.data[entries][found]
+        return frequencies
+
+
+def word_profiles(texts: Iterable[Union[str, Text]], n: int = 100, words: Sequence[str] = None,
+                  lowercase: bool = True, model: Model = None, batch_size: int = 64,
+                  n_process: int = 1) -> WordProfiles:
+    """ Profiles of the relative frequencies of the n most frequent words of a corpus, or of the words given, in
+    every text (or every document of a ColumnStore).  The corpus vocabulary is built in the same single pass that
+    collects the word counts of every document; ties in frequency go to the word that occurs first.  With lowercase,
+    words are counted regardless of case. """
+    fixed = None
+    if words is not None:
+        words = [word.lower() if lowercase else word for word in words]
+        fixed = np.array([spacy.strings.hash_string(word) for word in words], dtype=np.uint64)
+
+    folded = {}
+    stores = []
+    ids, counts, lengths, totals = [], [], [], []
+    for text in parse_texts(texts, model, Config.for_requirements([TOKENS]), batch_size, n_process):
+        vocabulary = get_vocabulary(text)
+        document_ids, document_counts = word_counts(vocabulary, lowercase, folded)
+        if fixed is not None:
+            keep = np.isin(document_ids, fixed)
+            document_ids, document_counts = document_ids[keep], document_counts[keep]
+        elif vocabulary.strings is not None and not any(s is vocabulary.strings for s in stores):
+            stores.append(vocabulary.strings)
+        ids.append(document_ids)
+        counts.append(document_counts)
+        lengths.append(len(document_ids))
+        totals.append(vocabulary.word_count)
+
+    ids = np.concatenate(ids) if ids else np.empty(0, dtype=np.uint64)
+    counts = np.concatenate(counts) if counts else np.empty(0, dtype=np.int64)
+    if fixed is None:
+        fixed, words = _most_frequent(ids, counts, n, stores)
+
+    # Columns of the entries, found for all documents at once in the sorted word ids
+    order = np.argsort(fixed, kind='stable')
+    position = np.minimum(np.searchsorted(fixed[order], ids), max(len(fixed) - 1, 0))
+    found = fixed[order][position] == ids if len(fixed) else np.zeros(len(ids), dtype=bool)
+    rows = np.repeat(np.arange(len(lengths)), lengths)[found]
+    columns = order[position[found]]
+    totals = np.asarray(totals, dtype=np.int64)
+    frequencies = counts[found] / totals[rows]
+
+    entries = np.lexsort((columns, rows))
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=len(lengths)))))
+    return WordProfiles(list(words), indptr, columns[entries], frequencies[entries], totals)
+
+
+def _most_frequent(ids: np.ndarray, counts: np.ndarray, n: int,
+                   stores: List[StringStore]) -> Tuple[np.ndarray, List[str]]:
+    unique, first, inverse = np.unique(ids, return_index=True, return_inverse=True)
+    totals = np.bincount(inverse.ravel(), weights=counts, minlength=len(unique))
+    top = unique[np.lexsort((first, -totals))[:n]]
+    return top, [_string(int(i), stores) for i in top]
+
+
+def _string(i: int, stores: List[StringStore]) -> str:
+    for strings in stores:
+        if i in strings:
+            return strings[i]
+    raise KeyError(f'No string for word id {i}')
@@ -0,0 +1,246 @@
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, TextIO, Union
+import cProfile
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+
+Event = Dict[str, Any]
+Sink = Callable[[Event], None]
+
+
+class _State(object):
+    """ The running Instrumentation, if any.  Hooks check state.active, so they cost a single attribute lookup
+    while instrumentation is off. """
+    __slots__ = ('active',)
+
+    def __init__(self):
+        self.active = None
+
+
+state = _State()
+
+
+class Instrumentation(object):
+    """ Opt-in instrumentation of measurements, started with start or by using it as a context manager.  While it
+    runs it records, for every call of a measurement and every computed intermediate statistic, the time taken,
+    split into parsing (Model.nlp and Model.pipe) and computation, the number of tokens of the text and whether it
+    failed; as well as model load times, vocabulary and doc cache hits, and optionally a cProfile profile (of the
+    thread that started it) and tracemalloc memory peaks.
+
+    stats returns the aggregates.  Every record is also passed as an event dict to each sink, such as a
+    LoggingSink or a JsonLinesSink, or any callable.  Only one Instrumentation runs at a time.  Timings of nested
+    calls are inclusive, so a measurement that calls another counts its time too. """
+
+    def __init__(self, sinks: Iterable[Sink] = (), profile: bool = False, trace_memory: bool = False):
+        self.sinks = list(sinks)
+        self.profile = cProfile.Profile() if profile else None
+        self.trace_memory = trace_memory
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._started_tracing = False
+        self._memory = None
+        self._cache_start = {}
+        self._start = None
+        self._end = None
+        self.reset()
+
+    def start(self) -> 'Instrumentation':
+        if state.active is self:
+            return self
+        if state.active is not None:
+            raise ValueError('Another Instrumentation is already running')
+        self._cache_start = self._cache_counts()
+        self._start = time.perf_counter()
+        self._end = None
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if self.profile:
+            self.profile.enable()
+        state.active = self
+        return self
+
+    def stop(self) -> None:
+        if state.active is not self:
+            return
+        state.active = None
+        self._end = time.perf_counter()
+        if self.profile:
+            self.profile.disable()
+        if self.trace_memory and tracemalloc.is_tracing():
+            self._memory = self._traced_memory()
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+        self._cache_end = self._cache_counts()
+
+    def __enter__(self) -> 'Instrumentation':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def reset(self) -> None:
+        """ Drops the aggregates recorded so far. """
+        with self._lock:
+            self._calls = {'measurement': {}, 'intermediate': {}}
+            self._parse = {'docs': 0, 'tokens': 0, 'seconds': 0.0}
+            self._model_loads = []
+        self._cache_start = self._cache_counts()
+        self._cache_end = None
+
+    def call(self, kind: str, name: str, compute: Callable[[], Any], text=None) -> Any:
+        """ Runs compute() and records it as a call of the named measurement or intermediate on text. """
+        local = self._local
+        outer = getattr(local, 'parse', 0.0)
+        local.parse = 0.0
+        start = time.perf_counter()
+        try:
+            result = compute()
+        except BaseException as e:
+            self._finish(kind, name, start, outer, text, type(e).__name__)
+            raise
+        self._finish(kind, name, start, outer, text, None)
+        return result
+
+    def parsed(self, seconds: float, tokens: int) -> None:
+        """ Records the parse of a document. """
+        local = self._local
+        local.parse = getattr(local, 'parse', 0.0) + seconds
+        with self._lock:
+            self._parse['docs'] += 1
+            self._parse['tokens'] += tokens
+            self._parse['seconds'] += seconds
+
+    def pipe(self, docs: Iterator) -> Iterator:
+        """ Records the parse of every Doc of a Model.pipe stream, as it is produced. """
+        docs = iter(docs)
+        while True:
+            start = time.perf_counter()
+            try:
+                doc = next(docs)
+            except StopIteration:
+                return
+            self.parsed(time.perf_counter() - start, len(doc))
+            yield doc
+
+    def model_loaded(self, model_id: str, seconds: float) -> None:
+        event = {'event': 'model_load', 'model_id': model_id, 'seconds': seconds}
+        with self._lock:
+            self._model_loads.append(event)
+        self._emit(event)
+
+    def stats(self) -> Dict[str, Any]:
+        """ Aggregates of everything recorded: per measurement and per intermediate the calls, errors, seconds
+        (total, parsing and computation), mean seconds and tokens; the documents, tokens and seconds parsed; model
+        loads; cache hits and misses since the start; and memory use when traced. """
+        with self._lock:
+            stats = {kind + 's': {name: dict(entry, mean_seconds=entry['seconds'] / entry['calls'])
+                                  for name, entry in calls.items()}
+                     for kind, calls in self._calls.items()}
+            stats['parse'] = dict(self._parse)
+            stats['model_loads'] = list(self._model_loads)
+        end = self._end if self._end is not None else time.perf_counter()
+        stats['elapsed_seconds'] = end - self._start if self._start is not None else 0.0
+        counts = self._cache_end if self._cache_end is not None else self._cache_counts()
+        stats['caches'] = {}
+        for cache, (hits, misses) in counts.items():
+            hits -= self._cache_start.get(cache, (0, 0))[0]
+            misses -= self._cache_start.get(cache, (0, 0))[1]
+            lookups = hits + misses
+            stats['caches'][cache] = {'hits': hits, 'misses': misses, 'hit_rate': hits / lookups if lookups else 0.0}
+        if self.trace_memory:
+            stats['memory'] = self._memory if state.active is not self else self._traced_memory()
+        return stats
+
+    def profile_stats(self, sort: str = 'cumulative') -> pstats.Stats:
+        """ The cProfile profile, for Instrumentation(profile=True). """
+        if self.profile is None:
+            raise ValueError('Profiling was not enabled')
+        return pstats.Stats(self.profile).sort_stats(sort)
+
+    def _finish(self, kind: str, name: str, start: float, outer: float, text, error: Optional[str]) -> None:
+        seconds = time.perf_counter() - start
+        local = self._local
+        parse = local.parse
+        # The enclosing call, if any, spent this parse time too
+        local.parse = outer + parse
+        summary = getattr(text, '_summary', None)
+        tokens = len(summary.token_lengths) if summary is not None else 0
+        with self._lock:
+            entry = self._calls[kind].get(name)
+            if entry is None:
+                entry = self._calls[kind][name] = {'calls': 0, 'errors': 0, 'seconds': 0.0, 'parse_seconds': 0.0,
+                                                   'compute_seconds': 0.0, 'tokens': 0}
+            entry['calls'] += 1
+            entry['errors'] += error is not None
+            entry['seconds'] += seconds
+            entry['parse_seconds'] += parse
+            entry['compute_seconds'] += seconds - parse
+            entry['tokens'] += tokens
+        self._emit({'event': kind, 'name': name, 'seconds': seconds, 'parse_seconds': parse,
+                    'compute_seconds': seconds - parse, 'tokens': tokens, 'error': error})
+
+    def _emit(self, event: Event) -> None:
+        for sink in self.sinks:
+            sink(event)
+
+    @staticmethod
+    def _cache_counts() -> Dict[str, tuple]:
+        from .common import model_pool, vocabulary_cache
+        counts = {'vocabulary': (vocabulary_cache.hits, vocabulary_cache.misses)}
+        doc_caches = [model.doc_cache for model in model_pool.models() if model.doc_cache is not None]
+        counts['doc'] = (sum(c.hits for c in doc_caches), sum(c.misses for c in doc_caches))
+        return counts
+
+    @staticmethod
+    def _traced_memory() -> Dict[str, int]:
+        current, peak = tracemalloc.get_traced_memory()
+        return {'current_bytes': current, 'peak_bytes': peak}
+
+
+def instrument(sinks: Iterable[Sink] = (), profile: bool = False, trace_memory: bool = False) -> Instrumentation:
+    """ Starts instrumentation, for use as ``with instrument() as instrumentation: ...``. """
+    return Instrumentation(sinks, profile, trace_memory).start()
+
+
+class LoggingSink(object):
+    """ Logs every event as JSON to a logger, at the given level. """
+
+    def __init__(self, logger: Union[str, logging.Logger] = 'stylometrist', level: int = logging.INFO):
+        self.logger = logging.getLogger(logger) if isinstance(logger, str) else logger
+        self.level = level
+
+    def __call__(self, event: Event) -> None:
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, '%s', json.dumps(event))
+
+
+class JsonLinesSink(object):
+    """ Appends every event as a line of JSON to a file, given as a path or an open text file.  Lines are flushed
+    as they are written, so the file can be followed while measurements run. """
+
+    def __init__(self, file: Union[str, os.PathLike, TextIO]):
+        self._owned = not hasattr(file, 'write')
+        self.file = open(file, 'a', encoding='utf-8') if self._owned else file
+        self._lock = threading.Lock()
+
+    def __call__(self, event: Event) -> None:
+        line = json.dumps(event) + '\n'
+        with self._lock:
+            self.file.write(line)
+            self.file.flush()
+
+    def close(self) -> None:
+        if self._owned:
+            self.file.close()
+
+    def __enter__(self) -> 'JsonLinesSink':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
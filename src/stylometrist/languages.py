@@ -0,0 +1,79 @@
+""" Language tags of texts, for routing every text of a mixed-language corpus to the pipeline of its language.
+
+detect_language is a small detector without dependencies: texts in a script used by one language (Greek, Hebrew,
+Hangul and so on) are told apart by their letters, and texts in the Latin and Cyrillic scripts by the most common
+words of every language.  It is meant for texts of a few sentences or more; a better detector, such as a fastText
+model, can be given to ModelRouter instead. """
+from collections import Counter
+from typing import Dict, Optional, Tuple
+import re
+
+# The spaCy pipeline of every language that has a trained one
+LANGUAGE_MODELS: Dict[str, str] = {
+    'ca': 'ca_core_news_sm', 'da': 'da_core_news_sm', 'de': 'de_core_news_sm', 'el': 'el_core_news_sm',
+    'en': 'en_core_web_sm', 'es': 'es_core_news_sm', 'fi': 'fi_core_news_sm', 'fr': 'fr_core_news_sm',
+    'hr': 'hr_core_news_sm', 'it': 'it_core_news_sm', 'ja': 'ja_core_news_sm', 'ko': 'ko_core_news_sm',
+    'lt': 'lt_core_news_sm', 'mk': 'mk_core_news_sm', 'nb': 'nb_core_news_sm', 'nl': 'nl_core_news_sm',
+    'pl': 'pl_core_news_sm', 'pt': 'pt_core_news_sm', 'ro': 'ro_core_news_sm', 'ru': 'ru_core_news_sm',
+    'sl': 'sl_core_news_sm', 'sv': 'sv_core_news_sm', 'uk': 'uk_core_news_sm', 'zh': 'zh_core_web_sm',
+}
+
+# Code point ranges of scripts that identify a language (Han is claimed by Japanese if there is any kana)
+SCRIPTS: Tuple[Tuple[int, int, str], ...] = (
+    (0x0370, 0x03FF, 'el'), (0x1F00, 0x1FFF, 'el'), (0x0590, 0x05FF, 'he'), (0x0600, 0x06FF, 'ar'),
+    (0x0900, 0x097F, 'hi'), (0x0E00, 0x0E7F, 'th'), (0x3040, 0x30FF, 'ja'), (0xAC00, 0xD7AF, 'ko'),
+    (0x4E00, 0x9FFF, 'zh'),
+)
+LATIN, CYRILLIC = 'latin', 'cyrillic'
+
+# The most common words of languages that share a script
+COMMON_WORDS: Dict[str, Dict[str, frozenset]] = {
+    LATIN: {
+        'en': frozenset('the of and to in is that it was for with as his on be at by this had not are but'.split()),
+        'de': frozenset('der die und in den von zu das mit sich des auf für ist im dem nicht ein eine als'.split()),
+        'fr': frozenset('de la le et les des en un du une que est pour qui dans par sur pas au avec il ne'.split()),
+        'es': frozenset('de la que el en y los del se las por un para con no una su al es lo como'.split()),
+        'it': frozenset('di e il la che in un per del non una sono le si con da al della gli ha'.split()),
+        'nl': frozenset('de en van het een in is dat op te zijn met voor niet die aan er ook als bij'.split()),
+        'pt': frozenset('de a o que e do da em um para com não uma os no se na por mais as dos'.split()),
+    },
+    CYRILLIC: {
+        'ru': frozenset('и в не на что я с он как а то все она так его но да ты к у же вы за бы по'.split()),
+        'uk': frozenset('і в не на що я з він як а та це вона так його але ти до у ж ви за би по'.split()),
+    },
+}
+
+WORD_PATTERN = re.compile(r'[^\W\d_]+')
+
+# Characters of a text looked at, from its start
+SAMPLE_SIZE = 4096
+
+
+def script_of(character: str) -> Optional[str]:
+    """ The language a character's script identifies, LATIN or CYRILLIC for the shared scripts, or None. """
+    c = ord(character)
+    if c < 0x0250:
+        return LATIN if character.isalpha() else None
+    if 0x0400 <= c <= 0x04FF:
+        return CYRILLIC
+    for start, end, lang in SCRIPTS:
+        if start <= c <= end:
+            return lang
+    return None
+
+
+def detect_language(text: str, default: str = None) -> Optional[str]:
+    """ The language tag of a text, such as 'en' or 'el', or default if it cannot be told. """
+    sample = text[:SAMPLE_SIZE]
+    scripts = Counter(script for script in map(script_of, sample) if script)
+    if not scripts:
+        return default
+    if scripts['ja'] and scripts['zh']:
+        scripts['ja'] += scripts.pop('zh')
+    script = scripts.most_common(1)[0][0]
+    if script not in COMMON_WORDS:
+        return script
+    words = Counter(WORD_PATTERN.findall(sample.lower()))
+    scores = {lang: sum(words[w] for w in common) for lang, common in COMMON_WORDS[script].items()}
+    lang, score = max(scores.items(), key=lambda item: item[1])
+    return lang if score else default
@@ -0,0 +1,50 @@
+from types import ModuleType
+import importlib
+import sys
+import threading
+
+_modules = {}
+_lock = threading.RLock()
+
+
+class LazyModule(ModuleType):
+    """ Stand-in for a module that is imported on first attribute access, such as spaCy, which takes about a second
+    to import.  Once imported, the module's namespace is copied into the stand-in and it becomes a plain module, so
+    later attribute lookups cost the same as on the module itself.  The stand-in is not put in sys.modules, so a
+    plain import of the module elsewhere is unaffected. """
+
+    def __getattr__(self, name: str):
+        module = _load(self)
+        try:
+            return getattr(module, name)
+        except AttributeError:
+            raise AttributeError(f'module {self.__name__!r} has no attribute {name!r}') from None
+
+    def __repr__(self):
+        return f'<lazy module {self.__name__!r}>'
+
+
+def lazy_module(name: str) -> LazyModule:
+    """ The stand-in for the named module, shared by every module that asks for it. """
+    with _lock:
+        module = _modules.get(name)
+        if module is None:
+            module = _modules[name] = LazyModule(name)
+        return module
+
+
+def loaded(module: ModuleType) -> bool:
+    """ Whether a module, or the module behind a stand-in, has been imported, here or by anyone else. """
+    return not isinstance(module, LazyModule) or module.__name__ in sys.modules
+
+
+def _load(stand_in: LazyModule) -> ModuleType:
+    # Imports happen under the import lock anyway, so a single lock costs nothing and keeps threads from seeing a
+    # half-copied namespace
+    with _lock:
+        module = importlib.import_module(stand_in.__name__)
+        if isinstance(stand_in, LazyModule):
+            vars(stand_in).update(module.__dict__)
+            # A class with __getattr__ slows down every attribute lookup, not only the missing ones
+            stand_in.__class__ = ModuleType
+        return module
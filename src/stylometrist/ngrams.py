@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Iterable, Iterator, Union
+
+from .characters import LAST_COMBINING, combining_flags, strip_combining
+from .common import Summary, Text
+from .decorators import as_text, measurement
+from .lazy import lazy_module, loaded
+
+if TYPE_CHECKING:
+    import numpy as np
+    from spacy.tokens import Doc
+else:
+    np = lazy_module('numpy')
+spacy = lazy_module('spacy')
+
+DEFAULT_WIDTH = 2 ** 14
+# Code points (or tokens of a Doc) hashed at a time, which bounds the memory used while counting
+CHUNK_SIZE = 2 ** 16
+
+# Multiplier of the rolling hash, and the constants of the MurmurHash3 finalizer that spreads it over the buckets
+# (made NumPy uint64 scalars where they are used, so that NumPy is only imported then)
+_MULTIPLIER = 0x100000001B3
+_SALT = 0x9E3779B97F4A7C15
+_MIX_1 = 0xFF51AFD7ED558CCD
+_MIX_2 = 0xC4CEB9FE1A85EC53
+_SHIFT = 33
+
+
+class NgramCounter(object):
+    """ Counts the n-grams of a sequence of symbols (code points or word ids) for every n from n_min to n_max,
+    hashed into width buckets, so memory does not grow with the number of distinct n-grams.  The sequence can be fed
+    in any number of chunks: the last n_max - 1 symbols are carried over, so n-grams across chunk boundaries are
+    counted exactly once and the counts do not depend on where the sequence is split.  Hashes are computed with
+    NumPy for a whole chunk at once and are the same in every process. """
+
+    def __init__(self, n_min: int = 1, n_max: int = 3, width: int = DEFAULT_WIDTH):
+        if not 1 <= n_min <= n_max:
+            raise ValueError('n-gram sizes must satisfy 1 <= n_min <= n_max')
+        if width < 1:
+            raise ValueError('The width must be positive')
+        self.n_min = n_min
+        self.n_max = n_max
+        self.width = width
+        self.counts = np.zeros(width, dtype=np.int64)
+        self._carry = np.empty(0, dtype=np.uint64)
+
+    def update(self, symbols) -> 'NgramCounter':
+        symbols = np.asarray(symbols, dtype=np.uint64)
+        if not len(symbols):
+            return self
+        sequence = np.concatenate((self._carry, symbols))
+        carried = len(self._carry)
+        multiplier = np.uint64(_MULTIPLIER)
+        hashes = sequence
+        with np.errstate(over='ignore'):
+            for n in range(1, self.n_max + 1):
+                if n > 1:
+                    # Hash of the n-gram at every start position, from the (n - 1)-gram hashes; arithmetic wraps
+                    hashes = hashes[:-1] * multiplier + sequence[n - 1:]
+                if n >= self.n_min and len(hashes):
+                    # Only n-grams that end in the new symbols, the others were counted with the previous chunk
+                    new = hashes[max(carried - n + 1, 0):]
+                    self.counts += np.bincount(bucket(new, n, self.width), minlength=self.width)
+        self._carry = sequence[len(sequence) - min(self.n_max - 1, len(sequence)):]
+        return self
+
+    def reset(self) -> None:
+        self.counts[:] = 0
+        self._carry = np.empty(0, dtype=np.uint64)
+
+
+def bucket(hashes: np.ndarray, n: int, width: int) -> np.ndarray:
+    """ Bucket of every n-gram hash: the size of the n-gram is mixed in, so n-grams of different sizes made of the
+    same symbols hash apart. """
+    shift = np.uint64(_SHIFT)
+    with np.errstate(over='ignore'):
+        h = hashes + np.uint64(_SALT) * np.uint64(n)
+        h ^= h >> shift
+        h *= np.uint64(_MIX_1)
+        h ^= h >> shift
+        h *= np.uint64(_MIX_2)
+        h ^= h >> shift
+    return (h % np.uint64(width)).astype(np.int64)
+
+
+def code_points(string: str, exclude_combining: bool = True) -> np.ndarray:
+    """ Code points of a string, without combining characters (as word_length counts them) unless asked for. """
+    points = np.frombuffer(string.encode('utf-32-le'), dtype='<u4')
+    if exclude_combining and not string.isascii():
+        flags = combining_flags()
+        points = points[~flags[np.minimum(points, LAST_COMBINING - 1)] | (points >= LAST_COMBINING)]
+    return points
+
+
+def character_ngram_bucket(ngram: str, width: int = DEFAULT_WIDTH, exclude_combining: bool = True) -> int:
+    """ The bucket the character n-gram is counted in, to tell what the columns of count vectors stand for. """
+    points = code_points(ngram, exclude_combining)
+    counter = NgramCounter(len(points), len(points), width).update(points)
+    return int(np.flatnonzero(counter.counts)[0])
+
+
+def word_ngram_bucket(words: Iterable[str], width: int = DEFAULT_WIDTH, exclude_combining: bool = True) -> int:
+    """ The bucket the word n-gram is counted in. """
+    ids = [spacy.strings.hash_string(strip_combining(w) if exclude_combining else w) for w in words]
+    counter = NgramCounter(len(ids), len(ids), width).update(ids)
+    return int(np.flatnonzero(counter.counts)[0])
+
+
+def character_ngram_counts(source: Union[str, Doc, Iterable[str]], n_min: int = 1, n_max: int = 3,
+                           width: int = DEFAULT_WIDTH, exclude_combining: bool = True,
+                           chunk_size: int = CHUNK_SIZE) -> np.ndarray:
+    """ Hashed counts of the character n-grams of a string, of the text of a Doc, or of a stream of strings that
+    are counted as one text, such as the blocks of a file read with f.read(size).  Combining characters are left out
+    unless exclude_combining is False, as in word_length.  The source is hashed chunk_size characters (or tokens of
+    a Doc) at a time, so memory use does not depend on its length. """
+    counter = NgramCounter(n_min, n_max, width)
+    for chunk in _character_chunks(source, chunk_size):
+        counter.update(code_points(chunk, exclude_combining))
+    return counter.counts
+
+
+def word_ngram_counts(source: Union[str, Text, Doc, Iterable[Union[str, Text, Doc]]], n_min: int = 1,
+                      n_max: int = 2, width: int = DEFAULT_WIDTH, exclude_combining: bool = True) -> np.ndarray:
+    """ Hashed counts of the word n-grams of a text, or of a stream of texts or Docs that are counted as one text,
+    such as the parsed blocks of a long file.  Only words count (see isword), so n-grams span punctuation.  Words
+    differing only in combining characters are the same word unless exclude_combining is False.  Each text is
+    hashed and dropped before the next one is read. """
+    counter = NgramCounter(n_min, n_max, width)
+    sources = [source] if isinstance(source, (str, Text)) or _is_doc(source) else source
+    for item in sources:
+        summary = Summary.from_doc(item) if _is_doc(item) else as_text(item).summary()
+        counter.update(_word_ids(summary, exclude_combining))
+    return counter.counts
+
+
+@measurement(uses=[])
+def character_ngrams(text: Text, n_min: int = 1, n_max: int = 3, width: int = DEFAULT_WIDTH,
+                     exclude_combining: bool = True) -> np.ndarray:
+    """ Counts of the character n-grams of the text, from n_min up to n_max characters, hashed into a vector of
+    width counts (see character_ngram_bucket).  Excludes combining characters unless exclude_combining is False. """
+    if text.text is None:
+        raise ValueError('Character n-grams need the raw text')
+    return character_ngram_counts(text.text, n_min, n_max, width, exclude_combining)
+
+
+@measurement
+def word_ngrams(text: Text, n_min: int = 1, n_max: int = 2, width: int = DEFAULT_WIDTH,
+                exclude_combining: bool = True) -> np.ndarray:
+    """ Counts of the word n-grams of the text, from n_min up to n_max words, hashed into a vector of width counts
+    (see word_ngram_bucket).  Ignores combining characters unless exclude_combining is False. """
+    return NgramCounter(n_min, n_max, width).update(_word_ids(text.summary(), exclude_combining)).counts
+
+
+def _word_ids(summary: Summary, exclude_combining: bool) -> np.ndarray:
+    """ Ids of the words, with the ids of the words without their combining characters if asked for.  Only the
+    distinct words are looked up. """
+    if not exclude_combining or not len(summary.word_ids):
+        return summary.word_ids
+    unique, inverse = np.unique(summary.word_ids, return_inverse=True)
+    strings = summary.strings
+    hash_string = spacy.strings.hash_string
+    stripped = np.array([hash_string(strip_combining(strings[i])) for i in unique.tolist()], dtype=np.uint64)
+    return stripped[inverse.ravel()]
+
+
+def _character_chunks(source: Union[str, Doc, Iterable[str]], chunk_size: int) -> Iterator[str]:
+    if _is_doc(source):
+        for start in range(0, len(source), chunk_size):
+            yield source[start:start + chunk_size].text_with_ws
+        return
+    for string in [source] if isinstance(source, str) else source:
+        for start in range(0, len(string), chunk_size):
+            yield string[start:start + chunk_size]
+
+
+def _is_doc(source) -> bool:
+    # No Doc can exist before spaCy is imported, by us or by the caller, and a str or a Text need not import it
+    return loaded(spacy) and isinstance(source, spacy.tokens.Doc)
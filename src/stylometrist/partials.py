@@ -0,0 +1,392 @@
+""" Mergeable partial results of measurements, for corpora measured in shards.
+
+A measurement of a corpus cannot be computed from the measurements of its parts: richness measures, averages and
+distributions are normalized, and their normalized values do not add up.  The statistics they are computed from do:
+word counts, histograms of lengths and n-gram counts.  PartialResults holds those statistics for a set of texts;
+the partial results of separate shards merge exactly, and finishing the merged result computes every measurement as
+if the whole corpus had been measured at once.  Statistics are keyed by what they are and the parameters they depend
+on, so measurements that use the same statistic share it: the vocabulary of word counts, for instance, serves
+word_count, every richness measure and word_frequencies. """
+from __future__ import annotations
+
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Sequence, Tuple, Type
+import gzip
+import json
+
+from .common import Text, Vocabulary, counts, distribution, get_vocabulary, get_word_count, range_distribution
+from .frequent_words import vocabulary_frequencies
+from .lazy import lazy_module
+from .ngrams import character_ngrams, word_ngrams
+from .planner import Measurement, Params, Plan, registry
+from .vocabulary_richness import Spectrum
+
+if TYPE_CHECKING:
+    import numpy as np
+else:
+    np = lazy_module('numpy')
+spacy = lazy_module('spacy')
+
+FORMAT_VERSION = 1
+
+# Statistics of this many texts are merged at once, rather than one text at a time
+MERGE_BLOCK = 256
+
+Key = Tuple
+
+
+class Histogram(object):
+    """ Counts of non-negative integers, such as word or sentence lengths, in order of first occurrence.  The
+    distributions of lengths are computed from a histogram, but unlike them, the histograms of separate texts
+    merge exactly. """
+
+    def __init__(self, counts: Counter = None):
+        self.counts = counts if counts is not None else Counter()
+
+    @classmethod
+    def from_values(cls, values) -> 'Histogram':
+        return cls(counts(values))
+
+    @classmethod
+    def merge_all(cls, histograms: Iterable['Histogram']) -> 'Histogram':
+        merged = Counter()
+        for histogram in histograms:
+            merged.update(histogram.counts)
+        return cls(merged)
+
+    @property
+    def total(self) -> int:
+        """ Number of values counted. """
+        return sum(self.counts.values())
+
+    def sum(self) -> int:
+        """ Sum of the values counted. """
+        return sum(value * count for value, count in self.counts.items())
+
+    def mean(self) -> float:
+        """ Mean of the values counted, or NaN for none, like np.mean. """
+        return self.sum() / self.total if self.counts else float('nan')
+
+    def between(self, min_value: int = None, max_value: int = None) -> Counter:
+        """ The counts of values greater than or equal to min_value and less than max_value, if given. """
+        return Counter({value: count for value, count in self.counts.items()
+                        if (min_value is None or value >= min_value) and (max_value is None or value < max_value)})
+
+    def distribution(self, min_value: int = None, max_value: int = None) -> List[Tuple[int, float]]:
+        return distribution(self.between(min_value, max_value))
+
+    def range_distribution(self, interval: int, min_value: int = None,
+                           max_value: int = None) -> List[Tuple[int, int, float]]:
+        """ The distribution in buckets of interval values, as interval_counts counts them. """
+        buckets = Counter()
+        for value, count in self.between(min_value, max_value).items():
+            b = value // interval
+            buckets[(b * interval + 1, (b + 1) * interval)] += count
+        return range_distribution(buckets)
+
+    def to_state(self) -> dict:
+        return {'type': 'histogram', 'values': list(self.counts), 'counts': list(self.counts.values())}
+
+    @classmethod
+    def from_state(cls, state: dict) -> 'Histogram':
+        return cls(Counter(dict(zip(state['values'], state['counts']))))
+
+    def __eq__(self, other):
+        return isinstance(other, Histogram) and list(self.counts.items()) == list(other.counts.items())
+
+    def __repr__(self):
+        return f'Histogram({dict(self.counts)!r})'
+
+
+class Count(object):
+    """ A count that adds up across texts, such as the number of words. """
+
+    def __init__(self, n: int = 0):
+        self.n = n
+
+    @classmethod
+    def merge_all(cls, totals: Iterable['Count']) -> 'Count':
+        return cls(sum(total.n for total in totals))
+
+    def to_state(self) -> dict:
+        return {'type': 'count', 'n': self.n}
+
+    @classmethod
+    def from_state(cls, state: dict) -> 'Count':
+        return cls(state['n'])
+
+    def __eq__(self, other):
+        return isinstance(other, Count) and self.n == other.n
+
+    def __repr__(self):
+        return f'Count({self.n})'
+
+
+class CountVector(object):
+    """ A vector of counts that adds up across texts, such as hashed n-gram counts.  Stored sparsely, since the
+    vector of a single text is mostly zeros. """
+
+    def __init__(self, values):
+        self.values = np.asarray(values, dtype=np.int64)
+
+    @classmethod
+    def merge_all(cls, vectors: Iterable['CountVector']) -> 'CountVector':
+        vectors = list(vectors)
+        return cls(np.sum([v.values for v in vectors], axis=0, dtype=np.int64))
+
+    def to_state(self) -> dict:
+        indices = np.flatnonzero(self.values)
+        return {'type': 'vector', 'size': len(self.values), 'indices': indices.tolist(),
+                'counts': self.values[indices].tolist()}
+
+    @classmethod
+    def from_state(cls, state: dict) -> 'CountVector':
+        values = np.zeros(state['size'], dtype=np.int64)
+        values[np.asarray(state['indices'], dtype=np.int64)] = state['counts']
+        return cls(values)
+
+    def __eq__(self, other):
+        return isinstance(other, CountVector) and np.array_equal(self.values, other.values)
+
+    def __repr__(self):
+        return f'CountVector({self.values!r})'
+
+
+def vocabulary_state(vocabulary: Vocabulary) -> dict:
+    """ The words and counts of a vocabulary; the word ids are StringStore hashes, recomputed when it is read. """
+    strings = vocabulary.strings
+    return {'type': 'vocabulary', 'words': [strings[i] for i in vocabulary.ids.tolist()],
+            'counts': vocabulary.counts.tolist()}
+
+
+def vocabulary_from_state(state: dict) -> Vocabulary:
+    strings = spacy.strings.StringStore()
+    return Vocabulary([strings.add(word) for word in state['words']], state['counts'], strings)
+
+
+# Every statistic: how it is computed from a Text, given the parameters in its key after the statistic's name, and
+# its value for no texts at all
+STATISTICS: Dict[str, Tuple[Callable[..., Any], Callable[..., Any]]] = {
+    'vocabulary': (get_vocabulary, lambda: Vocabulary([], [], spacy.strings.StringStore())),
+    'word_count': (lambda text: Count(get_word_count(text)), Count),
+    'token_lengths': (lambda text: Histogram.from_values(text.summary().token_lengths), Histogram),
+    'sentence_word_counts': (lambda text: Histogram.from_values(text.summary().sentence_word_counts), Histogram),
+    'sentence_lengths': (lambda text, exclude_combining: Histogram.from_values(
+                             text.summary().sentence_lengths(exclude_combining)),
+                         lambda exclude_combining: Histogram()),
+    'character_ngrams': (lambda text, *args: CountVector(character_ngrams(text, *args)),
+                         lambda n_min, n_max, width, exclude_combining: CountVector(np.zeros(width))),
+    'word_ngrams': (lambda text, *args: CountVector(word_ngrams(text, *args)),
+                    lambda n_min, n_max, width, exclude_combining: CountVector(np.zeros(width))),
+}
+
+# Every type of statistic: its merge, and how it is written and read
+TYPES: Dict[str, Tuple[Type, Callable[[Any], dict], Callable[[dict], Any]]] = {
+    'vocabulary': (Vocabulary, vocabulary_state, vocabulary_from_state),
+    'histogram': (Histogram, Histogram.to_state, Histogram.from_state),
+    'count': (Count, Count.to_state, Count.from_state),
+    'vector': (CountVector, CountVector.to_state, CountVector.from_state),
+}
+
+
+def merge(partials: Sequence[Any]) -> Any:
+    """ Merges values of a statistic, in order. """
+    return type(partials[0]).merge_all(partials)
+
+
+def to_state(partial: Any) -> dict:
+    for cls, write, _ in TYPES.values():
+        if isinstance(partial, cls):
+            return write(partial)
+    raise TypeError(f'Not a partial result: {type(partial).__name__}')
+
+
+def from_state(state: dict) -> Any:
+    return TYPES[state['type']][2](state)
+
+
+class Mergeable(object):
+    """ How a measurement is computed from statistics that merge: statistics maps its keyword arguments to the keys
+    of the statistics it needs, and finish computes the measurement from the values of those statistics, in the same
+    order, and its keyword arguments. """
+
+    def __init__(self, statistics: Callable[[Dict[str, Any]], List[Key]], finish: Callable[..., Any]):
+        self.statistics = statistics
+        self.finish = finish
+
+
+def _richness(method: str) -> Mergeable:
+    return Mergeable(lambda kw: [('vocabulary',)],
+                     lambda vocabulary, **kw: getattr(Spectrum.from_vocabulary(vocabulary), method)(**kw))
+
+
+def _ngrams(name: str) -> Mergeable:
+    return Mergeable(lambda kw: [(name, kw['n_min'], kw['n_max'], kw['width'], kw['exclude_combining'])],
+                     lambda vector, **kw: vector.values)
+
+
+def _average_word_length(lengths: Histogram, words: Count) -> float:
+    # Every token has a length, but only words are counted, as average_word_length does
+    return lengths.sum() / words.n if words.n else 0
+
+
+MERGEABLE: Dict[str, Mergeable] = {
+    **{name: _richness(name) for name in ('type_token_ratio', 'yule_k', 'root_type_token_ratio',
+                                          'log_type_token_ratio', 'honore_r', 'sichel_s', 'summer_s', 'get_LN',
+                                          'get_entropy', 'get_W')},
+    'word_frequencies': Mergeable(lambda kw: [('vocabulary',)], vocabulary_frequencies),
+    'character_ngrams': _ngrams('character_ngrams'),
+    'word_ngrams': _ngrams('word_ngrams'),
+    'word_count': Mergeable(lambda kw: [('word_count',)], lambda words: words.n),
+    'average_word_length': Mergeable(lambda kw: [('token_lengths',), ('word_count',)], _average_word_length),
+    'word_length_distribution': Mergeable(lambda kw: [('token_lengths',)],
+                                          lambda lengths, min_length, max_length:
+                                          lengths.distribution(min_length, max_length)),
+    'average_sentence_length_in_words': Mergeable(lambda kw: [('sentence_word_counts',)],
+                                                  lambda lengths: lengths.sum() / lengths.total),
+    'sentence_length_in_words_distribution': Mergeable(lambda kw: [('sentence_word_counts',)],
+                                                       lambda lengths, min_length, max_length:
+                                                       lengths.distribution(min_length, max_length)),
+    'average_sentence_length_in_characters': Mergeable(lambda kw: [('sentence_lengths', kw['exclude_combining'])],
+                                                       lambda lengths, exclude_combining: lengths.mean()),
+    'sentence_length_in_characters_distribution': Mergeable(
+        lambda kw: [('sentence_lengths', kw['exclude_combining'])],
+        lambda lengths, min_length, max_length, interval, exclude_combining:
+        lengths.range_distribution(interval, min_length, max_length)),
+}
+
+
+class PartialResults(object):
+    """ The statistics a set of measurements (every registered measurement by default) are computed from, for the
+    texts added so far.  Partial results of the same measurements and params merge exactly, in order: merging the
+    results of the shards of a corpus in the order of the corpus gives the results of the whole corpus, down to the
+    order of the words and of the distributions.  finish computes the measurements from the statistics.
+
+    Partial results are written as JSON (compressed if the path ends in .gz) to be merged elsewhere, such as on
+    another node of a cluster. """
+
+    def __init__(self, measurements: Iterable[Measurement] = None, params: Params = None):
+        plan = Plan(measurements, params)
+        self.measurements = list(plan.functions)
+        self.params = plan.params
+        unknown = [name for name in self.measurements if name not in MERGEABLE]
+        if unknown:
+            raise ValueError(f'Measurements without partial results: {", ".join(unknown)}')
+        self.plan = plan
+        self.keys = {name: [tuple(key) for key in MERGEABLE[name].statistics(self.kw(name))]
+                     for name in self.measurements}
+        self.statistics: Dict[Key, Any] = {}
+        self.documents = 0
+        self._pending: Dict[Key, List[Any]] = {}
+
+    def kw(self, name: str) -> Dict[str, Any]:
+        """ The keyword arguments of a measurement: its defaults, updated with params. """
+        return dict(registry[name]['params'], **self.params.get(name, {}))
+
+    def add(self, text: Text) -> 'PartialResults':
+        """ Adds the statistics of a text. """
+        for key in self._unique_keys():
+            pending = self._pending.setdefault(key, [])
+            pending.append(STATISTICS[key[0]][0](text, *key[1:]))
+            if len(pending) >= MERGE_BLOCK:
+                self._merge_pending(key)
+        self.documents += 1
+        return self
+
+    def update(self, texts: Iterable[Text]) -> 'PartialResults':
+        for text in texts:
+            self.add(text)
+        return self
+
+    @classmethod
+    def merge_all(cls, results: Iterable['PartialResults']) -> 'PartialResults':
+        """ The partial results of the texts of all of the results, in order. """
+        results = list(results)
+        if not results:
+            raise ValueError('No partial results to merge')
+        first = results[0]
+        for other in results[1:]:
+            if other.measurements != first.measurements or other.keys != first.keys:
+                raise ValueError('Partial results of different measurements or params cannot be merged')
+        merged = cls(first.measurements, first.params)
+        for key in first._unique_keys():
+            values = [value for r in results for value in r._values(key)]
+            if values:
+                merged.statistics[key] = merge(values)
+        merged.documents = sum(r.documents for r in results)
+        return merged
+
+    def merge(self, other: 'PartialResults') -> 'PartialResults':
+        return PartialResults.merge_all([self, other])
+
+    def statistic(self, key: Key) -> Any:
+        """ The merged value of a statistic, which is its value for no texts if none were added. """
+        self._merge_pending(key)
+        if key not in self.statistics:
+            return STATISTICS[key[0]][1](*key[1:])
+        return self.statistics[key]
+
+    def finish(self, catch: Tuple[Type[Exception], ...] = ()) -> Dict[str, Any]:
+        """ Computes every measurement from the statistics, as a dict keyed by measurement name.  A measurement that
+        raises one of the catch exceptions, such as a richness measure of no words, has the exception as its
+        result. """
+        results = {}
+        for name in self.measurements:
+            values = [self.statistic(key) for key in self.keys[name]]
+            try:
+                results[name] = MERGEABLE[name].finish(*values, **self.kw(name))
+            except catch as e:
+                results[name] = e
+        return results
+
+    def to_state(self) -> dict:
+        return {
+            'version': FORMAT_VERSION,
+            'measurements': self.measurements,
+            'params': self.params,
+            'documents': self.documents,
+            'statistics': [{'key': list(key), 'value': to_state(self.statistic(key))}
+                           for key in self._unique_keys() if self._values(key)],
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> 'PartialResults':
+        if state.get('version') != FORMAT_VERSION:
+            raise ValueError(f'Unsupported partial results version: {state.get("version")}')
+        results = cls(state['measurements'], state['params'])
+        results.statistics = {tuple(s['key']): from_state(s['value']) for s in state['statistics']}
+        results.documents = state['documents']
+        return results
+
+    def save(self, path: str) -> None:
+        with (gzip.open(path, 'wt', encoding='utf-8') if path.endswith('.gz') else
+              open(path, 'w', encoding='utf-8')) as f:
+            json.dump(self.to_state(), f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str) -> 'PartialResults':
+        with (gzip.open(path, 'rt', encoding='utf-8') if path.endswith('.gz') else
+              open(path, encoding='utf-8')) as f:
+            return cls.from_state(json.load(f))
+
+    def _unique_keys(self) -> List[Key]:
+        return list(dict.fromkeys(key for keys in self.keys.values() for key in keys))
+
+    def _values(self, key: Key) -> List[Any]:
+        values = [self.statistics[key]] if key in self.statistics else []
+        return values + self._pending.get(key, [])
+
+    def _merge_pending(self, key: Key) -> None:
+        values = self._values(key)
+        if len(values) > 1 or self._pending.get(key):
+            self.statistics[key] = merge(values)
+        self._pending.pop(key, None)
+
+    def __repr__(self):
+        return f'PartialResults(measurements={self.measurements!r}, documents={self.documents})'
+
+
+def partial_results(texts: Iterable[Text], measurements: Iterable[Measurement] = None,
+                    params: Params = None) -> PartialResults:
+    """ The partial results of the measurements of Texts. """
+    return PartialResults(measurements, params).update(texts)
@@ -0,0 +1,120 @@
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple, Type, Union
+
+from .common import Model, ModelRouter, Text, get_model, get_vocabulary, parse_texts, registry
+from .config import Config, DEFAULT_MODEL, TOKEN_STREAM, VOCABULARY, SPECTRUM, SENTENCE_LENGTHS
+from .instrumentation import state
+from .vocabulary_richness import Spectrum
+# Imported so that every measurement is in the registry
+from . import frequent_words, ngrams, sentence_length, vocabulary_richness, word_length
+
+Measurement = Union[str, Callable]
+Params = Dict[str, Dict[str, Any]]
+
+# Every intermediate statistic: the ones it is computed from, and how it is computed from a Text
+INTERMEDIATES: Dict[str, Tuple[Tuple[str, ...], Callable[[Text], Any]]] = {
+    TOKEN_STREAM: ((), lambda text: text.summary()),
+    VOCABULARY: ((TOKEN_STREAM,), get_vocabulary),
+    SPECTRUM: ((VOCABULARY,), lambda text: Spectrum.from_vocabulary(get_vocabulary(text))),
+    SENTENCE_LENGTHS: ((TOKEN_STREAM,), lambda text: text.summary().sentence_word_counts),
+}
+
+
+def resolve_measurements(measurements: Iterable[Measurement]) -> Dict[str, Callable]:
+    """ Maps measurement names, or the decorated measurement functions themselves, to the registered functions. """
+    resolved = {}
+    for m in measurements:
+        name = m if isinstance(m, str) else m.__name__
+        try:
+            resolved[name] = registry[name]['function']
+        except KeyError:
+            raise ValueError(f'Unknown measurement: {name}') from None
+    return resolved
+
+
+class Plan(object):
+    """ Execution plan for a set of measurements (every registered measurement by default).  The plan knows the
+    pipeline components the measurements require, and the intermediate statistics they use, in an order where each
+    comes after the ones it is computed from.  Running the plan on a text computes every intermediate once, then
+    every measurement from them, so a report of many measurements costs little more than its most expensive one.
+
+    params optionally maps a measurement name to the keyword arguments it is called with; the defaults of every
+    measurement are in its registry entry. """
+
+    def __init__(self, measurements: Iterable[Measurement] = None, params: Params = None):
+        self.functions = resolve_measurements(registry.names() if measurements is None else measurements)
+        self.params = params if params else {}
+        for name, kw in self.params.items():
+            if name not in self.functions:
+                raise ValueError(f'Parameters given for a measurement that is not planned: {name}')
+            unknown = set(kw) - set(registry[name]['params'])
+            if unknown:
+                raise ValueError(f'Unknown parameters for {name}: {", ".join(sorted(unknown))}')
+
+        self.requirements = frozenset().union(*(registry[name]['requires'] for name in self.functions))
+        self.intermediates = self._order(set().union(*(registry[name]['uses'] for name in self.functions)))
+
+    def config(self, model=DEFAULT_MODEL, rule_based_sentences: bool = False, **kw) -> Config:
+        """ The configuration that loads only the pipeline components the measurements require. """
+        return Config.for_requirements(self.requirements, model=model, rule_based_sentences=rule_based_sentences,
+                                       **kw)
+
+    def run(self, text: Text, catch: Tuple[Type[Exception], ...] = ()) -> Dict[str, Any]:
+        """ Computes the intermediates, then the measurements of a Text, as a dict keyed by measurement name.  A
+        measurement that raises one of the catch exceptions has the exception as its result, instead of failing the
+        whole run. """
+        for name in self.intermediates:
+            text.intermediate(name, INTERMEDIATES[name][1])
+        if state.active is None and not catch:
+            return {name: f(text=text, **self.params.get(name, {})) for name, f in self.functions.items()}
+        results = {}
+        for name, f in self.functions.items():
+            try:
+                results[name] = self._call(name, f, text)
+            except catch as e:
+                results[name] = e
+        return results
+
+    def _call(self, name: str, f: Callable, text: Text) -> Any:
+        kw = self.params.get(name, {})
+        if state.active is None:
+            return f(text=text, **kw)
+        return state.active.call('measurement', name, lambda: f(text=text, **kw), text)
+
+    def run_many(self, texts: Iterable[str], model: Union[Model, ModelRouter] = None, batch_size: int = 64,
+                 n_process: int = 1) -> Iterator[Dict[str, Any]]:
+        """ Parses the texts in batches, with a pooled model trimmed for the plan unless a model (or a ModelRouter
+        for texts in several languages) is given, and yields the results of every text in input order.  Each Text is
+        dropped once its results are computed. """
+        for text in parse_texts(texts, model, self.config(), batch_size, n_process):
+            yield self.run(text)
+
+    def __repr__(self):
+        return f'Plan(measurements={list(self.functions)!r}, intermediates={self.intermediates!r})'
+
+    @staticmethod
+    def _order(names: Iterable[str]) -> List[str]:
+        """ The intermediates and everything they are computed from, dependencies first. """
+        order = []
+
+        def visit(name):
+            if name in order:
+                return
+            try:
+                dependencies = INTERMEDIATES[name][0]
+            except KeyError:
+                raise ValueError(f'Unknown intermediate: {name}') from None
+            for dependency in dependencies:
+                visit(dependency)
+            order.append(name)
+
+        for name in sorted(names):
+            visit(name)
+        return order
+
+
+def report(text, measurements: Iterable[Measurement] = None, params: Params = None) -> Dict[str, Any]:
+    """ Computes every registered measurement of a text (or the ones given), sharing the intermediates. """
+    plan = Plan(measurements, params)
+    if not isinstance(text, Text):
+        text = Text(str(text), model=get_model(plan.config()))
+    return plan.run(text)
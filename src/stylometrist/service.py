@@ -0,0 +1,171 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Tuple
+import asyncio
+import threading
+
+from .common import Model, Text, get_model
+from .config import MODEL_TOKENIZER
+from .corpus import config_for
+from .planner import Measurement, Plan, resolve_measurements
+
+Params = Dict[str, Dict[str, Any]]
+
+
+class _Request(object):
+    __slots__ = ('text', 'measurements', 'params', 'future')
+
+    def __init__(self, text: str, measurements: Tuple[Measurement, ...], params: Params, future: asyncio.Future):
+        self.text = text
+        self.measurements = measurements
+        self.params = params
+        self.future = future
+
+
+class AsyncAnalyzer(object):
+    """ Computes measurements for an asyncio application without blocking its event loop.
+
+    Requests wait in a queue of at most max_queue texts; once it is full, analyze waits for room, so callers are
+    slowed down instead of piling up work.  A batching task takes requests from the queue as they arrive and groups
+    up to batch_size of them, waiting max_delay seconds after the first one for others to join unless the batch is
+    already full.  Each batch is parsed with one Model.pipe call on a pool of worker threads, so short requests
+    that arrive together share a pipeline call, and at most workers batches are processed at once.  Requests for
+    different measurements are parsed with the model trimmed for them (see corpus.config_for), unless a model is
+    given.
+
+    The analyzer starts with the first request and is stopped with close, or by using it as an async context
+    manager.  spaCy pipelines are not meant to be called from several threads at once, so the workers take turns
+    with each model's pipeline and only compute the measurements concurrently. """
+
+    def __init__(self, model: Model = None, batch_size: int = 64, max_delay: float = 0.005, max_queue: int = 1024,
+                 workers: int = 1, rule_based_sentences: bool = False, tokenizer: str = MODEL_TOKENIZER):
+        self.model = model
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.max_queue = max_queue
+        self.workers = workers
+        self.rule_based_sentences = rule_based_sentences
+        self.tokenizer = tokenizer
+        self.batches = 0
+        self.requests = 0
+
+        self._queue = None
+        self._slots = None
+        self._batcher = None
+        self._executor = None
+        self._pending = set()
+        self._pipe_locks = {}
+        self._pipe_locks_lock = threading.Lock()
+
+    async def analyze(self, text: str, measurements: Iterable[Measurement],
+                      params: Params = None) -> Dict[str, Any]:
+        """ Returns the requested measurements of the text, as a dict keyed by measurement name.  params optionally
+        maps a measurement name to the keyword arguments it is called with. """
+        measurements = tuple(resolve_measurements(measurements))
+        self._start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_Request(str(text), measurements, params if params else {}, future))
+        return await future
+
+    async def analyze_many(self, texts: Iterable[str], measurements: Iterable[Measurement],
+                           params: Params = None) -> List[Dict[str, Any]]:
+        """ Analyzes every text concurrently and returns the results in input order. """
+        measurements = tuple(measurements)
+        return list(await asyncio.gather(*(self.analyze(text, measurements, params) for text in texts)))
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def close(self) -> None:
+        """ Waits for every queued request to be answered, then stops the batching task and the workers. """
+        if self._batcher is None:
+            return
+        await self._queue.join()
+        if self._pending:
+            await asyncio.gather(*self._pending)
+        self._batcher.cancel()
+        try:
+            await self._batcher
+        except asyncio.CancelledError:
+            pass
+        self._executor.shutdown(wait=True)
+        self._batcher = self._executor = self._queue = self._slots = None
+
+    async def __aenter__(self) -> 'AsyncAnalyzer':
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    def _start(self) -> None:
+        if self._batcher is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._slots = asyncio.Semaphore(self.workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='stylometrist')
+        self._batcher = asyncio.get_running_loop().create_task(self._batch_requests())
+
+    async def _batch_requests(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            # Wait for a free worker before collecting a batch, so that requests keep queueing up meanwhile
+            await self._slots.acquire()
+            batch = [await self._queue.get()]
+            self._drain(batch)
+            if len(batch) < self.batch_size and self.max_delay > 0:
+                # Give requests that arrive together with the first one the chance to join its batch
+                await asyncio.sleep(self.max_delay)
+                self._drain(batch)
+            self.batches += 1
+            self.requests += len(batch)
+            task = loop.create_task(self._process(batch))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    def _drain(self, batch: List[_Request]) -> None:
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+    async def _process(self, batch: List[_Request]) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            groups = {}
+            for request in batch:
+                groups.setdefault(request.measurements, []).append(request)
+            for measurements, requests in groups.items():
+                try:
+                    results = await loop.run_in_executor(self._executor, self._run, measurements, requests)
+                except Exception as e:
+                    results = [e] * len(requests)
+                for request, result in zip(requests, results):
+                    if request.future.done():
+                        continue
+                    if isinstance(result, Exception):
+                        request.future.set_exception(result)
+                    else:
+                        request.future.set_result(result)
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+            self._slots.release()
+
+    def _run(self, measurements: Tuple[Measurement, ...], requests: List[_Request]) -> List[Any]:
+        """ Parses the texts of a group in one pipe call and computes their measurements, in a worker thread.  A
+        measurement that fails only fails its own request. """
+        model = self.model
+        if not model:
+            model = get_model(config_for(measurements, rule_based_sentences=self.rule_based_sentences,
+                                         tokenizer=self.tokenizer))
+        results = []
+        with self._pipe_lock(model):
+            docs = list(model.pipe([request.text for request in requests], batch_size=len(requests)))
+        for request, doc in zip(requests, docs):
+            try:
+                results.append(Plan(measurements, request.params).run(Text(request.text, model=model, doc=doc)))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def _pipe_lock(self, model: Model) -> threading.Lock:
+        with self._pipe_locks_lock:
+            return self._pipe_locks.setdefault(model, threading.Lock())
@@ -0,0 +1,209 @@
+""" Measures a corpus in shards and merges their partial results into the results of the whole corpus.
+
+The input files (see cli.input_files) are split into contiguous shards in sorted order, so that merging the shards
+in order reads the corpus in order.  Every shard is measured in its own process, and its partial results (see
+partials) are either returned to the driver or written to a directory.  On a cluster with a shared filesystem,
+every node maps its own shard of the same inputs into the same directory::
+
+    stylometrist-shards map corpus/ --shard 3 --shards 16 -d /shared/run -m word_count,honore_r
+
+and the results are reduced from the directory once all of the shards are there::
+
+    stylometrist-shards reduce /shared/run
+
+On one machine, run maps the shards in a pool of processes and reduces them.  Reducing fails if a shard is missing
+or was measured with other measurements or params, since the results would not be those of the corpus. """
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence, TextIO
+import argparse
+import json
+import os
+import re
+import sys
+
+from .attribution import UNDEFINED
+from .cli import default_measurements, drop_unwritable, input_files, list_measurements, read_documents, split_errors, \
+    to_json
+from .common import parse_texts
+from .config import DEFAULT_MODEL, TOKENIZERS
+from .partials import PartialResults
+from .planner import Params
+
+SHARD_FILE = 'shard-{shard:05d}-of-{shards:05d}.json.gz'
+SHARD_PATTERN = re.compile(r'shard-(\d+)-of-(\d+)\.json\.gz$')
+
+
+def split(items: Sequence, shards: int) -> List[Sequence]:
+    """ Splits items into contiguous shards whose sizes differ by at most one. """
+    if shards < 1:
+        raise ValueError('The number of shards must be positive')
+    size, extra = divmod(len(items), shards)
+    bounds = [i * size + min(i, extra) for i in range(shards + 1)]
+    return [items[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+def shard_files(paths: Iterable[str], shard: int, shards: int) -> List[str]:
+    """ The input files of a shard of the inputs. """
+    if not 0 <= shard < shards:
+        raise ValueError(f'No shard {shard} of {shards}')
+    return split(list(input_files(paths)), shards)[shard]
+
+
+def map_files(files: Sequence[str], measurements: List[str] = None, params: Params = None,
+              model: str = DEFAULT_MODEL, batch_size: int = 64, encoding: str = 'utf-8', text_field: str = 'text',
+              **config) -> PartialResults:
+    """ The partial results of every document of the files.  config holds further keyword arguments of the
+    configuration, such as tokenizer or rule_based_sentences. """
+    results = PartialResults(measurements, params)
+    texts = (text for _, text in read_documents(files, encoding, text_field=text_field))
+    return results.update(parse_texts(texts, config=results.plan.config(model, **config), batch_size=batch_size))
+
+
+def map_shard(paths: Iterable[str], shard: int, shards: int, directory: str, **kw) -> str:
+    """ Measures a shard of the inputs and writes its partial results to the directory, returning the path.  The
+    file is written under a temporary name and renamed, so a reducer never reads a half-written shard. """
+    path = os.path.join(directory, SHARD_FILE.format(shard=shard, shards=shards))
+    results = map_files(shard_files(paths, shard, shards), **kw)
+    os.makedirs(directory, exist_ok=True)
+    temporary = f'{path}.{os.getpid()}.tmp.gz'
+    results.save(temporary)
+    os.replace(temporary, path)
+    return path
+
+
+def shard_paths(directory: str) -> List[str]:
+    """ The shard files of a directory in shard order, after checking that every shard is there. """
+    found = {}
+    for name in os.listdir(directory):
+        match = SHARD_PATTERN.match(name)
+        if match:
+            found[(int(match.group(2)), int(match.group(1)))] = os.path.join(directory, name)
+    totals = {shards for shards, _ in found}
+    if not found:
+        raise ValueError(f'No shards in {directory}')
+    if len(totals) > 1:
+        raise ValueError(f'{directory} holds shards of different runs: of {", ".join(map(str, sorted(totals)))}')
+    shards = totals.pop()
+    missing = [str(shard) for shard in range(shards) if (shards, shard) not in found]
+    if missing:
+        raise ValueError(f'Missing shards of {shards} in {directory}: {", ".join(missing)}')
+    return [found[(shards, shard)] for shard in range(shards)]
+
+
+def reduce(directory: str) -> PartialResults:
+    """ Merges the partial results of every shard in a directory, in shard order. """
+    return PartialResults.merge_all(PartialResults.load(path) for path in shard_paths(directory))
+
+
+def run(paths: Iterable[str], shards: int = None, processes: int = 1, directory: str = None,
+        **kw) -> PartialResults:
+    """ Maps the shards of the inputs in a pool of processes and reduces them, returning the merged partial results
+    (see map_files for the keyword arguments).  There are as many shards as processes unless shards is given.  With
+    a directory, the shard files are written there and then reduced from it, and can be kept. """
+    paths = list(paths)
+    shards = shards if shards else processes
+    if directory is None:
+        blocks = split(list(input_files(paths)), shards)
+        if processes == 1:
+            return PartialResults.merge_all(map_files(files, **kw) for files in blocks)
+        with ProcessPoolExecutor(processes) as executor:
+            states = list(executor.map(_map_state, blocks, [kw] * shards))
+        return PartialResults.merge_all(PartialResults.from_state(state) for state in states)
+
+    if processes == 1:
+        for shard in range(shards):
+            map_shard(paths, shard, shards, directory, **kw)
+    else:
+        with ProcessPoolExecutor(processes) as executor:
+            futures = [executor.submit(map_shard, paths, shard, shards, directory, **kw) for shard in range(shards)]
+            for future in futures:
+                future.result()
+    return reduce(directory)
+
+
+def _map_state(files: Sequence[str], kw: Dict[str, Any]) -> dict:
+    # Plain data crosses the process boundary, rather than objects holding StringStores
+    return map_files(files, **kw).to_state()
+
+
+def parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog='stylometrist-shards', description=__doc__.splitlines()[0])
+    commands = p.add_subparsers(dest='command', required=True)
+
+    def measuring(command: argparse.ArgumentParser) -> None:
+        command.add_argument('inputs', nargs='+', help='Text files, JSON Lines files and directories of them')
+        command.add_argument('-m', '--measurements', help='Comma-separated measurement names (all registered but '
+                                                          'the n-gram vectors by default)')
+        command.add_argument('--params', type=json.loads, default=None, help='Keyword arguments of measurements')
+        command.add_argument('--model', default=DEFAULT_MODEL)
+        command.add_argument('--tokenizer', choices=TOKENIZERS)
+        command.add_argument('--rule-based-sentences', action='store_true')
+        command.add_argument('--batch-size', type=int, default=64)
+        command.add_argument('--encoding', default='utf-8')
+        command.add_argument('--text-field', default='text', help='Field of the text in JSON Lines records')
+
+    map_command = commands.add_parser('map', help='Measure one shard of the inputs into a directory')
+    measuring(map_command)
+    map_command.add_argument('--shard', type=int, required=True, help='The shard to measure, from 0')
+    map_command.add_argument('--shards', type=int, required=True, help='The number of shards')
+    map_command.add_argument('-d', '--directory', required=True, help='Directory of the shard files')
+
+    reduce_command = commands.add_parser('reduce', help='Merge the shards in a directory and print the results')
+    reduce_command.add_argument('directory')
+
+    run_command = commands.add_parser('run', help='Map the shards in local processes, reduce and print the results')
+    measuring(run_command)
+    run_command.add_argument('--shards', type=int, help='The number of shards (the number of processes by default)')
+    run_command.add_argument('-p', '--processes', type=int, default=os.cpu_count() or 1)
+    run_command.add_argument('-d', '--directory', help='Keep the shard files in this directory')
+
+    commands.add_parser('list', help='List the registered measurements')
+    return p
+
+
+def _map_kw(args) -> Dict[str, Any]:
+    kw = {'measurements': args.measurements.split(',') if args.measurements else default_measurements(),
+          'params': args.params, 'model': args.model, 'batch_size': args.batch_size, 'encoding': args.encoding,
+          'text_field': args.text_field, 'rule_based_sentences': args.rule_based_sentences}
+    if args.tokenizer:
+        kw['tokenizer'] = args.tokenizer
+    return kw
+
+
+def print_results(results: PartialResults, file: TextIO = None) -> None:
+    """ Prints the finished results as JSON, with the errors of undefined measurements under "errors".  Results
+    that cannot be written, such as get_W of a whole corpus, which is an integer of millions of digits, are undefined
+    too. """
+    finished, errors = split_errors(results.finish(catch=UNDEFINED))
+    try:
+        line = _results_line(results.documents, finished, errors)
+    except (TypeError, ValueError):
+        line = _results_line(results.documents, *drop_unwritable(finished, errors))
+    print(line, file=file if file else sys.stdout)
+
+
+def _results_line(documents: int, finished: Dict[str, Any], errors: Dict[str, str]) -> str:
+    record = {'documents': documents, **finished}
+    if errors:
+        record['errors'] = errors
+    return to_json(record)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    p = parser()
+    args = p.parse_args(argv)
+    try:
+        if args.command == 'list':
+            list_measurements(sys.stdout)
+        elif args.command == 'map':
+            print(map_shard(args.inputs, args.shard, args.shards, args.directory, **_map_kw(args)))
+        elif args.command == 'reduce':
+            print_results(reduce(args.directory))
+        else:
+            print_results(run(args.inputs, args.shards, args.processes, args.directory, **_map_kw(args)))
+    except ValueError as e:
+        p.exit(2, f'stylometrist-shards: error: {e}\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+from collections import Counter
+from typing import Iterable
+
+from .common import Model, get_model, isword
+from .config import Config, TOKENS
+from .vocabulary_richness import Spectrum
+
+PIECE_SIZE = 100_000
+CHUNK_SIZE = 2 ** 20
+
+
+class VocabularyAccumulator(object):
+    """ Vocabulary of a text that is too large to hold or parse at once.  Text is added in chunks of any size;
+    it is tokenized in pieces of about piece_size characters, cut at whitespace so that no token is split between
+    pieces, and only the word frequencies are kept.  The spectrum, and with it every richness measure, is available
+    at any point, and accumulators built over separate shards of a text can be merged. """
+
+    def __init__(self, model: Model = None, piece_size: int = PIECE_SIZE):
+        self.model = model if model else get_model(Config.for_requirements([TOKENS]))
+        self.piece_size = piece_size
+        self.vocab = Counter()
+        self._pending = ''
+
+    def add(self, chunk: str) -> 'VocabularyAccumulator':
+        """ Adds the next chunk of text.  Text after the last whitespace is held back until more text arrives,
+        unless it grows beyond piece_size. """
+        pending = self._pending + chunk
+        start = 0
+        while len(pending) - start > self.piece_size:
+            end = self._cut(pending, start, start + self.piece_size)
+            self._tokenize(pending[start:end])
+            start = end
+        end = self._cut(pending, start, len(pending))
+        if end > start and end < len(pending):
+            self._tokenize(pending[start:end])
+            start = end
+        self._pending = pending[start:]
+        return self
+
+    def add_all(self, chunks: Iterable[str]) -> 'VocabularyAccumulator':
+        for chunk in chunks:
+            self.add(chunk)
+        return self
+
+    def add_file(self, path, encoding: str = 'utf-8', chunk_size: int = CHUNK_SIZE) -> 'VocabularyAccumulator':
+        """ Adds the contents of a text file, reading chunk_size characters at a time. """
+        with open(path, encoding=encoding) as f:
+            for chunk in iter(lambda: f.read(chunk_size), ''):
+                self.add(chunk)
+        return self.flush()
+
+    def flush(self) -> 'VocabularyAccumulator':
+        """ Tokenizes any text held back, marking the end of the text. """
+        if self._pending:
+            self._tokenize(self._pending)
+            self._pending = ''
+        return self
+
+    def spectrum(self) -> Spectrum:
+        """ Spectrum of everything added so far, including text held back. """
+        vocab = self.vocab
+        if self._pending:
+            vocab = vocab + self._count(self._pending)
+        return Spectrum.from_vocabulary(vocab)
+
+    def merge(self, other: 'VocabularyAccumulator') -> 'VocabularyAccumulator':
+        """ Adds the vocabulary of another accumulator, for example one built over another shard.  Both are flushed
+        first, since their texts are separate. """
+        if self.model.config.tokenizer_key() != other.model.config.tokenizer_key():
+            raise ValueError('Accumulators built with different tokenizers cannot be merged.')
+        self.flush()
+        other.flush()
+        self.vocab.update(other.vocab)
+        return self
+
+    def __iadd__(self, other: 'VocabularyAccumulator') -> 'VocabularyAccumulator':
+        return self.merge(other)
+
+    @property
+    def word_count(self) -> int:
+        return sum(self.vocab.values())
+
+    def _tokenize(self, piece: str) -> None:
+        self.vocab.update(self._count(piece))
+
+    def _count(self, piece: str) -> Counter:
+        return Counter(t.text for t in self.model.nlp(piece) if isword(t.text))
+
+    @staticmethod
+    def _cut(text: str, start: int, end: int) -> int:
+        """ Position just after the last whitespace in text[start:end], or end if there is none. """
+        for i in range(end - 1, start - 1, -1):
+            if text[i].isspace():
+                return i + 1
+        return end
@@ -1,10 +1,92 @@
+from __future__ import annotations
+
+from collections import Counter
 import math
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Union
+
+from .common import Text, Vocabulary, get_vocabulary
+from .config import SPECTRUM
+from .decorators import as_text, measurement
+from .lazy import lazy_module
+
+if TYPE_CHECKING:
+    import numpy as np
+else:
+    np = lazy_module('numpy')
+
+
+class Spectrum(object):
+    """ Frequency spectrum of a text: the number of words :math:`N`, the size of the vocabulary :math:`V` and
+    :math:`V_i`, the number of vocabulary items that appear exactly :math:`i` times, held as an array indexed by
+    :math:`i`.  Every richness measure in this module is a function of the spectrum alone, so it can be computed
+    from any source that yields one, such as a parsed text or a VocabularyAccumulator. """
+
+    def __init__(self, vocab_i):
+        if isinstance(vocab_i, dict):
+            spectrum = np.zeros(max(vocab_i, default=0) + 1, dtype=np.int64)
+            spectrum[list(vocab_i)] = list(vocab_i.values())
+            vocab_i = spectrum
+        self.vocab_i = np.asarray(vocab_i, dtype=np.int64)
+        self._i = np.arange(len(self.vocab_i), dtype=np.int64)
+        self.n = int(self._i @ self.vocab_i)
+        self.v = int(self.vocab_i.sum())
+
+    @classmethod
+    def from_vocabulary(cls, vocab: Union[Vocabulary, Counter]) -> 'Spectrum':
+        """ Spectrum of word frequencies, given as a Vocabulary or a Counter. """
+        counts = vocab.counts if isinstance(vocab, Vocabulary) else np.fromiter(vocab.values(), dtype=np.int64,
+                                                                                 count=len(vocab))
+        return cls(np.bincount(counts, minlength=2))
+
+    @classmethod
+    def from_text(cls, text: Text) -> 'Spectrum':
+        """ Spectrum of the words of the text, computed once per Text and shared by every richness measure. """
+        return as_text(text).intermediate(SPECTRUM, lambda t: cls.from_vocabulary(get_vocabulary(t)))
+
+    @property
+    def prob_i(self) -> Dict[int, float]:
+        """ Share of the vocabulary items that appear exactly i times, for every i that occurs. """
+        return {int(i): int(v) / self.v for i, v in zip(self._i, self.vocab_i) if v}
+
+    def count(self, i: int) -> int:
+        """ :math:`V_i`, the number of vocabulary items that appear exactly i times. """
+        return int(self.vocab_i[i]) if i < len(self.vocab_i) else 0
+
+    def type_token_ratio(self) -> float:
+        return self.v / self.n
+
+    def yule_k(self) -> float:
+        n = self.n
+        return (10_000 * (int(self._i ** 2 @ self.vocab_i) - n)) / n ** 2
+
+    def root_type_token_ratio(self) -> float:
+        return self.v / math.sqrt(self.n)
+
+    def log_type_token_ratio(self, base=10) -> float:
+        return math.log(self.v, base)/math.log(self.n, base)
+
+    def honore_r(self, base=10) -> float:
+        return (100 * math.log(self.n, base))/(1 - self.count(1)/self.v)
+
+    def sichel_s(self) -> float:
+        return self.count(2)/self.v
+
+    def summer_s(self, base=10) -> float:
+        return math.log(math.log(self.v, base))/math.log(math.log(self.n, base), base)
 
-from .common import Text, get_vocabulary_items, get_word_count
-from .decorators import measurement
+    def get_LN(self, base=math.e) -> float:
+        v = self.v
+        return (1 - v**2)/(v**2 * math.log(self.n, base))
 
+    def get_entropy(self, base=math.e) -> float:
+        p = self.vocab_i[self.vocab_i > 0] / self.v
+        return -100 * float(np.sum(p * np.log(p))) / math.log(base)
 
-@measurement
+    def get_W(self, a: int = 0) -> float:
+        return self.n**(self.v - a)
+
+
+@measurement(uses=[SPECTRUM])
 def type_token_ratio(text: Text) -> float:
     """ Type/token ratio (TTR)
 
@@ -26,12 +108,10 @@ def type_token_ratio(text: Text) -> float:
     :rtype: float
 
     """
-    n = get_word_count(text)
-    _, _, _, v = get_vocabulary_items(text)
-    return v / n
+    return Spectrum.from_text(text).type_token_ratio()
 
 
-@measurement
+@measurement(uses=[SPECTRUM])
 def yule_k(text: Text) -> float:
     """ Yule's K Measure
 
@@ -55,13 +135,10 @@ def yule_k(text: Text) -> float:
 
 
     """
-    n = get_word_count(text)
-    _, vocab_i, _, v = get_vocabulary_items(text)
-    k = (10_000 * (sum(i ** 2 * v for i, v in vocab_i.items()) - n)) / n ** 2
-    return k
+    return Spectrum.from_text(text).yule_k()
 
 
-@measurement
+@measurement(uses=[SPECTRUM])
 def root_type_token_ratio(text: Text) -> float:
     """ Guiraud’s root type/token ratio (RTTR)
 
@@ -78,12 +155,10 @@ def root_type_token_ratio(text: Text) -> float:
     in the text.
 
     """
-    n = get_word_count(text)
-    _, _, _, v = get_vocabulary_items(text)
-    return v / math.sqrt(n)
+    return Spectrum.from_text(text).root_type_token_ratio()
 
 
-@measurement
+@measurement(uses=[SPECTRUM])
 def log_type_token_ratio(text: Text, base=10) -> float:
     """ Herdan’s log type/token ratio (LTTR)
 
@@ -102,12 +177,10 @@ def log_type_token_ratio(text: Text, base=10) -> float:
     in the text.
 
     """
-    n = get_word_count(text)
-    _, _, _, v = get_vocabulary_items(text)
-    return math.log(v, base)/math.log(n, base)
+    return Spectrum.from_text(text).log_type_token_ratio(base)
 
 
-@measurement
+@measurement(uses=[SPECTRUM])
 def honore_r(text: Text, base=10) -> float:
     """ Honore's R Measure
 
@@ -136,12 +209,10 @@ def honore_r(text: Text, base=10) -> float:
 
     """
 
-    n = get_word_count(text)
-    _, vocab_i, _, v = get_vocabulary_items(text)
-    return (100 * math.log(n, base))/(1 - vocab_i[1]/v)
+    return Spectrum.from_text(text).honore_r(base)
 
 
-@measurement
+@measurement(uses=[SPECTRUM])
 def sichel_s(text: Text) -> float:
     """Sichel's S Measure
 
@@ -159,11 +230,10 @@ def sichel_s(text: Text) -> float:
     Where $V$ is the size of the vocabulary (unique words in the text) and $V_2$ is the number of vocabulary
     items that appear exactly $2$ time. """
 
-    _, vocab_i, _, v = get_vocabulary_items(text)
-    return vocab_i[2]/v
+    return Spectrum.from_text(text).sichel_s()
 
 
-@measurement
+@measurement(uses=[SPECTRUM])
 def summer_s(text: Text, base=10) -> float:
     """ Summer's S Measure
 
@@ -181,42 +251,38 @@ def summer_s(text: Text, base=10) -> float:
     Where $V$ is the size of the vocabulary (unique words in the text) and $N$ is the total number of words
     in the text. """
 
-    n = get_word_count(text)
-    _, _, _, v = get_vocabulary_items(text)
-    return math.log(math.log(v, base))/math.log(math.log(n, base), base)
+    return Spectrum.from_text(text).summer_s(base)
 
 
-@measurement
+@measurement(uses=[SPECTRUM])
 def get_LN(text: Text, base=math.e) -> float:
-    n = get_word_count(text)
-    _, _, _, v = get_vocabulary_items(text)
-    return (1 - v**2)/(v**2 * math.log(n, base))
+    return Spectrum.from_text(text).get_LN(base)
 
 
-@measurement
+@measurement(uses=[SPECTRUM])
 def get_entropy(text: Text, base=math.e) -> float:
-    _, _, prob_i,  = get_vocabulary_items(text)
-    return -100 * sum(p * math.log(p, base) for p in prob_i.values())
+    return Spectrum.from_text(text).get_entropy(base)
 
 
-@measurement
+@measurement(uses=[SPECTRUM])
 def get_W(text: Text, a: int = 0) -> float:
-    n = get_word_count(text)
-    _, _, _, v = get_vocabulary_items(text)
-    return n**(v - a)
-
-
-
-
-
-
-
-
-
-
-
+    return Spectrum.from_text(text).get_W(a)
 
 
+RICHNESS_MEASURES = (type_token_ratio, yule_k, root_type_token_ratio, log_type_token_ratio, honore_r, sichel_s,
+                     summer_s, get_LN, get_entropy)
 
 
+def richness_report(text: Text, measures: Iterable[Callable] = RICHNESS_MEASURES) -> Dict[str, float]:
+    """ Computes several vocabulary richness measures of a text at once, with their default parameters.  The
+    text is parsed once and its vocabulary statistics are computed once, then shared through the vocabulary
+    cache.
 
+    :param text: The text to be analyzed
+    :type text: Text
+    :param measures: The measures to compute (all of them except get_W by default)
+    :return: The measures by name
+    :rtype: dict
+    """
+    text = as_text(text)
+    return {m.__name__: m(text) for m in measures}
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+import math
+
+from .common import Text
+from .decorators import as_text
+from .lazy import lazy_module
+
+if TYPE_CHECKING:
+    import numpy as np
+else:
+    np = lazy_module('numpy')
+
+
+class RichnessProfile(object):
+    """ Vocabulary richness over windows of a fixed number of words.  starts holds the word offset of every
+    window, and type_token_ratio, yule_k and honore_r the value of the measure in each window.  mattr is the
+    moving-average type/token ratio: the mean type/token ratio over every window position, one word apart.  A text
+    shorter than the window is treated as a single window over the whole text. """
+
+    def __init__(self, window: int, stride: int, starts: np.ndarray, type_token_ratio: np.ndarray,
+                 yule_k: np.ndarray, honore_r: np.ndarray, mattr: float):
+        self.window = window
+        self.stride = stride
+        self.starts = starts
+        self.type_token_ratio = type_token_ratio
+        self.yule_k = yule_k
+        self.honore_r = honore_r
+        self.mattr = mattr
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+
+def richness_profile(text: Text, window: int = 1000, stride: int = 250, base=10) -> RichnessProfile:
+    """ Computes Type/Token ratio, Yule's K and Honore's R (see vocabulary_richness) over windows of window words,
+    starting every stride words, as well as the moving-average type/token ratio (MATTR).
+
+    The text is tokenized once.  The window then slides one word at a time, and the word frequencies, the
+    frequency spectrum, the vocabulary size and :math:`\\sum_i i^2V_i` are updated for the word that enters and
+    the word that leaves, so the whole profile takes time proportional to the length of the text rather than to
+    its length times the window size.  Honore's R is infinite in windows where every word occurs once.
+
+    :param text: The text to be analyzed
+    :type text: Text
+    :param window: Number of words in a window
+    :type window: int
+    :param stride: Number of words between the starts of consecutive windows
+    :type stride: int
+    :param base: Base of the logarithm in Honore's R (default is 10)
+    :type base: int
+    :return: The profile
+    :rtype: RichnessProfile
+    """
+    if window < 1 or stride < 1:
+        raise ValueError('window and stride must be positive')
+    _, words = np.unique(as_text(text).summary().word_ids, return_inverse=True)
+    if not len(words):
+        raise ValueError('The text has no words')
+    words = words.ravel().tolist()
+    window = min(window, len(words))
+
+    counts = [0] * (max(words) + 1)
+    spectrum = [0] * (window + 2)
+    v = squares = 0
+    ttr_sum = 0.0
+    starts, types, hapaxes, sums = [], [], [], []
+
+    for position, word in enumerate(words):
+        # Add the word entering the window
+        c = counts[word]
+        counts[word] = c + 1
+        if c:
+            spectrum[c] -= 1
+        else:
+            v += 1
+        spectrum[c + 1] += 1
+        squares += 2 * c + 1
+
+        start = position - window + 1
+        if start > 0:
+            # Remove the word leaving the window
+            leaving = words[start - 1]
+            c = counts[leaving]
+            counts[leaving] = c - 1
+            spectrum[c] -= 1
+            if c > 1:
+                spectrum[c - 1] += 1
+            else:
+                v -= 1
+            squares -= 2 * c - 1
+
+        if start >= 0:
+            ttr_sum += v / window
+            if start % stride == 0:
+                starts.append(start)
+                types.append(v)
+                hapaxes.append(spectrum[1])
+                sums.append(squares)
+
+    n = window
+    types = np.array(types, dtype=np.float64)
+    hapaxes = np.array(hapaxes, dtype=np.float64)
+    with np.errstate(divide='ignore'):
+        honore_r = (100 * math.log(n, base)) / (1 - hapaxes / types)
+    return RichnessProfile(window, stride, np.array(starts, dtype=np.int64),
+                           type_token_ratio=types / n,
+                           yule_k=10_000 * (np.array(sums, dtype=np.float64) - n) / n ** 2,
+                           honore_r=honore_r,
+                           mattr=ttr_sum / (len(words) - window + 1))
@@ -1,11 +1,19 @@
-from collections import Counter
-from typing import List, Tuple
+from __future__ import annotations
 
-from .common import Text, isword, word_length, distribution, get_word_count
+from typing import TYPE_CHECKING, List, Tuple
+
+from .common import Text, counts, distribution, get_word_count
+from .config import VOCABULARY
 from .decorators import measurement
+from .lazy import lazy_module
 
+if TYPE_CHECKING:
+    import numpy as np
+else:
+    np = lazy_module('numpy')
 
-@measurement
+
+@measurement(uses=[VOCABULARY])
 def word_count(text: Text) -> int:
     """ Total count of words. """
     return get_word_count(text)
@@ -14,22 +22,14 @@ def word_count(text: Text) -> int:
 @measurement
 def average_word_length(text: Text) -> float:
     """ Total number of digits and graphemes in text divided by the total number of words """
-    total_len = words = 0
-    for token in text.nlp():
-        total_len += word_length(token.text)
-        if isword(token.text):
-            words += 1
+    summary = text.summary()
+    words = summary.word_count
     if words == 0:
         return 0
-    return total_len / words
+    return int(summary.token_lengths.sum(dtype=np.int64)) / words
 
 
 @measurement
 def word_length_distribution(text: Text, min_length: int = 1, max_length: int = 100) -> List[Tuple[int, float]]:
     """ Returns a distribution of word lengths from min_length up to but not including max_length. """
-    dist = Counter()
-    for token in text.nlp():
-        wlen = word_length(token.text)
-        if min_length <= wlen < max_length:
-            dist[wlen] += 1
-    return distribution(dist)
\ No newline at end of file
+    return distribution(counts(text.summary().token_lengths, min_length, max_length))
\ No newline at end of file
@@ -0,0 +1,60 @@
+""" Time to score queries against author profiles with NearestAuthor, against a Python loop over pairs.
+
+Features are random, so only the timings matter: every metric is timed on the blocked NumPy implementation, and
+the loop is timed on a sample of the queries and scaled up to all of them.  Results are printed in seconds and
+written as JSON with --json so that they can be compared across changes.  Run from the repository root::
+
+    python -m tests.benchmarks.bench_attribution [--queries 2000] [--authors 2000] [--json results.json]
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from src.stylometrist.attribution import METRICS, NearestAuthor
+
+
+def loop_delta(queries: np.ndarray, profiles: np.ndarray) -> list:
+    return [[float(np.abs(q - p).mean()) for p in profiles] for q in queries]
+
+
+def seconds(f) -> float:
+    start = time.perf_counter()
+    f()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--authors', type=int, default=2000)
+    parser.add_argument('--features', type=int, default=150)
+    parser.add_argument('--loop-sample', type=int, default=20, help='Queries scored by the Python loop')
+    parser.add_argument('--json', help='Write the results to this file')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    training = rng.normal(size=(args.authors, args.features))
+    queries = rng.normal(size=(args.queries, args.features))
+    authors = np.arange(args.authors)
+
+    results = {}
+    for metric in METRICS:
+        classifier = NearestAuthor(metric).fit(training, authors)
+        results[metric] = seconds(lambda: classifier.predict(queries))
+    classifier = NearestAuthor().fit(training, authors)
+    sample = classifier.standardize(queries[:args.loop_sample])
+    results['delta (Python loop, scaled)'] = seconds(lambda: loop_delta(sample, classifier.profiles)) * \
+        args.queries / len(sample)
+
+    for name, s in results.items():
+        print(f'{name:30s} {s:10.3f} s')
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'queries': args.queries, 'authors': args.authors, 'features': args.features,
+                       'seconds': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
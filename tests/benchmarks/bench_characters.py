@@ -0,0 +1,97 @@
+""" Per-token cost of isword, word_length and sentence_length_in_characters, against their per-character versions.
+
+Cold timings clear the memoized results before every pass, warm timings reuse them, as happens for the recurring
+tokens of a corpus.  Summary.from_doc is timed as well, since it calls both functions for every token.  Results are
+printed in nanoseconds per token (per sentence for sentence_length_in_characters), and written as JSON with
+--json so that they can be compared across changes.  Run from the repository root::
+
+    python -m tests.benchmarks.bench_characters [--json results.json]
+"""
+from unicodedata import combining
+import argparse
+import json
+import time
+
+from src.stylometrist.common import Model, Summary, NUMBER_PATTERN, SENTENCE_ENDING_PATTERN, isword, word_length, \
+    sentence_length_in_characters
+from src.stylometrist.config import Config, SENTENCES
+
+PARAGRAPH = 'This is a very, very, very long sentence that is being used to test sentence distributions. ' \
+            'Here\'s another sentence that is also pretty long.  This is short. This too. I. ' \
+            'That was a really short sentence. Here is one more sentence. ἐν ἀρχῇ ἐποίησεν ὁ θεὸσ. ' \
+            'בְּרֵאשִׁית, בָּרָא אֱלֹהִים, אֵת הַשָּׁמַיִם, וְאֵת הָאָרֶץ. -99.99 +12.34 12/34 abc_123 abc1.'
+
+
+def reference_isword(word: str) -> bool:
+    if word.isalnum():
+        return True
+    if NUMBER_PATTERN.match(word):
+        return True
+    if all(w.isalnum() or combining(w) > 0 for w in word):
+        return True
+    return False
+
+
+def reference_word_length(string: str, exclude_combining: bool = True) -> int:
+    if exclude_combining:
+        return len([s for s in string if s.isalnum() and not combining(s)])
+    return len([s for s in string if s.isalnum()])
+
+
+def reference_sentence_length_in_characters(sent: str, exclude_combining: bool = True) -> int:
+    text = SENTENCE_ENDING_PATTERN.search(sent).group(1)
+    if exclude_combining:
+        text = [t for t in text if not combining(t)]
+    return len(text)
+
+
+def ns_per_item(f, items, repeat: int, clear=None) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        if clear:
+            clear()
+        start = time.perf_counter_ns()
+        for item in items:
+            f(item)
+        best = min(best, time.perf_counter_ns() - start)
+    return best / len(items)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--model', default=Config().model)
+    parser.add_argument('--paragraphs', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', help='Write the results to this file')
+    args = parser.parse_args()
+
+    model = Model(Config.for_requirements([SENTENCES], model=args.model, rule_based_sentences=True))
+    doc = model.nlp(' '.join([PARAGRAPH] * args.paragraphs))
+    tokens = [t.text for t in doc]
+    sentences = [s.text for s in doc.sents]
+
+    def clear():
+        isword.cache_clear()
+        word_length.cache_clear()
+
+    results = {
+        'reference isword': ns_per_item(reference_isword, tokens, args.repeat),
+        'isword (cold)': ns_per_item(isword, tokens, args.repeat, clear),
+        'isword (warm)': ns_per_item(isword, tokens, args.repeat),
+        'reference word_length': ns_per_item(reference_word_length, tokens, args.repeat),
+        'word_length (cold)': ns_per_item(word_length, tokens, args.repeat, clear),
+        'word_length (warm)': ns_per_item(word_length, tokens, args.repeat),
+        'reference sentence_length_in_characters': ns_per_item(reference_sentence_length_in_characters, sentences,
+                                                               args.repeat),
+        'sentence_length_in_characters': ns_per_item(sentence_length_in_characters, sentences, args.repeat),
+        'Summary.from_doc (warm)': ns_per_item(Summary.from_doc, [doc], args.repeat) / len(doc),
+    }
+    for name, ns in results.items():
+        print(f'{name:42s} {ns:10.1f} ns')
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'tokens': len(tokens), 'sentences': len(sentences), 'ns': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
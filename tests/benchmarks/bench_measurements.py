@@ -0,0 +1,230 @@
+""" Times every registered measurement on a generated corpus and writes machine-readable results.
+
+For every measurement the harness reports:
+
+* cold: seconds for a new interpreter to import stylometrist, load the model and measure one document
+* warm: seconds per document with the model loaded, parsing included
+* single: seconds per document that is already parsed, so only the measurement itself
+* batch: documents and tokens per second over the whole corpus with Plan.run_many
+
+together with the model load time, the parse throughput of the corpus, the time per document of the hot paths
+every measurement goes through (Text.nlp, Summary.from_doc, get_vocabulary and get_vocabulary_items) and the peak
+resident set size.  Corpora are generated offline by tests.benchmarks.corpora, so runs with the same arguments
+measure the same documents.  Results are written as JSON with --json; --baseline compares the batch throughput with
+a saved run and exits with status 1 if any measurement got slower by more than --tolerance.  Run from the
+repository root::
+
+    python -m tests.benchmarks.bench_measurements [--documents 200] [--languages en=0.8,el=0.2] [--json out.json]
+"""
+from typing import Any, Dict, List, Optional
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+import spacy
+
+from src.stylometrist.common import Model, Summary, Text, get_vocabulary, get_vocabulary_items, registry, \
+    vocabulary_cache
+from src.stylometrist.config import Config
+from src.stylometrist.planner import Plan
+from tests.benchmarks.corpora import generate, parse_mix
+
+FORMAT_VERSION = 1
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def peak_rss() -> Optional[int]:
+    """ Peak resident set size of this process in bytes, where the platform reports it. """
+    try:
+        import resource
+    except ImportError:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes and macOS bytes
+    return usage if sys.platform == 'darwin' else usage * 1024
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'python': platform.python_version(), 'platform': platform.platform(), 'spacy': spacy.__version__,
+            'numpy': np.__version__, 'commit': commit}
+
+
+def cold_start(name: str, text: str, args) -> Dict[str, Any]:
+    """ Runs a measurement on one document in a new interpreter, timed from its start. """
+    command = [sys.executable, '-m', 'tests.benchmarks.bench_measurements', '--cold-run', name, '--model', args.model]
+    if args.rule_based_sentences:
+        command.append('--rule-based-sentences')
+    start = time.perf_counter()
+    completed = subprocess.run(command, input=text, cwd=ROOT, capture_output=True, text=True, check=True)
+    seconds = time.perf_counter() - start
+    return dict(json.loads(completed.stdout), seconds=seconds)
+
+
+def cold_run(name: str, args) -> None:
+    """ The child side of cold_start: measures the document on stdin and prints its peak RSS. """
+    plan = Plan([name])
+    model = Model(plan.config(args.model, rule_based_sentences=args.rule_based_sentences))
+    plan.run(Text(sys.stdin.read(), model=model))
+    print(json.dumps({'peak_rss': peak_rss()}))
+
+
+def per_document(f, items: List, repeat: int = 1) -> float:
+    """ Best time over repeat passes of f over the items, per item.  Cached vocabularies are dropped first. """
+    best = float('inf')
+    for _ in range(repeat):
+        vocabulary_cache.clear()
+        start = time.perf_counter()
+        for item in items:
+            f(item)
+        best = min(best, time.perf_counter() - start)
+    return best / max(len(items), 1)
+
+
+def benchmark(args) -> Dict[str, Any]:
+    names = args.measurements.split(',') if args.measurements else registry.names()
+    languages = parse_mix(args.languages)
+    corpus = generate(args.documents, args.words, languages, seed=args.seed)
+    texts = [text for _, text in corpus]
+    sample = texts[:args.sample]
+
+    config = Plan(names).config(args.model, rule_based_sentences=args.rule_based_sentences)
+    start = time.perf_counter()
+    model = Model(config).load()
+    model_load = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tokens = 0
+    sample_docs = []
+    for doc in model.pipe(texts, batch_size=args.batch_size):
+        tokens += len(doc)
+        if len(sample_docs) < len(sample):
+            sample_docs.append(doc)
+    parse_seconds = time.perf_counter() - start
+    parsed = list(zip(sample, sample_docs))
+
+    hot_paths = {
+        'Text.nlp': per_document(lambda t: Text(t, model=model).nlp(), sample, args.repeat),
+        'Summary.from_doc': per_document(Summary.from_doc, sample_docs, args.repeat),
+        'get_vocabulary': per_document(lambda p: get_vocabulary(Text(p[0], model=model, doc=p[1])), parsed,
+                                       args.repeat),
+        'get_vocabulary_items': per_document(lambda p: get_vocabulary_items(Text(p[0], model=model, doc=p[1])),
+                                             parsed, args.repeat),
+    }
+
+    measurements = {}
+    for name in names:
+        plan = Plan([name])
+        result = {
+            'warm_seconds': per_document(lambda t: plan.run(Text(t, model=model)), sample),
+            'single_seconds': per_document(lambda p: plan.run(Text(p[0], model=model, doc=p[1])), parsed,
+                                           args.repeat),
+        }
+        vocabulary_cache.clear()
+        start = time.perf_counter()
+        for _ in plan.run_many(texts, model=model, batch_size=args.batch_size):
+            pass
+        seconds = time.perf_counter() - start
+        result.update(batch_seconds=seconds, docs_per_second=len(texts) / seconds, tokens_per_second=tokens / seconds)
+        if args.cold:
+            cold = cold_start(name, texts[0], args)
+            result.update(cold_seconds=cold['seconds'], cold_peak_rss=cold['peak_rss'])
+        measurements[name] = result
+
+    return {
+        'version': FORMAT_VERSION,
+        'environment': environment(),
+        'config': {'model': args.model, 'rule_based_sentences': args.rule_based_sentences,
+                   'batch_size': args.batch_size},
+        'corpus': {'documents': len(texts), 'words': args.words, 'languages': languages, 'seed': args.seed,
+                   'tokens': tokens, 'characters': sum(map(len, texts))},
+        'model_load_seconds': model_load,
+        'parse': {'seconds': parse_seconds, 'docs_per_second': len(texts) / parse_seconds,
+                  'tokens_per_second': tokens / parse_seconds},
+        'hot_paths': hot_paths,
+        'measurements': measurements,
+        'peak_rss': peak_rss(),
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """ Prints the change in batch throughput of every measurement in both runs, and returns the ones that got
+    slower by more than tolerance. """
+    if baseline.get('corpus', {}).get('tokens') != results['corpus']['tokens']:
+        print('The baseline was measured on a different corpus, so throughputs are not comparable')
+    regressions = []
+    for name, result in results['measurements'].items():
+        before = baseline.get('measurements', {}).get(name)
+        if not before:
+            continue
+        ratio = result['docs_per_second'] / before['docs_per_second']
+        flag = ''
+        if ratio < 1 - tolerance:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f'{name:45s} {ratio:8.2f}x{flag}')
+    return regressions
+
+
+def report(results: Dict[str, Any]) -> None:
+    corpus = results['corpus']
+    print(f'{corpus["documents"]} documents, {corpus["tokens"]} tokens, languages {corpus["languages"]}')
+    print(f'model load {results["model_load_seconds"]:.3f} s, parse {results["parse"]["docs_per_second"]:.1f} '
+          f'docs/s {results["parse"]["tokens_per_second"]:.0f} tokens/s')
+    for name, seconds in results['hot_paths'].items():
+        print(f'{name:45s} {seconds * 1000:9.3f} ms/doc')
+    print(f'{"measurement":45s} {"cold s":>8s} {"warm ms":>9s} {"single ms":>9s} {"docs/s":>9s} {"tokens/s":>10s}')
+    for name, r in results['measurements'].items():
+        cold = f'{r["cold_seconds"]:8.3f}' if 'cold_seconds' in r else f'{"-":>8s}'
+        print(f'{name:45s} {cold} {r["warm_seconds"] * 1000:9.3f} {r["single_seconds"] * 1000:9.3f} '
+              f'{r["docs_per_second"]:9.1f} {r["tokens_per_second"]:10.0f}')
+    if results['peak_rss']:
+        print(f'peak RSS {results["peak_rss"] / 2 ** 20:.1f} MiB')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--model', default=Config().model)
+    parser.add_argument('--rule-based-sentences', action='store_true')
+    parser.add_argument('--measurements', help='Comma-separated measurement names (all registered by default)')
+    parser.add_argument('--documents', type=int, default=200)
+    parser.add_argument('--words', type=int, default=300, help='Words per document')
+    parser.add_argument('--languages', default='en', help="Language mix, such as 'en=0.8,el=0.2'")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--sample', type=int, default=20, help='Documents timed one at a time')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-cold', dest='cold', action='store_false', help='Skip the cold start runs')
+    parser.add_argument('--json', help='Write the results to this file')
+    parser.add_argument('--baseline', help='Compare with the results in this file')
+    parser.add_argument('--tolerance', type=float, default=0.1)
+    parser.add_argument('--cold-run', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cold_run:
+        cold_run(args.cold_run, args)
+        return
+
+    results = benchmark(args)
+    report(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+""" Per-call latency of a measurement on short strings, with and without the shared model pool.
+
+Run from the repository root::
+
+    python -m tests.benchmarks.bench_model_pool
+"""
+import argparse
+import time
+
+from src.stylometrist.common import Model, Text, model_pool
+from src.stylometrist.config import Config
+from src.stylometrist.word_length import word_count
+
+SHORT_TEXTS = ['This is a parsing test.', 'Here is one more sentence.', 'ἐν ἀρχῇ ἐποίησεν ὁ θεὸσ τὸν']
+
+
+def per_call_ms(f, repeat: int) -> float:
+    start = time.perf_counter()
+    for i in range(repeat):
+        f(SHORT_TEXTS[i % len(SHORT_TEXTS)])
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--model', default=Config().model)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--cold-repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    config = Config(args.model)
+    model_pool.evict()
+
+    cold = per_call_ms(lambda s: word_count(Text(s, model=Model(config))), args.cold_repeat)
+    model = model_pool.get(config)
+    pooled = per_call_ms(lambda s: word_count(Text(s, model=model_pool.get(config))), args.repeat)
+    parse = per_call_ms(model.nlp, args.repeat)
+
+    print(f'model: {args.model}')
+    print(f'load per call:     {cold:10.3f} ms/call')
+    print(f'pooled model:      {pooled:10.3f} ms/call')
+    print(f'parse only:        {parse:10.3f} ms/call')
+
+
+if __name__ == '__main__':
+    main()
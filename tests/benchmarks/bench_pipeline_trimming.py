@@ -0,0 +1,50 @@
+""" Documents per second for each trimmed pipeline configuration against the full pipeline.
+
+Run from the repository root::
+
+    python -m tests.benchmarks.bench_pipeline_trimming
+"""
+import argparse
+import time
+
+from src.stylometrist.common import Model
+from src.stylometrist.config import Config, TOKENS, SENTENCES, LEMMAS
+
+PARAGRAPH = 'This is a very, very, very long sentence that is being used to test sentence distributions. ' \
+            'Here\'s another sentence that is also pretty long.  This is short. This too. I. ' \
+            'That was a really short sentence. Here is one more sentence.'
+
+
+def configurations(model: str):
+    return [('full pipeline', Config(model)),
+            ('tokens', Config.for_requirements([TOKENS], model=model)),
+            ('sentences (parser)', Config.for_requirements([SENTENCES], model=model)),
+            ('sentences (sentencizer)', Config.for_requirements([SENTENCES], model=model, rule_based_sentences=True)),
+            ('lemmas', Config.for_requirements([LEMMAS], model=model))]
+
+
+def docs_per_second(model: Model, docs, batch_size: int) -> float:
+    start = time.perf_counter()
+    for _ in model.pipe(docs, batch_size=batch_size):
+        pass
+    return len(docs) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--model', default=Config().model)
+    parser.add_argument('--docs', type=int, default=500)
+    parser.add_argument('--batch-size', type=int, default=64)
+    args = parser.parse_args()
+
+    docs = [PARAGRAPH] * args.docs
+    baseline = None
+    for name, config in configurations(args.model):
+        model = Model(config).load()
+        rate = docs_per_second(model, docs, args.batch_size)
+        baseline = baseline if baseline else rate
+        print(f'{name:25s} {rate:10.1f} docs/s {rate / baseline:6.1f}x  {model._nlp.pipe_names}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+""" Times the start of short-lived processes: importing stylometrist, listing the registry and the first measurement.
+
+Every stage runs in a new interpreter, --repeat times, and the median is reported: the seconds from the start of the
+child's script to the end of the stage, and the seconds the parent waited for the whole process.  The report also
+says whether spaCy or NumPy were imported by the stage, since importing the package and listing the registry should
+import neither; the first measurement loads both, and the model.  Results are written as JSON with --json;
+--baseline compares every stage with a saved run and exits with status 1 if any got slower by more than --tolerance,
+or if a stage that did not import spaCy or NumPy now does.  Run from the repository root::
+
+    python -m tests.benchmarks.bench_startup [--repeat 5] [--json out.json] [--baseline before.json]
+"""
+from typing import Any, Dict, List
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+FORMAT_VERSION = 1
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The code of every stage, run after `start = time.perf_counter()`
+STAGES = {
+    'import': 'import src.stylometrist.planner',
+    'registry': 'from src.stylometrist.planner import registry\n'
+                'registry.names()',
+    'first_measurement': 'from src.stylometrist.word_length import word_count\n'
+                         'word_count("A short text to measure.")',
+}
+REPORT = ('\nimport json, sys\n'
+          'print(json.dumps({"seconds": time.perf_counter() - start, "spacy": "spacy" in sys.modules, '
+          '"numpy": "numpy" in sys.modules}))')
+
+
+def run_stage(code: str) -> Dict[str, Any]:
+    script = 'import time\nstart = time.perf_counter()\n' + code + REPORT
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-c', script], cwd=ROOT, capture_output=True, text=True, check=True)
+    return dict(json.loads(completed.stdout), process_seconds=time.perf_counter() - start)
+
+
+def benchmark(args) -> Dict[str, Any]:
+    stages = {}
+    for name, code in STAGES.items():
+        runs = [run_stage(code) for _ in range(args.repeat)]
+        stages[name] = {'seconds': statistics.median(r['seconds'] for r in runs),
+                        'process_seconds': statistics.median(r['process_seconds'] for r in runs),
+                        'spacy': runs[-1]['spacy'], 'numpy': runs[-1]['numpy']}
+    baseline = [run_stage('pass') for _ in range(args.repeat)]
+    return {
+        'version': FORMAT_VERSION,
+        'python': sys.version.split()[0],
+        'repeat': args.repeat,
+        'interpreter_seconds': statistics.median(r['process_seconds'] for r in baseline),
+        'stages': stages,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """ Prints the change of every stage in both runs, and returns the ones that regressed. """
+    regressions = []
+    for name, stage in results['stages'].items():
+        before = baseline.get('stages', {}).get(name)
+        if not before:
+            continue
+        ratio = stage['seconds'] / before['seconds']
+        flags = []
+        if ratio > 1 + tolerance:
+            flags.append('SLOWER')
+        flags += [f'imports {m}' for m in ('spacy', 'numpy') if stage[m] and not before[m]]
+        if flags:
+            regressions.append(name)
+        print(f'{name:20s} {ratio:8.2f}x  {" ".join(flags)}')
+    return regressions
+
+
+def report(results: Dict[str, Any]) -> None:
+    print(f'interpreter start {results["interpreter_seconds"] * 1000:.1f} ms (median of {results["repeat"]})')
+    print(f'{"stage":20s} {"ms":>9s} {"process ms":>11s}  imports')
+    for name, stage in results['stages'].items():
+        imported = ', '.join(m for m in ('spacy', 'numpy') if stage[m]) or '-'
+        print(f'{name:20s} {stage["seconds"] * 1000:9.1f} {stage["process_seconds"] * 1000:11.1f}  {imported}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', help='Write the results to this file')
+    parser.add_argument('--baseline', help='Compare with the results in this file')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = benchmark(args)
+    report(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+""" Throughput of the blank and regex tokenizers against the model's pipeline, and their agreement with it on words.
+
+Agreement is the share of word tokens (see common.isword) found by both tokenizers, counted per text, and the
+share of texts whose sequence of words is identical.  Texts are read from the given files, one per file, or a
+sample paragraph is used.  Run from the repository root::
+
+    python -m tests.benchmarks.bench_tokenizers [files...]
+"""
+from collections import Counter
+import argparse
+import time
+
+from src.stylometrist.common import Model, isword
+from src.stylometrist.config import Config, TOKENS, MODEL_TOKENIZER, BLANK_TOKENIZER, REGEX_TOKENIZER
+
+PARAGRAPH = 'This is a very, very, very long sentence that is being used to test sentence distributions. ' \
+            'Here\'s another sentence that is also pretty long.  This is short. This too. I. ' \
+            'That was a really short sentence. Here is one more sentence. ἐν ἀρχῇ ἐποίησεν. ' \
+            'We can\'t say (for sure) whether well-known e-mail addresses like someone@example.com, ' \
+            'or $99.99 and -12.5% count.'
+
+
+def words(model: Model, texts):
+    return [[t.text for t in doc if isword(t.text)] for doc in model.pipe(texts)]
+
+
+def agreement(reference, other):
+    found = total = same = 0
+    for a, b in zip(reference, other):
+        found += sum((Counter(a) & Counter(b)).values())
+        total += max(len(a), len(b))
+        same += a == b
+    return found / total if total else 1.0, same / len(reference)
+
+
+def docs_per_second(model: Model, texts, batch_size: int) -> float:
+    start = time.perf_counter()
+    for _ in model.pipe(texts, batch_size=batch_size):
+        pass
+    return len(texts) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('files', nargs='*')
+    parser.add_argument('--model', default=Config().model)
+    parser.add_argument('--docs', type=int, default=500)
+    parser.add_argument('--batch-size', type=int, default=64)
+    args = parser.parse_args()
+
+    if args.files:
+        texts = []
+        for path in args.files:
+            with open(path, encoding='utf-8') as f:
+                texts.append(f.read())
+    else:
+        texts = [PARAGRAPH] * args.docs
+
+    reference = None
+    baseline = None
+    for tokenizer in (MODEL_TOKENIZER, BLANK_TOKENIZER, REGEX_TOKENIZER):
+        model = Model(Config.for_requirements([TOKENS], model=args.model, tokenizer=tokenizer))
+        rate = docs_per_second(model, texts, args.batch_size)
+        baseline = baseline if baseline else rate
+        found = words(model, texts)
+        reference = reference if reference else found
+        word_agreement, text_agreement = agreement(reference, found)
+        print(f'{tokenizer:6s} {rate:10.1f} docs/s {rate / baseline:6.1f}x  '
+              f'words agree {word_agreement:7.2%}  texts agree {text_agreement:7.2%}')
+
+
+if __name__ == '__main__':
+    main()
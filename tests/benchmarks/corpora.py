@@ -0,0 +1,113 @@
+""" Reproducible corpora for the benchmarks, generated offline.
+
+Documents are made of sentences of synthetic words drawn from a Zipfian vocabulary in the alphabet of each language,
+with combining diacritics in Greek and Hebrew and inverted question marks in Spanish, and of short passages of
+public-domain works mixed in at quote_rate.  The same arguments always give the same corpus.
+"""
+from typing import Dict, List, Tuple
+import unicodedata
+
+import numpy as np
+
+# Short passages of public-domain works
+PUBLIC_DOMAIN = {
+    'en': ['It is a truth universally acknowledged, that a single man in possession of a good fortune, must be in '
+           'want of a wife.',
+           'Call me Ishmael.',
+           'It was the best of times, it was the worst of times, it was the age of wisdom, it was the age of '
+           'foolishness.'],
+    'es': ['En un lugar de la Mancha, de cuyo nombre no quiero acordarme, no ha mucho tiempo que vivía un hidalgo '
+           'de los de lanza en astillero, adarga antigua, rocín flaco y galgo corredor.',
+           '¿Qué es la vida? Un frenesí. ¿Qué es la vida? Una ilusión, una sombra, una ficción.'],
+    'el': ['Ἐν ἀρχῇ ἐποίησεν ὁ θεὸς τὸν οὐρανὸν καὶ τὴν γῆν.',
+           'Ἄνδρα μοι ἔννεπε, Μοῦσα, πολύτροπον, ὃς μάλα πολλὰ πλάγχθη.'],
+    'he': ['בְּרֵאשִׁית, בָּרָא אֱלֹהִים, אֵת הַשָּׁמַיִם, וְאֵת הָאָרֶץ.'],
+}
+LANGUAGES = tuple(PUBLIC_DOMAIN)
+
+# Letters of every language, and the combining marks that may follow a letter
+LETTERS = {
+    'en': 'etaoinshrdlcumwfgypbvkjxqz',
+    'es': 'eaosrnidlctumpbgvyqhfzjñxkw',
+    'el': 'αεοιντσρκπμλυηγδωχθφβζξψ',
+    'he': 'אבגדהוזחטיכלמנסעפצקרשת',
+}
+MARKS = {
+    'el': '\u0301\u0300\u0342\u0313\u0314',
+    'he': '\u05b0\u05b4\u05b5\u05b6\u05b7\u05b8\u05b9\u05bb\u05bc',
+}
+MARK_RATE = 0.3
+ZIPF_EXPONENT = 1.07
+
+
+class Vocabulary(object):
+    """ Synthetic words of a language, with Zipfian probabilities by rank. """
+
+    def __init__(self, language: str, size: int, rng: np.random.Generator):
+        letters = LETTERS[language]
+        marks = MARKS.get(language, '')
+        words = set()
+        while len(words) < size:
+            length = int(np.clip(rng.lognormal(1.5, 0.45), 1, 18))
+            word = ''
+            for letter in rng.choice(list(letters), length):
+                word += letter
+                if marks and rng.random() < MARK_RATE:
+                    word += marks[rng.integers(len(marks))]
+            words.add(unicodedata.normalize('NFC', word) if language == 'el' and rng.random() < 0.5 else word)
+        # Shorter words are more frequent; ties are broken by the word, since set order varies between processes
+        self.words = sorted(words, key=lambda w: (len(w), w))
+        probabilities = 1 / np.arange(1, size + 1) ** ZIPF_EXPONENT
+        self.probabilities = probabilities / probabilities.sum()
+
+    def sample(self, n: int, rng: np.random.Generator) -> List[str]:
+        return [self.words[i] for i in rng.choice(len(self.words), n, p=self.probabilities)]
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """ Language shares from a spec such as 'en=0.7,el=0.3' (shares are normalized; a bare language counts 1). """
+    mix = {}
+    for part in spec.split(','):
+        language, _, share = part.strip().partition('=')
+        if language not in PUBLIC_DOMAIN:
+            raise ValueError(f'Unsupported language: {language} (choose from {", ".join(LANGUAGES)})')
+        mix[language] = float(share) if share else 1.0
+    total = sum(mix.values())
+    return {language: share / total for language, share in mix.items()}
+
+
+def generate(documents: int, words: int, languages: Dict[str, float] = None, seed: int = 0,
+             vocabulary_size: int = 5000, quote_rate: float = 0.1) -> List[Tuple[str, str]]:
+    """ (language, text) pairs of documents of about words words each, with languages drawn from the mix. """
+    rng = np.random.default_rng(seed)
+    languages = languages if languages else {'en': 1.0}
+    names = sorted(languages)
+    vocabularies = {language: Vocabulary(language, vocabulary_size, rng) for language in names}
+    shares = np.array([languages[language] for language in names])
+    corpus = []
+    for language in rng.choice(names, documents, p=shares / shares.sum()):
+        corpus.append((str(language), _document(str(language), words, vocabularies[language], quote_rate, rng)))
+    return corpus
+
+
+def _document(language: str, words: int, vocabulary: Vocabulary, quote_rate: float,
+              rng: np.random.Generator) -> str:
+    sentences = []
+    remaining = words
+    while remaining > 0:
+        if rng.random() < quote_rate:
+            sentence = PUBLIC_DOMAIN[language][rng.integers(len(PUBLIC_DOMAIN[language]))]
+            remaining -= len(sentence.split())
+        else:
+            length = min(int(rng.integers(3, 30)), remaining)
+            tokens = vocabulary.sample(length, rng)
+            tokens[0] = tokens[0][:1].upper() + tokens[0][1:]
+            for i in np.flatnonzero(rng.random(length - 1) < 0.08).tolist():
+                tokens[i] += ','
+            ending = str(rng.choice(['.', '?', '!'], p=[0.85, 0.1, 0.05]))
+            sentence = ' '.join(tokens) + ending
+            if ending == '?' and language == 'es':
+                sentence = '¿' + sentence
+            remaining -= length
+        sentences.append(sentence)
+    return ' '.join(sentences)
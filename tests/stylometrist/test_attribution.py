@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+
+from src.stylometrist import sentence_length, vocabulary_richness, word_length
+from src.stylometrist.attribution import FeatureMatrix, NearestAuthor, distribution_bins, feature_matrix
+from src.stylometrist.columnar import ColumnStore
+from src.stylometrist.common import Text, get_model
+from src.stylometrist.config import Config, TOKENS, SENTENCES
+
+texts = [
+    'This is a very, very, very long sentence that is being used to test sentence distributions. Here\'s another '
+    'sentence that is also pretty long.  This is short. This too. I. That was a really short sentence.',
+    'The quick brown fox jumps over the lazy dog. The dog sleeps. The fox runs away into the dark forest.',
+    '',
+]
+
+
+def test_distribution_bins():
+    assert distribution_bins('word_length_distribution', {'min_length': 2, 'max_length': 5}) == \
+           [(2, 'word_length_distribution[2]'), (3, 'word_length_distribution[3]'),
+            (4, 'word_length_distribution[4]')]
+    bins = distribution_bins('sentence_length_in_characters_distribution',
+                             {'min_length': 1, 'max_length': 61, 'interval': 20})
+    assert [key for key, _ in bins] == [(1, 20), (21, 40), (41, 60), (61, 80)]
+    assert bins[1][1] == 'sentence_length_in_characters_distribution[21-40]'
+
+
+def test_feature_matrix():
+    features = feature_matrix(texts, scalars=['average_word_length', 'yule_k', 'average_sentence_length_in_words'],
+                              distributions={'word_length_distribution': {'max_length': 8},
+                                             'sentence_length_in_words_distribution': {'max_length': 30}})
+    assert features.values.shape == (3, 3 + 7 + 29)
+    assert features.columns[:4] == ['average_word_length', 'yule_k', 'average_sentence_length_in_words',
+                                    'word_length_distribution[1]']
+
+    text = Text(texts[0])
+    assert features.column('average_word_length')[0] == word_length.average_word_length(text)
+    assert features.column('yule_k')[1] == vocabulary_richness.yule_k(Text(texts[1]))
+    for length, share in word_length.word_length_distribution(text, max_length=8):
+        assert features.column(f'word_length_distribution[{length}]')[0] == share
+    shares = features.values[0, [c.startswith('sentence_length_in_words') for c in features.columns]]
+    assert shares.sum() == pytest.approx(1)
+    assert dict(sentence_length.sentence_length_in_words_distribution(text, max_length=30)) == \
+           {int(c.split('[')[1][:-1]): v for c, v in zip(features.columns, features.values[0])
+            if c.startswith('sentence_length_in_words') and v}
+    # Measurements that are undefined for the empty text are missing
+    assert features.values[2, 0] == 0
+    assert np.isnan(features.values[2, 1:]).all()
+
+
+def test_feature_matrix_column_store(tmp_path):
+    model = get_model(Config.for_requirements([TOKENS, SENTENCES], rule_based_sentences=True))
+    store = ColumnStore.ingest(tmp_path / 'store', texts[:2], model=model)
+    expected = feature_matrix(texts[:2], model=model)
+    stored = feature_matrix(store)
+    assert stored.columns == expected.columns
+    assert np.allclose(stored.values, expected.values, equal_nan=True)
+
+
+def clusters(authors=5, per_author=20, n_features=30, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(0, 3, (authors, n_features))
+    labels = np.repeat([f'author{i}' for i in range(authors)], per_author)
+    values = centers.repeat(per_author, axis=0) + rng.normal(0, 1, (authors * per_author, n_features))
+    return values, labels
+
+
+@pytest.mark.parametrize('metric', ['delta', 'quadratic', 'cosine'])
+def test_nearest_author(metric):
+    values, labels = clusters()
+    queries, truth = clusters(per_author=10, seed=0)
+    classifier = NearestAuthor(metric).fit(values, labels)
+    assert list(classifier.authors) == [f'author{i}' for i in range(5)]
+    assert (classifier.predict(queries) == truth).mean() > 0.95
+
+    z = classifier.standardize(queries)
+    profiles = classifier.profiles
+    if metric == 'delta':
+        naive = [[np.abs(q - p).mean() for p in profiles] for q in z]
+    elif metric == 'quadratic':
+        naive = [[((q - p) ** 2).mean() for p in profiles] for q in z]
+    else:
+        naive = [[1 - q @ p / np.linalg.norm(q) / np.linalg.norm(p) for p in profiles] for q in z]
+    scores = classifier.scores(queries)
+    assert np.allclose(scores, naive)
+    # Blocks as small as a single query and author give the same scores
+    assert np.allclose(NearestAuthor(metric, block_elements=1).fit(values, labels).scores(queries), scores)
+
+
+def test_nearest_author_profiles():
+    values = np.array([[1.0, 10.0], [3.0, np.nan], [5.0, 30.0], [7.0, 30.0]])
+    classifier = NearestAuthor().fit(FeatureMatrix(values, ['a', 'b']), ['x', 'x', 'y', 'y'])
+    assert np.allclose(classifier.mean, [4, 70 / 3])
+    z = (values - classifier.mean) / classifier.std
+    assert np.allclose(classifier.profiles[0], [z[:2, 0].mean(), z[0, 1] / 2])
+    assert np.allclose(classifier.profiles[1], z[2:].mean(axis=0))
+    # A feature that does not vary is ignored
+    assert np.allclose(NearestAuthor().fit([[1, 2], [1, 4]], ['x', 'y']).standardize([[5, 3]]), [[0, 0]])
+
+
+def test_nearest_author_rank():
+    values, labels = clusters()
+    classifier = NearestAuthor().fit(values, labels)
+    scores = classifier.scores(values[:7])
+    ranked = classifier.rank(values[:7])
+    assert (ranked == np.argsort(scores, axis=1)).all()
+    assert (classifier.rank(values[:7], k=2) == ranked[:, :2]).all()
+    assert (classifier.authors[ranked[:, 0]] == classifier.predict(values[:7])).all()
+
+
+def test_nearest_author_errors():
+    with pytest.raises(ValueError):
+        NearestAuthor('manhattan')
+    with pytest.raises(ValueError):
+        NearestAuthor().predict([[1, 2]])
+    with pytest.raises(ValueError):
+        NearestAuthor().fit([[1, 2]], ['x', 'y'])
@@ -0,0 +1,158 @@
+import csv
+import gzip
+import json
+
+import pytest
+
+from src.stylometrist.cli import _cut_partial_line, drop_unwritable, main, read_documents, split_errors
+
+MEASUREMENTS = 'word_count,honore_r,word_length_distribution'
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    root = tmp_path / 'corpus'
+    (root / 'sub').mkdir(parents=True)
+    (root / 'a.txt').write_text('This is one text. It is short.', encoding='utf-8')
+    with gzip.open(root / 'sub' / 'b.txt.gz', 'wt', encoding='utf-8') as f:
+        f.write('Ἐν ἀρχῇ ἐποίησεν ὁ θεὸς τὸν οὐρανὸν.')
+    (root / 'c.jsonl').write_text('{"id": "r1", "text": "A record. With words."}\n\n'
+                                  '{"text": "No id here, no id."}\n', encoding='utf-8')
+    (root / 'notes.md').write_text('Not an input', encoding='utf-8')
+    return root
+
+
+def read_jsonl(path):
+    return [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+
+
+def test_read_documents(corpus):
+    documents = list(read_documents([str(corpus)]))
+    assert [doc_id for doc_id, _ in documents] == [str(corpus / 'a.txt'), 'r1', f'{corpus / "c.jsonl"}:3',
+                                                   str(corpus / 'sub' / 'b.txt.gz')]
+    assert documents[3][1] == 'Ἐν ἀρχῇ ἐποίησεν ὁ θεὸς τὸν οὐρανὸν.'
+
+
+def test_read_documents_invalid(tmp_path):
+    path = tmp_path / 'bad.jsonl'
+    path.write_text('{"body": "No text field"}\n', encoding='utf-8')
+    with pytest.raises(ValueError, match='bad.jsonl:1'):
+        list(read_documents([str(path)]))
+
+
+def test_jsonl_output(corpus, tmp_path):
+    output = tmp_path / 'out.jsonl'
+    main([str(corpus), '-m', MEASUREMENTS, '-o', str(output), '--batch-size', '2', '-q'])
+    records = read_jsonl(output)
+    assert [r['id'] for r in records][:2] == [str(corpus / 'a.txt'), 'r1']
+    assert records[0]['word_count'] == 7
+    assert records[0]['word_length_distribution'] == [[4, 2 / 7], [2, 3 / 7], [3, 1 / 7], [5, 1 / 7]]
+    # Every word of a short record occurs once, which leaves Honoré's R undefined
+    assert records[1]['honore_r'] is None
+    assert records[1]['errors'] == {'honore_r': 'ZeroDivisionError: float division by zero'}
+    assert 'errors' not in records[0]
+
+
+def test_stdout_and_csv(corpus, tmp_path, capsys):
+    main([str(corpus / 'a.txt'), '-m', MEASUREMENTS, '-q'])
+    assert json.loads(capsys.readouterr().out)['word_count'] == 7
+
+    output = tmp_path / 'out.csv'
+    main([str(corpus), '-m', MEASUREMENTS, '-o', str(output), '-q'])
+    with open(output, encoding='utf-8', newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 4
+    assert rows[0]['word_count'] == '7'
+    assert json.loads(rows[0]['word_length_distribution'])[0] == [4, 2 / 7]
+    assert rows[1]['honore_r'] == '' and 'ZeroDivisionError' in json.loads(rows[1]['errors'])['honore_r']
+
+
+@pytest.mark.parametrize('suffix', ['jsonl', 'csv'])
+def test_resume(corpus, tmp_path, capsys, suffix):
+    output = tmp_path / f'out.{suffix}'
+    main([str(corpus), '-m', MEASUREMENTS, '-o', str(output), '-q'])
+    complete = output.read_text(encoding='utf-8')
+    # An interrupted run: two documents written, and the third cut short
+    lines = complete.splitlines(keepends=True)
+    header = 1 if suffix == 'csv' else 0
+    output.write_text(''.join(lines[:header + 2]) + lines[header + 2][:10], encoding='utf-8')
+
+    main([str(corpus), '-m', MEASUREMENTS, '-o', str(output), '--resume'])
+    assert '2 documents written, 2 skipped' in capsys.readouterr().err
+    assert output.read_text(encoding='utf-8') == complete
+
+    main([str(corpus), '-m', MEASUREMENTS, '-o', str(output), '--resume'])
+    assert '0 documents written, 4 skipped' in capsys.readouterr().err
+    assert output.read_text(encoding='utf-8') == complete
+
+
+def test_resume_other_measurements(corpus, tmp_path, capsys):
+    output = tmp_path / 'out.csv'
+    main([str(corpus), '-m', MEASUREMENTS, '-o', str(output), '-q'])
+    with pytest.raises(SystemExit):
+        main([str(corpus), '-m', 'word_count', '-o', str(output), '--resume', '-q'])
+    assert 'different measurements' in capsys.readouterr().err
+
+
+def test_cut_partial_line(tmp_path):
+    path = tmp_path / 'out.jsonl'
+    path.write_bytes(b'first\n' + b'x' * 100)
+    _cut_partial_line(str(path), block_size=7)
+    assert path.read_bytes() == b'first\n'
+    path.write_bytes(b'no newline')
+    _cut_partial_line(str(path), block_size=3)
+    assert path.read_bytes() == b''
+
+
+def test_list_and_errors(capsys):
+    main(['--list'])
+    assert 'word_count' in capsys.readouterr().out
+    with pytest.raises(SystemExit):
+        main(['missing.txt'])
+    with pytest.raises(SystemExit):
+        main(['--resume', '.'])
+
+
+def test_default_measurements_long_document(tmp_path):
+    # A few thousand distinct words make get_W an integer of thousands of digits
+    words = [f'x{chr(97 + i % 26)}{chr(97 + i // 26 % 26)}{chr(97 + i // 676)}' for i in range(3000)]
+    path = tmp_path / 'long.txt'
+    path.write_text(' '.join(words * 2) + '.', encoding='utf-8')
+    output = tmp_path / 'out.jsonl'
+    main([str(path), '-o', str(output), '-q'])
+    record = read_jsonl(output)[0]
+    assert record['word_count'] == 6000
+    assert record['get_W'] is None and 'OverflowError' in record['errors']['get_W']
+    # The n-gram vectors are left out unless asked for
+    assert 'character_ngrams' not in record and 'word_ngrams' not in record
+
+    output = tmp_path / 'out.csv'
+    main([str(path), '-o', str(output), '-q'])
+    with open(output, encoding='utf-8', newline='') as f:
+        row = next(csv.DictReader(f))
+    assert row['word_count'] == '6000' and row['get_W'] == ''
+
+
+def test_unwritable_results():
+    results, errors = split_errors({'small': 2 ** 63 - 1, 'large': 2 ** 64, 'huge': 10 ** 5000})
+    assert results == {'small': 2 ** 63 - 1, 'large': float(2 ** 64), 'huge': None}
+    assert errors == {'huge': 'OverflowError: int too large to convert to float'}
+    results, errors = drop_unwritable({'set': {1}, 'fine': 1}, {})
+    assert results == {'set': None, 'fine': 1} and 'TypeError' in errors['set']
+
+
+def test_empty_document(tmp_path, recwarn):
+    path = tmp_path / 'empty.txt'
+    path.write_text('', encoding='utf-8')
+    output = tmp_path / 'out.jsonl'
+    main([str(path), '-m', 'word_count,average_sentence_length_in_characters', '-o', str(output), '-q'])
+
+    def reject(constant):
+        raise ValueError(f'{constant} is not JSON')
+
+    record = json.loads(output.read_text(encoding='utf-8'), parse_constant=reject)
+    assert record['word_count'] == 0 and record['average_sentence_length_in_characters'] is None
+    assert record['errors'] == {'average_sentence_length_in_characters': 'ValueError: nan is not a finite number'}
+    assert not [w for w in recwarn if issubclass(w.category, RuntimeWarning)]
+    results, errors = drop_unwritable({'vector': [1.0, float('inf')]}, {})
+    assert results == {'vector': None} and 'ValueError' in errors['vector']
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from src.stylometrist import sentence_length, vocabulary_richness, word_length
+from src.stylometrist.columnar import ColumnStore, ColumnStoreWriter, StoredText
+from src.stylometrist.common import Model, Text, get_model, get_vocabulary_items
+from src.stylometrist.config import Config, TOKENS
+from src.stylometrist.corpus import analyze_many, resolve_measurements
+
+texts = ['This is the first sentence. This is another sentence. ἐν ἀρχῇ ἐποίησεν.',
+         'a a bbb bbb bbb θεὸσ 999.99 eee888 _99999_',
+         '',
+         'The The hello The hello 123 321 $.$.']
+measurements = ['word_count', 'average_word_length', 'word_length_distribution', 'average_sentence_length_in_words',
+                'sentence_length_in_words_distribution', 'yule_k', 'honore_r', 'type_token_ratio']
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ColumnStore.ingest(tmp_path / 'store', texts)
+
+
+def test_column_store_layout(store):
+    assert len(store) == len(texts)
+    assert store.token_offsets[-1] == len(store.columns['word_length'])
+    assert store.columns['is_word'].dtype == bool
+    assert store.columns['type_id'].dtype == np.uint64
+    assert isinstance(store.columns['word_length'], np.memmap)
+    assert store.column('word_length', 2).size == 0
+    reopened = ColumnStore(store.path)
+    assert reopened.id == store.id
+    assert reopened.tokenizer_key == get_model().config.tokenizer_key()
+
+
+def test_column_store_zero_copy(store):
+    summary = store[0].summary()
+    assert np.shares_memory(summary.token_lengths, store.columns['word_length'])
+    assert np.shares_memory(summary.word_flags, store.columns['is_word'])
+    assert np.shares_memory(summary.sentence_lengths(), store.columns['sentence_length'])
+
+
+def test_column_store_parity(store):
+    stored = list(store.analyze(measurements[:3]))
+    assert stored == list(analyze_many(texts, measurements[:3]))
+    nonempty = [texts[0], texts[1], texts[3]]
+    assert [{name: f(store[i]) for name, f in resolve_measurements(measurements).items()} for i in (0, 1, 3)] == \
+           list(analyze_many(nonempty, measurements))
+    assert word_length.word_count(store[2]) == 0
+
+    text = Text(texts[0])
+    for exclude_combining in (True, False):
+        assert sentence_length.average_sentence_length_in_characters(store[0], exclude_combining) == \
+               sentence_length.average_sentence_length_in_characters(text, exclude_combining)
+    assert get_vocabulary_items(store[-1]) == get_vocabulary_items(Text(texts[3]))
+    assert vocabulary_richness.Spectrum.from_text(store[1]).prob_i == \
+           vocabulary_richness.Spectrum.from_text(Text(texts[1])).prob_i
+
+
+def test_column_store_without_sentences(tmp_path):
+    model = Model(Config.for_requirements([TOKENS]))
+    store = ColumnStore.ingest(tmp_path, texts, model=model)
+    assert (store.columns['sentence'] == -1).all()
+    assert word_length.word_count(store[0]) == word_length.word_count(Text(texts[0]))
+    with pytest.raises(ValueError):
+        sentence_length.average_sentence_length_in_words(store[0])
+
+
+def test_stored_text(store):
+    text = store[1]
+    assert isinstance(text, StoredText)
+    assert text.cache_key() != store[0].cache_key()
+    with pytest.raises(ValueError):
+        text.nlp()
+    with pytest.raises(IndexError):
+        store[len(texts)]
+    # Stored texts have every field of a Text
+    assert set(vars(Text('A text'))) <= set(vars(text))
+    assert text.language == store.language == 'en'
+
+
+def test_column_store_writer(tmp_path):
+    model = get_model()
+    with ColumnStoreWriter(tmp_path) as writer:
+        writer.add_all(model.pipe(texts))
+    assert writer.documents == len(texts)
+    store = ColumnStore(tmp_path)
+    assert [word_length.word_count(t) for t in store] == [word_length.word_count(Text(t)) for t in texts]
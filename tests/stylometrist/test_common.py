@@ -1,7 +1,13 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import unicodedata
+
+import numpy as np
 import pytest
 
-from src.stylometrist import common, config
-from src.stylometrist.common import isword, word_length, sentence_length_in_characters, get_vocabulary_items, Text
+from src.stylometrist import characters, common, config
+from src.stylometrist.common import isword, word_length, sentence_length_in_characters, get_vocabulary_items, Text, \
+    ModelPool, ModelRouter, Vocabulary, VocabularyCache, counts, interval_counts, get_vocabulary, vocabulary_cache
 
 
 @pytest.mark.parametrize('text', ['This is a parsing test', 'ἐν ἀρχῇ ἐποίησεν ὁ θεὸσ τὸν'])
@@ -25,6 +31,152 @@ def test_greek_model(text):
         assert token1.text == token2
 
 
+def test_model_pool():
+    pool = ModelPool()
+    assert len(pool) == 0
+    model = pool.get()
+    assert pool.get() is model
+    assert pool.get(config.Config()) is model
+    assert config.Config() in pool
+    assert pool.evict(config.Config()) == 1
+    assert config.Config() not in pool
+    assert pool.get() is not model
+
+
+def test_model_pool_threads():
+    pool = ModelPool()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        models = list(executor.map(lambda _: pool.get(), range(8)))
+    assert all(m is models[0] for m in models)
+    assert len(pool) == 1
+
+
+def test_model_pool_warm_up_and_evict():
+    pool = ModelPool()
+    pool.warm_up(config.Config(), config.Config('el_core_news_sm'))
+    assert len(pool) == 2
+    assert pool.evict() == 2
+    assert len(pool) == 0
+
+
+def test_model_router():
+    router = ModelRouter(models={'el': 'el_core_news_sm'})
+    assert router.loaded() == []
+    english, greek = router.text('The cat sat on the mat.'), router.text('Ἐν ἀρχῇ ἐποίησεν ὁ θεός.')
+    assert (english.language, greek.language) == ('en', 'el')
+    assert greek.model.config.model == 'el_core_news_sm'
+    assert [t.text for t in greek.nlp()][:2] == ['Ἐν', 'ἀρχῇ']
+    assert router.loaded() == ['en', 'el'] and router.nbytes > 0
+    # Given tags win over detection, and languages without a model go to the default
+    assert router.text('The cat sat on the mat.', lang='el').language == 'el'
+    assert router.text('Je ne sais pas ce que je fais.').language == 'en'
+    assert router.route('fr') == 'en' and router.route(None) == 'en'
+
+
+def test_model_router_default_models():
+    # Only the English pipeline is installed here: Russian goes to it instead of failing the stream
+    router = ModelRouter()
+    texts = list(router.parse(['The cat sat on the mat.', 'Мы пошли в магазин и купили хлеб.']))
+    assert [t.language for t in texts] == ['en', 'en']
+    assert router.route('ru') == 'en' and not router.available('ru')
+    assert router.loaded() == ['en']
+
+
+def test_model_router_unloadable(monkeypatch):
+    router = ModelRouter(models={'el': 'no_such_pipeline'})
+    monkeypatch.setitem(router._available, 'el', True)
+    assert router.model('el').config.lang == 'en'
+    assert not router.available('el') and router.route('el') == 'en'
+
+
+@pytest.mark.parametrize('tokenizer', [config.BLANK_TOKENIZER, config.REGEX_TOKENIZER])
+def test_model_router_blank_languages(tokenizer):
+    # Japanese and Thai need tokenizer packages that are not installed here, so they go to the default language
+    router = ModelRouter(config.Config(tokenizer=tokenizer))
+    texts = list(router.parse(['The cat sat on the mat.', 'Ἐν ἀρχῇ ἐποίησεν ὁ θεός.', 'ねこがいます。', 'แมวนั่งบนเสื่อ']))
+    assert [t.language for t in texts] == ['en', 'el', 'en', 'en']
+    assert [len(t.nlp()) > 0 for t in texts] == [True] * 4
+    assert not router.available('ja') and router.route('th') == 'en'
+    assert router.model('ja') is router.model('en')
+
+
+def test_model_router_eviction():
+    router = ModelRouter(models={'el': 'el_core_news_sm'}, max_models=1)
+    english = router.model('en')
+    assert router.model('el') is not english
+    assert router.loaded() == ['el'] and router.evictions == 1
+    assert router.model('en') is not english
+    router = ModelRouter(models={'el': 'el_core_news_sm'}, memory_budget=1)
+    router.model('en')
+    router.model('el')
+    # The pipeline just loaded is kept, even beyond the budget
+    assert router.loaded() == ['el']
+
+
+def test_model_router_parse():
+    router = ModelRouter(models={'el': 'el_core_news_sm'})
+    pipes = []
+    for model in (router.model('en'), router.model('el')):
+        pipe = model.pipe
+        model.pipe = lambda texts, *args, pipe=pipe, **kw: (pipes.append(1), pipe(texts, *args, **kw))[1]
+    inputs = ['One English text.', 'Ἐν ἀρχῇ ἦν ὁ λόγος.', ('Tagged as Greek.', 'el'), 'Another English text.']
+    texts = list(common.parse_texts(inputs, model=router, batch_size=2))
+    assert [t.text for t in texts] == [t if isinstance(t, str) else t[0] for t in inputs]
+    assert [t.language for t in texts] == ['en', 'el', 'el', 'en']
+    assert len(pipes) == 2
+    assert [len(t.nlp()) for t in texts] == [4, 6, 4, 4]
+    assert len(list(router.parse(inputs, group_size=1))) == 4
+
+
+def test_text_uses_shared_model():
+    assert Text('One text').model is Text('Another text').model
+    assert Text('One text').model is common.get_model()
+
+
+def test_text_parses_once(monkeypatch):
+    from src.stylometrist.sentence_length import average_sentence_length_in_words
+    from src.stylometrist.vocabulary_richness import yule_k
+    from src.stylometrist.word_length import word_count, average_word_length
+
+    text = Text('The The hello The hello. 123 321 $.$.')
+    calls = []
+    parse = text.model.nlp
+    monkeypatch.setattr(text.model, 'nlp', lambda s: calls.append(s) or parse(s))
+    word_count(text)
+    average_word_length(text)
+    average_sentence_length_in_words(text)
+    yule_k(text)
+    assert len(calls) == 1
+
+
+def test_text_doc_invalidation():
+    text = Text('The first text')
+    doc = text.nlp()
+    assert text.nlp() is doc
+    text.text = 'The second text'
+    assert text.nlp() is not doc
+    assert text.nlp().text == 'The second text'
+    doc = text.nlp()
+    text.model = common.Model()
+    assert text.nlp() is not doc
+
+
+def test_text_without_doc_cache():
+    text = Text('Parsed every time', cache_doc=False)
+    assert text.nlp() is not text.nlp()
+    assert text.nlp().text == 'Parsed every time'
+
+
+def test_trimmed_models():
+    tokens = common.Model(config.Config.for_requirements([config.TOKENS]))
+    assert tokens.nlp('A tokenizer only. Nothing else.').text == 'A tokenizer only. Nothing else.'
+    assert not tokens._nlp.pipe_names
+
+    sentences = common.Model(config.Config.for_requirements([config.SENTENCES], rule_based_sentences=True))
+    assert sentences._nlp.pipe_names == ['sentencizer']
+    assert len(list(sentences.nlp('One sentence. Two sentences.').sents)) == 2
+
+
 @pytest.mark.parametrize('word, val', [('test', True), ('99', True), ('-100', True), ('99.00', True),
                                        ('-99.99', True), ('+12.34', True), ('12/34', False), ('ἐποίησεν', True),
                                        ('abc_123', False), ('abc1', True)])
@@ -51,11 +203,30 @@ def test_word_length(word: str, val: bool):
                                               False),
                                              ('¿Es el comienzo?', 14, True),
                                              ('¡Al principio!', 12, True),
+                                             ('This is\na test.\n', 14, True),
                                              ])
 def test_sentence_length_in_characters(sent: str, val: int, excl: bool):
     assert sentence_length_in_characters(sent, exclude_combining=excl) == val
 
 
+@pytest.mark.parametrize('word', ['test', '99', '-100', 'ἐποίησεν', 'ἀρχῇ', 'בְּרֵאשִׁית', 'הַשָּׁמַיִם,', 'abc_123',
+                                  '\u0301', '\u0301a', 'e\u0301', '$.$.', '', ' ', '—', 'x\u20dd', '१२३', 'क़'])
+def test_character_tables(word):
+    # The original per-character implementations
+    assert isword(word) == bool(word.isalnum() or common.NUMBER_PATTERN.match(word) or
+                                all(w.isalnum() or unicodedata.combining(w) > 0 for w in word))
+    assert word_length(word) == len([s for s in word if s.isalnum() and not unicodedata.combining(s)])
+    assert word_length(word, exclude_combining=False) == len([s for s in word if s.isalnum()])
+    assert characters.strip_combining(word) == ''.join(w for w in word if not unicodedata.combining(w))
+
+
+def test_token_memoization():
+    isword.cache_clear()
+    isword('memoized')
+    isword('memoized')
+    assert isword.cache_info().hits == 1
+
+
 def test_get_vocabulary_items():
     text = Text('The The hello The hello 123 321 $.$.')
     vocab, vocab_i, prob_i, cnt = get_vocabulary_items(text)
@@ -71,3 +242,80 @@ def test_get_vocabulary_items():
     assert prob_i[3] == prob_i[2] == 0.25
     assert prob_i[1] == 0.50
     assert sum(v for v in prob_i.values()) == 1
+
+
+
+@pytest.mark.parametrize('values, min_value, max_value, result',
+                         [([3, 1, 3, 0, 7, 1, 3], None, None, [(3, 3), (1, 2), (0, 1), (7, 1)]),
+                          ([3, 1, 3, 0, 7, 1, 3], 1, 7, [(3, 3), (1, 2)]),
+                          ([], 1, 100, []),
+                          ([5, 5], 6, 10, [])])
+def test_counts(values, min_value, max_value, result):
+    assert list(counts(values, min_value, max_value).items()) == result
+
+
+def test_interval_counts():
+    assert list(interval_counts([91, 49, 15, 47, 2, 49], 5, 1, 1000).items()) == \
+           [((91, 95), 1), ((46, 50), 3), ((16, 20), 1), ((1, 5), 1)]
+    assert list(interval_counts([91, 49, 15, 47, 2, 49], 2, 10, 50).items()) == \
+           [((49, 50), 2), ((15, 16), 1), ((47, 48), 1)]
+
+
+
+def test_vocabulary_cache_content_addressed():
+    vocabulary_cache.clear()
+    vocabulary = get_vocabulary(Text('The The hello The hello'))
+    assert vocabulary_cache.stats()['misses'] == 1
+    assert get_vocabulary(Text('The The hello The hello')) is vocabulary
+    assert vocabulary_cache.stats()['hits'] == 1
+    get_vocabulary(Text('The The hello The hello', model=common.Model(config.Config('el_core_news_sm'))))
+    assert vocabulary_cache.stats()['misses'] == 2
+
+
+def test_vocabulary_cache_text_change():
+    text = Text('The The hello')
+    assert get_vocabulary_items(text)[3] == 2
+    text.text = 'The hello world again'
+    assert get_vocabulary_items(text)[3] == 4
+
+
+def test_vocabulary_cache_eviction():
+    cache = VocabularyCache(maxsize=2)
+    texts = [Text(s) for s in ('one', 'two two', 'three three three')]
+    for text in texts:
+        cache.put(VocabularyCache.key(text), get_vocabulary(text))
+    assert cache.stats()['entries'] == 2
+    assert cache.get(VocabularyCache.key(texts[0])) is None
+    assert cache.get(VocabularyCache.key(texts[2])) is not None
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+    nbytes = cache.stats()['bytes']
+    cache.configure(max_bytes=nbytes - 1)
+    assert cache.stats()['entries'] == 1
+    assert cache.stats()['bytes'] < nbytes
+
+    cache.configure(maxsize=0)
+    assert cache.stats()['entries'] == 0
+    cache.put(VocabularyCache.key(texts[0]), get_vocabulary(texts[0]))
+    assert cache.stats()['entries'] == 0
+
+
+def test_vocabulary():
+    text = Text('The The hello The hello 123 321 $.$.')
+    vocabulary = get_vocabulary(text)
+    assert len(vocabulary) == 4
+    assert vocabulary.word_count == 7
+    assert vocabulary['The'] == 3
+    assert vocabulary['$.$.'] == 0
+    assert vocabulary.ids.dtype == np.uint64
+    assert vocabulary.ids[0] == text.nlp()[0].orth
+    assert vocabulary.spectrum().tolist() == [0, 2, 1, 1]
+    assert list(vocabulary.to_counter().items()) == [('The', 3), ('hello', 2), ('123', 1), ('321', 1)]
+
+
+def test_vocabulary_from_counter():
+    vocab = Counter({'The': 3, 'hello': 2, '123': 1})
+    vocabulary = Vocabulary.from_counter(vocab)
+    assert vocabulary.to_counter() == vocab
+    assert vocabulary['hello'] == 2
+    assert vocabulary.ids.tolist() == Vocabulary.from_ids([vocabulary.ids[i] for i in (0, 1, 0, 2, 0, 1)]).ids.tolist()
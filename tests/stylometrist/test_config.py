@@ -1,3 +1,5 @@
+import pytest
+
 from src.stylometrist import config
 
 
@@ -10,3 +12,68 @@ def test_config_no_default():
     test_model = 'el_core_news_sm'
     cnf = config.Config(model=test_model)
     assert cnf.model == test_model
+
+
+def test_config_equality():
+    assert config.Config() == config.Config()
+    assert hash(config.Config()) == hash(config.Config())
+    assert config.Config(exclude=['ner', 'parser']) == config.Config(exclude=['parser', 'ner'])
+    assert config.Config() != config.Config('el_core_news_sm')
+    assert config.Config() != config.Config(exclude=['ner'])
+
+
+def test_config_for_requirements():
+    tokens = config.Config.for_requirements([config.TOKENS])
+    assert tokens.model == config.DEFAULT_MODEL
+    assert set(tokens.exclude) == set(config.PIPELINE_COMPONENTS)
+    assert not tokens.sentencizer
+
+    sentences = config.Config.for_requirements([config.TOKENS, config.SENTENCES])
+    assert 'parser' not in sentences.exclude
+    assert 'ner' in sentences.exclude
+    assert not sentences.sentencizer
+
+    rule_based = config.Config.for_requirements([config.SENTENCES], rule_based_sentences=True)
+    assert 'parser' in rule_based.exclude
+    assert rule_based.sentencizer
+
+    lemmas = config.Config.for_requirements([config.LEMMAS], model='el_core_news_sm')
+    assert lemmas.model == 'el_core_news_sm'
+    assert 'lemmatizer' not in lemmas.exclude
+    assert 'parser' in lemmas.exclude
+
+
+def test_config_for_unknown_requirement():
+    with pytest.raises(ValueError):
+        config.Config.for_requirements(['paragraphs'])
+
+
+def test_config_tokenizer():
+    regex = config.Config(tokenizer=config.REGEX_TOKENIZER)
+    blank = config.Config(tokenizer=config.BLANK_TOKENIZER)
+    assert blank.lang == 'en'
+    assert config.Config('el_core_news_sm', tokenizer=config.BLANK_TOKENIZER).lang == 'el'
+    assert regex != config.Config() != blank
+    assert regex.tokenizer_key() != config.Config().tokenizer_key() != blank.tokenizer_key()
+    with pytest.raises(ValueError):
+        config.Config(tokenizer='whitespace')
+
+
+def test_config_for_requirements_tokenizer():
+    tokens = config.Config.for_requirements([config.TOKENS], tokenizer=config.REGEX_TOKENIZER)
+    assert tokens.tokenizer == config.REGEX_TOKENIZER
+    sentences = config.Config.for_requirements([config.SENTENCES], tokenizer=config.BLANK_TOKENIZER,
+                                               rule_based_sentences=True)
+    assert sentences.sentencizer
+    with pytest.raises(ValueError):
+        config.Config.for_requirements([config.SENTENCES], tokenizer=config.BLANK_TOKENIZER)
+    with pytest.raises(ValueError):
+        config.Config.for_requirements([config.LEMMAS], tokenizer=config.REGEX_TOKENIZER)
+
+
+def test_config_for_model():
+    base = config.Config.for_requirements([config.TOKENS], rule_based_sentences=True, doc_cache='cache')
+    greek = base.for_model('el_core_news_sm')
+    assert greek.lang == 'el' and greek.model == 'el_core_news_sm'
+    assert (greek.exclude, greek.sentencizer, greek.doc_cache) == (base.exclude, base.sentencizer, base.doc_cache)
+    assert greek.for_model(base.model) == base
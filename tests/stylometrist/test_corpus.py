@@ -0,0 +1,49 @@
+import pytest
+
+from src.stylometrist.common import Text
+from src.stylometrist.config import Config, SENTENCES, TOKENS
+from src.stylometrist.corpus import Corpus, analyze_many, resolve_measurements, config_for
+from src.stylometrist.sentence_length import average_sentence_length_in_words
+from src.stylometrist.vocabulary_richness import type_token_ratio
+from src.stylometrist.word_length import word_count, word_length_distribution
+
+texts = ['This is the first sentence. This is another sentence.',
+         'a a bbb bbb bbb θεὸσ 999.99 eee888 _99999_',
+         'The The hello The hello 123 321 $.$.']
+
+
+def test_resolve_measurements():
+    functions = resolve_measurements(['word_count', type_token_ratio])
+    assert list(functions) == ['word_count', 'type_token_ratio']
+    with pytest.raises(ValueError):
+        resolve_measurements(['no_such_measurement'])
+
+
+def test_config_for():
+    assert config_for(['word_count', type_token_ratio]) == Config.for_requirements([TOKENS])
+    assert config_for(['word_count', 'average_sentence_length_in_words']) == \
+           Config.for_requirements([TOKENS, SENTENCES])
+    assert config_for([average_sentence_length_in_words], rule_based_sentences=True).sentencizer
+
+
+@pytest.mark.parametrize('batch_size, n_process', [(1, 1), (2, 1), (64, 2)])
+def test_analyze_many(batch_size, n_process):
+    results = list(analyze_many(texts, ['word_count', 'average_sentence_length_in_words', type_token_ratio],
+                                batch_size=batch_size, n_process=n_process))
+    assert len(results) == len(texts)
+    for text, result in zip(texts, results):
+        assert result == {'word_count': word_count(text),
+                          'average_sentence_length_in_words': average_sentence_length_in_words(text),
+                          'type_token_ratio': type_token_ratio(text)}
+
+
+def test_analyze_many_params():
+    result, = analyze_many(texts[1:2], ['word_length_distribution'],
+                           params={'word_length_distribution': {'max_length': 4}})
+    assert result['word_length_distribution'] == word_length_distribution(texts[1], max_length=4)
+
+
+def test_corpus_iteration():
+    parsed = list(Corpus(iter(texts)))
+    assert [t.text for t in parsed] == texts
+    assert all(isinstance(t, Text) for t in parsed)
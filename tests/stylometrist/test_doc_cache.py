@@ -0,0 +1,86 @@
+import os
+
+import pytest
+
+from src.stylometrist.common import Model, Text, get_model
+from src.stylometrist.config import Config
+from src.stylometrist.corpus import analyze_many, config_for
+from src.stylometrist.doc_cache import DocCache
+
+texts = ['This is the first sentence. This is another sentence.',
+         'a a bbb bbb bbb θεὸσ 999.99 eee888 _99999_',
+         'The The hello The hello 123 321 $.$.']
+
+
+def test_doc_cache_roundtrip(tmp_path):
+    model = Model()
+    cache = DocCache(tmp_path)
+    key = cache.key(texts[0], model.model_id)
+    assert cache.get(key, model._nlp.vocab) is None
+    cache.put(key, model.nlp(texts[0]))
+    doc = cache.get(key, model._nlp.vocab)
+    assert [t.text for t in doc] == [t.text for t in model.nlp(texts[0])]
+    assert [s.text for s in doc.sents] == [s.text for s in model.nlp(texts[0]).sents]
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+    assert [s['entries'] for s in (cache.stats(), DocCache(tmp_path).stats())] == [1, 1]
+
+
+def test_doc_cache_shards(tmp_path):
+    model = Model()
+    cache = DocCache(tmp_path)
+    keys = [cache.key(text, model.model_id) for text in texts]
+    cache.put_many(keys[:2], [model.nlp(text) for text in texts[:2]])
+    cache.put(keys[2], model.nlp(texts[2]))
+    assert sorted(path.suffix for path in tmp_path.iterdir()) == ['.index', '.spacy']
+    cache = DocCache(tmp_path)
+    assert cache.stats()['entries'] == len(texts) and cache.stats()['shards'] == 1
+    assert [cache.get(key, model._nlp.vocab).text for key in keys[::-1] + keys[:1]] == texts[::-1] + texts[:1]
+    assert cache.stats()['hits'] == len(texts) + 1
+
+
+def test_doc_cache_keys():
+    assert DocCache.key('text', 'model-1') == DocCache.key('text', 'model-1')
+    assert DocCache.key('text', 'model-1') != DocCache.key('text', 'model-2')
+    assert DocCache.key('text', 'model-1') != DocCache.key('other text', 'model-1')
+
+
+def test_doc_cache_eviction(tmp_path):
+    model = Model()
+    cache = DocCache(tmp_path, shard_bytes=1)
+    for text in texts:
+        cache.put(cache.key(text, model.model_id), model.nlp(text))
+    size = cache.stats()['bytes']
+    cache = DocCache(tmp_path, max_bytes=size - 1)
+    assert cache.stats()['entries'] == cache.stats()['shards'] == len(texts)
+    oldest = cache.key(texts[0], model.model_id)
+    index, = [path for path in tmp_path.glob('*.index') if oldest in path.read_text()]
+    os.utime(index.with_suffix('.spacy'), (0, 0))
+    cache.put(cache.key('One more text', model.model_id), model.nlp('One more text'))
+    assert not cache.has(oldest)
+    assert cache.stats()['bytes'] <= size - 1
+
+
+def test_model_with_doc_cache(tmp_path):
+    model = Model(Config(doc_cache=tmp_path))
+    first = Text(texts[0], model=model).nlp()
+    assert model.doc_cache.stats()['misses'] == 1
+    second = Text(texts[0], model=model).nlp()
+    assert model.doc_cache.stats()['hits'] == 1
+    assert [t.text for t in first] == [t.text for t in second]
+
+
+@pytest.mark.parametrize('n_process', [1, 2])
+def test_pipe_with_doc_cache(tmp_path, n_process):
+    model = Model(Config(doc_cache=tmp_path))
+    model.nlp(texts[1])
+    docs = list(model.pipe(texts + texts[:1], batch_size=2, n_process=n_process))
+    assert [d.text for d in docs] == texts + texts[:1]
+    assert model.doc_cache.stats()['entries'] == len(texts)
+
+
+def test_analyze_many_with_doc_cache(tmp_path):
+    first = list(analyze_many(texts, ['word_count', 'average_sentence_length_in_words'], doc_cache=tmp_path))
+    second = list(analyze_many(texts, ['word_count', 'average_sentence_length_in_words'], doc_cache=tmp_path))
+    assert first == second
+    model = get_model(config_for(['word_count', 'average_sentence_length_in_words'], doc_cache=tmp_path))
+    assert model.doc_cache.stats()['hits'] == len(texts)
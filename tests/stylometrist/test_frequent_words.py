@@ -0,0 +1,106 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from src.stylometrist.columnar import ColumnStore
+from src.stylometrist.common import Text, get_vocabulary
+from src.stylometrist.frequent_words import FUNCTION_WORDS, WordProfiles, word_counts, word_frequencies, \
+    word_profiles
+
+texts = [
+    'The cat sat on the mat. The dog sat too.',
+    'A dog and a cat. The end.',
+    '',
+    'Zebra zebra zebra the.',
+    'It was the best of times, it was the worst of times, it was the age of wisdom.',
+]
+
+
+def frequencies(text: str, lowercase: bool = True) -> Counter:
+    vocab = get_vocabulary(Text(text)).to_counter()
+    total = sum(vocab.values())
+    folded = Counter()
+    for word, count in vocab.items():
+        folded[word.lower() if lowercase else word] += count
+    return Counter({word: count / total for word, count in folded.items()})
+
+
+def test_word_frequencies():
+    results = word_frequencies(texts[0])
+    assert [word for word, _ in results] == list(FUNCTION_WORDS)
+    assert dict(results)['the'] == pytest.approx(3 / 10)
+    assert dict(results)['on'] == pytest.approx(1 / 10)
+    assert dict(word_frequencies(texts[0], words=['The', 'cat'], lowercase=False)) == \
+           pytest.approx({'The': 2 / 10, 'cat': 1 / 10})
+    assert word_frequencies('', words=['the']) == [('the', 0.0)]
+
+
+def test_word_counts():
+    vocabulary = get_vocabulary(Text('The the THE cat'))
+    ids, counts = word_counts(vocabulary)
+    assert sorted(counts.tolist()) == [1, 3]
+    assert Counter({vocabulary.strings[int(i)]: int(c) for i, c in zip(ids, counts)}) == {'the': 3, 'cat': 1}
+    ids, counts = word_counts(vocabulary, lowercase=False)
+    assert len(ids) == 4
+
+
+@pytest.mark.parametrize('lowercase', [True, False])
+def test_word_profiles(lowercase):
+    profiles = word_profiles(texts, n=6, lowercase=lowercase)
+    totals = Counter()
+    for text in texts:
+        for word, count in get_vocabulary(Text(text)).to_counter().items():
+            totals[word.lower() if lowercase else word] += count
+    assert sorted(totals[w] for w in profiles.words) == sorted(totals.values(), reverse=True)[:6][::-1]
+    assert profiles.shape == (5, 6)
+
+    dense = profiles.toarray()
+    for i, text in enumerate(texts):
+        expected = frequencies(text, lowercase)
+        assert dense[i] == pytest.approx(np.array([expected[w] for w in profiles.words], dtype=np.float32))
+        assert profiles[i] == pytest.approx(dense[i])
+    assert profiles.nnz == np.count_nonzero(dense)
+    assert list(profiles.word_counts) == [get_vocabulary(Text(t)).word_count for t in texts]
+
+
+def test_word_profiles_given_words():
+    profiles = word_profiles(texts, words=['The', 'zebra', 'nope'])
+    assert profiles.words == ['the', 'zebra', 'nope']
+    assert profiles.column('the') == pytest.approx([0.3, 1 / 7, 0, 0.25, 3 / 18])
+    assert profiles.column('zebra') == pytest.approx([0, 0, 0, 0.75, 0])
+    assert not profiles.column('nope').any()
+    with pytest.raises(KeyError):
+        profiles.column('cat')
+
+
+def test_word_profiles_slicing():
+    profiles = word_profiles(texts, n=10)
+    dense = profiles.toarray()
+    view = profiles[1:4]
+    assert view.data is profiles.data
+    assert (view.toarray() == dense[1:4]).all()
+    assert (view[1:].toarray() == dense[2:4]).all()
+    assert (view.column(profiles.words[0]) == dense[1:4, 0]).all()
+    assert (view[-1] == dense[3]).all()
+    assert (profiles[[4, 0, 2]].toarray() == dense[[4, 0, 2]]).all()
+    assert (profiles[::2].toarray() == dense[::2]).all()
+    assert (profiles[np.array([True, False, False, True, True])].toarray() == dense[[0, 3, 4]]).all()
+    assert profiles[3:1].shape == (0, 10)
+    with pytest.raises(IndexError):
+        profiles[5]
+
+
+def test_word_profiles_column_store(tmp_path):
+    store = ColumnStore.ingest(tmp_path / 'store', texts)
+    stored = word_profiles(store, n=8)
+    expected = word_profiles(texts, n=8)
+    assert stored.words == expected.words
+    assert (stored.toarray() == expected.toarray()).all()
+
+
+def test_word_profiles_empty():
+    profiles = word_profiles([], n=5)
+    assert profiles.shape == (0, 0)
+    assert isinstance(profiles, WordProfiles)
+    assert word_profiles(['', ''], n=5).toarray().shape == (2, 0)
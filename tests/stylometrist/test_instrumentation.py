@@ -0,0 +1,115 @@
+import io
+import json
+import logging
+
+import pytest
+
+from src.stylometrist.common import Model, Text, get_model, vocabulary_cache
+from src.stylometrist.config import Config, TOKENS
+from src.stylometrist.instrumentation import Instrumentation, JsonLinesSink, LoggingSink, instrument, state
+from src.stylometrist.planner import Plan
+from src.stylometrist.sentence_length import average_sentence_length_in_words
+from src.stylometrist.vocabulary_richness import yule_k
+from src.stylometrist.word_length import average_word_length, word_count
+
+text = 'This is a very, very, very long sentence that is being used to test sentence distributions. Here\'s ' \
+       'another sentence that is also pretty long.  This is short. This too. I. That was a really short sentence.'
+
+
+def test_disabled():
+    assert state.active is None
+    assert word_count(text) == word_count(Text(text))
+
+
+def test_measurement_stats():
+    events = []
+    model = get_model()
+    with instrument(sinks=[events.append]) as instrumentation:
+        assert state.active is instrumentation
+        parsed = Text(text, model=model)
+        average_word_length(parsed)
+        average_word_length(parsed)
+    assert state.active is None
+
+    stats = instrumentation.stats()
+    entry = stats['measurements']['average_word_length']
+    assert entry['calls'] == 2 and entry['errors'] == 0
+    assert entry['tokens'] == 2 * len(parsed.nlp())
+    assert entry['parse_seconds'] > 0
+    assert entry['seconds'] == pytest.approx(entry['parse_seconds'] + entry['compute_seconds'])
+    assert entry['mean_seconds'] == pytest.approx(entry['seconds'] / 2)
+    assert stats['parse'] == {'docs': 1, 'tokens': len(parsed.nlp()), 'seconds': stats['parse']['seconds']}
+
+    first, second = [e for e in events if e['event'] == 'measurement']
+    assert first['name'] == 'average_word_length' and first['parse_seconds'] > 0
+    # The second call reuses the parse
+    assert second['parse_seconds'] == 0
+
+
+def test_errors():
+    with instrument() as instrumentation:
+        with pytest.raises(ZeroDivisionError):
+            average_sentence_length_in_words('')
+    entry = instrumentation.stats()['measurements']['average_sentence_length_in_words']
+    assert entry['calls'] == 1 and entry['errors'] == 1
+
+
+def test_plan_intermediates_and_caches():
+    vocabulary_cache.clear()
+    texts = [text, text, 'Another text.']
+    with instrument() as instrumentation:
+        results = list(Plan(['yule_k', 'word_count']).run_many(texts))
+    assert len(results) == 3
+    stats = instrumentation.stats()
+    assert stats['measurements']['yule_k']['calls'] == 3
+    assert stats['intermediates']['vocabulary']['calls'] == 3
+    assert stats['intermediates']['spectrum']['calls'] == 3
+    assert stats['parse']['docs'] == 3
+    # The repeated text finds its vocabulary cached
+    assert stats['caches']['vocabulary']['misses'] == 2
+    assert stats['caches']['vocabulary']['hits'] > 0
+    assert stats['elapsed_seconds'] > 0
+
+
+def test_model_load():
+    with instrument() as instrumentation:
+        model = Model(Config.for_requirements([TOKENS]))
+        # Models load on the first parse
+        assert not instrumentation.stats()['model_loads']
+        model.nlp('A text.')
+        model.nlp('Another text.')
+    loads = instrumentation.stats()['model_loads']
+    assert [load['model_id'] for load in loads] == [model.model_id]
+    assert loads[0]['seconds'] > 0
+
+
+def test_profile_and_memory():
+    with instrument(profile=True, trace_memory=True) as instrumentation:
+        yule_k(text)
+    stream = io.StringIO()
+    profile = instrumentation.profile_stats()
+    profile.stream = stream
+    profile.print_stats('yule_k')
+    assert 'yule_k' in stream.getvalue()
+    assert instrumentation.stats()['memory']['peak_bytes'] > 0
+    with pytest.raises(ValueError):
+        Instrumentation().profile_stats()
+
+
+def test_one_at_a_time():
+    with instrument():
+        with pytest.raises(ValueError):
+            instrument()
+    assert state.active is None
+
+
+def test_sinks(tmp_path, caplog):
+    path = tmp_path / 'events.jsonl'
+    with JsonLinesSink(path) as sink, caplog.at_level(logging.INFO, logger='stylometrist'):
+        with instrument(sinks=[sink, LoggingSink()]):
+            word_count(text)
+            average_word_length(text)
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    names = [line['name'] for line in lines if line['event'] == 'measurement']
+    assert names == ['word_count', 'average_word_length']
+    assert [json.loads(r.getMessage()) for r in caplog.records] == lines
@@ -0,0 +1,26 @@
+import pytest
+
+from src.stylometrist.languages import CYRILLIC, LATIN, detect_language, script_of
+
+
+@pytest.mark.parametrize('text, lang', [
+    ('The cat sat on the mat, and it was happy with the day.', 'en'),
+    ('Der Hund und die Katze sind nicht in dem Haus.', 'de'),
+    ('Le chat est dans la maison avec les enfants.', 'fr'),
+    ('El perro y el gato están en la casa de los niños.', 'es'),
+    ('Ἐν ἀρχῇ ἐποίησεν ὁ θεὸς τὸν οὐρανὸν καὶ τὴν γῆν.', 'el'),
+    ('Я не знаю, что он сказал, но она так и не пришла.', 'ru'),
+    ('これは日本語の文です。', 'ja'),
+    ('这是一个中文句子。', 'zh'),
+])
+def test_detect_language(text, lang):
+    assert detect_language(text) == lang
+
+
+def test_detect_language_undecided():
+    assert detect_language('12345 !!!') is None
+    assert detect_language('Xyzzy plugh', default='en') == 'en'
+
+
+def test_script_of():
+    assert [script_of(c) for c in 'aΩж語 1'] == [LATIN, 'el', CYRILLIC, 'zh', None, None]
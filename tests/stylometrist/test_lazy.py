@@ -0,0 +1,86 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from src.stylometrist.lazy import LazyModule, lazy_module, loaded
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def run(code: str) -> dict:
+    """ Runs code in a new interpreter and returns the JSON it prints. """
+    completed = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout)
+
+
+def test_lazy_module():
+    stand_in = lazy_module('json.decoder')
+    assert isinstance(stand_in, LazyModule)
+    assert lazy_module('json.decoder') is stand_in
+    assert stand_in.JSONDecoder is json.decoder.JSONDecoder
+    assert loaded(stand_in)
+    # The namespace was copied, so lookups no longer go through the stand-in
+    assert 'JSONDecoder' in vars(stand_in)
+    with pytest.raises(AttributeError):
+        stand_in.missing
+    assert loaded(json)
+
+
+def test_loaded_elsewhere():
+    imported = run('import json, sys\n'
+                   'from src.stylometrist.lazy import lazy_module, loaded\n'
+                   'stand_in = lazy_module("email.utils")\n'
+                   'before = loaded(stand_in)\n'
+                   'import email.utils\n'
+                   'print(json.dumps([before, loaded(stand_in)]))')
+    assert imported == [False, True]
+
+
+def test_ngrams_of_a_users_doc():
+    # A Doc from the caller's own spaCy import, before stylometrist has touched spaCy
+    counts = run('import json, spacy\n'
+                 'from src.stylometrist.ngrams import character_ngram_counts, word_ngram_counts\n'
+                 'doc = spacy.blank("en")("A Doc of a few words.")\n'
+                 'print(json.dumps([int(character_ngram_counts(doc, 1, 1).sum()), '
+                 'int(word_ngram_counts(doc, 1, 1).sum())]))')
+    assert counts == [len('A Doc of a few words.'), 6]
+
+
+def test_lazy_module_threads():
+    stand_in = lazy_module('json.scanner')
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(stand_in.make_scanner)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 8 and all(r is results[0] for r in results)
+
+
+def test_import_is_cheap():
+    imported = run('import json, sys\n'
+                   'from src.stylometrist.planner import registry\n'
+                   'from src.stylometrist import attribution, columnar, corpus, service, streaming, windows\n'
+                   'names = registry.names()\n'
+                   'print(json.dumps({"names": len(names), "spacy": "spacy" in sys.modules, '
+                   '"numpy": "numpy" in sys.modules}))')
+    assert imported == {'names': imported['names'], 'spacy': False, 'numpy': False}
+    assert imported['names'] > 0
+
+
+def test_model_loads_on_first_parse():
+    loads = run('import json, sys\n'
+                'from src.stylometrist.common import Model\n'
+                'from src.stylometrist.config import Config, TOKENS\n'
+                'from src.stylometrist.ngrams import character_ngrams\n'
+                'model = Model(Config.for_requirements([TOKENS]))\n'
+                'before = [model.loaded, "spacy" in sys.modules]\n'
+                'character_ngrams("Needs no parse")\n'
+                'ngrams = [model.loaded, "spacy" in sys.modules]\n'
+                'model.nlp("A text.")\n'
+                'print(json.dumps([before, ngrams, [model.loaded, "spacy" in sys.modules]]))')
+    assert loads == [[False, False], [False, False], [True, True]]
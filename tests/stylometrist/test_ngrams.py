@@ -0,0 +1,99 @@
+from collections import Counter
+from unicodedata import normalize
+
+import numpy as np
+import pytest
+
+from src.stylometrist.columnar import ColumnStore
+from src.stylometrist.common import Text, get_model, get_vocabulary
+from src.stylometrist.ngrams import NgramCounter, character_ngram_bucket, character_ngram_counts, \
+    character_ngrams, code_points, word_ngram_bucket, word_ngram_counts, word_ngrams
+from src.stylometrist.planner import report
+
+text = 'This is a very, very, very long sentence that is being used to test sentence distributions. Here\'s ' \
+       'another sentence that is also pretty long.  This is short. This too. I. That was a really short sentence.'
+# Decomposed, so that the diacritics are combining characters
+greek = normalize('NFD', 'ἐν ἀρχῇ ἐποίησεν ὁ θεὸσ τὸν οὐρανὸν καὶ τὴν γῆν.')
+
+
+def expected_character_counts(string: str, n_min: int, n_max: int, width: int) -> np.ndarray:
+    counts = np.zeros(width, dtype=np.int64)
+    for n in range(n_min, n_max + 1):
+        for gram, count in Counter(string[i:i + n] for i in range(len(string) - n + 1)).items():
+            counts[character_ngram_bucket(gram, width, exclude_combining=False)] += count
+    return counts
+
+
+@pytest.mark.parametrize('n_min,n_max,width', [(1, 1, 64), (1, 3, 1024), (2, 4, 97), (3, 3, 2 ** 14)])
+def test_character_ngram_counts(n_min, n_max, width):
+    counts = character_ngram_counts(text, n_min, n_max, width)
+    assert (counts == expected_character_counts(text, n_min, n_max, width)).all()
+    assert counts.sum() == sum(len(text) - n + 1 for n in range(n_min, n_max + 1))
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 5, 64])
+def test_character_ngram_chunks(chunk_size):
+    expected = character_ngram_counts(text, 1, 4, 512)
+    assert (character_ngram_counts(text, 1, 4, 512, chunk_size=chunk_size) == expected).all()
+    blocks = [text[i:i + 7] for i in range(0, len(text), 7)]
+    assert (character_ngram_counts(iter(blocks), 1, 4, 512) == expected).all()
+    doc = get_model().nlp(text)
+    assert (character_ngram_counts(doc, 1, 4, 512, chunk_size=chunk_size) == expected).all()
+
+
+def test_character_ngram_combining():
+    stripped = ''.join(chr(c) for c in code_points(greek))
+    assert len(stripped) < len(greek)
+    assert (character_ngram_counts(greek, 1, 3, 256) ==
+            expected_character_counts(stripped, 1, 3, 256)).all()
+    assert (character_ngram_counts(greek, 1, 3, 256, exclude_combining=False) ==
+            expected_character_counts(greek, 1, 3, 256)).all()
+    assert character_ngram_bucket(normalize('NFD', 'ῇ'), 256) == character_ngram_bucket('η', 256)
+    assert (character_ngrams(greek, width=256) == character_ngram_counts(greek, width=256)).all()
+
+
+def test_word_ngrams():
+    words = [w for w, c in get_vocabulary(Text(text)).to_counter().items() for _ in range(c)]
+    counts = word_ngrams(text, n_min=1, n_max=1, width=256)
+    assert counts.sum() == len(words)
+    assert counts[word_ngram_bucket(['very'], 256)] >= 3
+
+    bigrams = word_ngrams(text, n_min=2, n_max=2, width=4096)
+    assert bigrams.sum() == len(words) - 1
+    assert bigrams[word_ngram_bucket(['very', 'very'], 4096)] >= 2
+    assert bigrams[word_ngram_bucket(['This', 'is'], 4096)] >= 2
+    # Words differing in combining characters only are the same word
+    decomposed = normalize('NFD', 'ἀρχῇ')
+    assert (word_ngrams(decomposed, width=64) == word_ngrams('αρχη', width=64)).all()
+    assert not (word_ngrams(decomposed, width=64, exclude_combining=False) == word_ngrams('αρχη', width=64)).all()
+
+
+def test_word_ngram_stream():
+    sentences = [s + '.' for s in text.split('.') if s.strip()]
+    whole = word_ngram_counts(' '.join(sentences), 1, 3, 1024)
+    assert (word_ngram_counts(sentences, 1, 3, 1024) == whole).all()
+    assert (word_ngram_counts(get_model().pipe(sentences), 1, 3, 1024) == whole).all()
+    assert (word_ngram_counts([Text(s) for s in sentences], 1, 3, 1024) == whole).all()
+
+
+def test_ngram_counter():
+    counter = NgramCounter(1, 2, 16)
+    counter.update([1, 2]).update([]).update([3])
+    assert counter.counts.sum() == 3 + 2
+    counter.reset()
+    assert counter.counts.sum() == 0
+    assert NgramCounter(3, 3, 16).update([1, 2]).counts.sum() == 0
+    with pytest.raises(ValueError):
+        NgramCounter(2, 1)
+    with pytest.raises(ValueError):
+        NgramCounter(1, 2, 0)
+
+
+def test_ngrams_in_plan(tmp_path):
+    results = report(text, ['character_ngrams', 'word_ngrams'])
+    assert (results['character_ngrams'] == character_ngrams(text)).all()
+    assert (results['word_ngrams'] == word_ngrams(text)).all()
+    store = ColumnStore.ingest(tmp_path / 'store', [text])
+    assert (word_ngrams(store[0]) == word_ngrams(text)).all()
+    with pytest.raises(ValueError):
+        character_ngrams(store[0])
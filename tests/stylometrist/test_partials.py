@@ -0,0 +1,111 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from src.stylometrist.attribution import UNDEFINED
+from src.stylometrist.common import Vocabulary, parse_texts
+from src.stylometrist.partials import Count, CountVector, Histogram, PartialResults, partial_results
+from src.stylometrist.planner import Plan, registry
+
+TEXTS = ['This is one text. It is short, and it is.',
+         'Another text here! With more words, words, words.',
+         'Ἐν ἀρχῇ ἐποίησεν ὁ θεὸς τὸν οὐρανὸν. Καὶ τὴν γῆν.',
+         'The last one. The THE the.']
+NGRAMS = ('character_ngrams', 'word_ngrams')
+
+
+@pytest.fixture(scope='module')
+def texts():
+    return list(parse_texts(TEXTS, config=Plan().config()))
+
+
+def assert_same(expected, actual):
+    assert expected.keys() == actual.keys()
+    for name, value in expected.items():
+        if isinstance(value, np.ndarray):
+            assert np.array_equal(value, actual[name]), name
+        elif isinstance(value, Exception):
+            assert repr(value) == repr(actual[name]), name
+        else:
+            assert value == actual[name], name
+
+
+def test_single_text(texts):
+    plan = Plan()
+    for text in texts:
+        assert_same(plan.run(text, catch=UNDEFINED), partial_results([text]).finish(catch=UNDEFINED))
+
+
+def test_merged_shards(texts):
+    plan = Plan()
+    whole = plan.run(next(parse_texts([' '.join(TEXTS)], config=plan.config())), catch=UNDEFINED)
+    merged = PartialResults.merge_all([partial_results(texts[:1]), partial_results(texts[1:3]),
+                                       partial_results(texts[3:])]).finish(catch=UNDEFINED)
+    assert merged.keys() == whole.keys()
+    # N-grams would span the joins of the texts, so they are compared with the sum of the texts' counts
+    for name in NGRAMS:
+        assert np.array_equal(merged.pop(name), sum(plan.run(text, catch=UNDEFINED)[name] for text in texts))
+        del whole[name]
+    assert_same(whole, merged)
+
+
+def test_state(texts, tmp_path):
+    params = {'word_length_distribution': {'max_length': 5}, 'word_ngrams': {'width': 64}}
+    results = partial_results(texts, ['word_frequencies', 'word_length_distribution', 'word_ngrams', 'yule_k'],
+                              params)
+    path = str(tmp_path / 'partials.json.gz')
+    results.save(path)
+    loaded = PartialResults.load(path)
+    assert loaded.documents == 4
+    assert_same(results.finish(), loaded.finish())
+    # Statistics read back merge with ones computed here
+    assert_same(results.merge(results).finish(), loaded.merge(results).finish())
+
+
+def test_shared_statistics():
+    results = PartialResults(['word_count', 'honore_r', 'word_frequencies', 'average_word_length'])
+    assert results._unique_keys() == [('word_count',), ('vocabulary',), ('token_lengths',)]
+    params = {'sentence_length_in_characters_distribution': {'exclude_combining': False}}
+    results = PartialResults(['average_sentence_length_in_characters', 'sentence_length_in_characters_distribution'],
+                             params)
+    assert results._unique_keys() == [('sentence_lengths', True), ('sentence_lengths', False)]
+
+
+def test_no_texts():
+    results = PartialResults().finish(catch=UNDEFINED)
+    assert results['word_count'] == 0
+    assert results['word_length_distribution'] == []
+    assert np.isnan(results['average_sentence_length_in_characters'])
+    assert isinstance(results['average_sentence_length_in_words'], ZeroDivisionError)
+    assert results['character_ngrams'].shape == (registry['character_ngrams']['params']['width'],)
+
+
+def test_merge_other_measurements(texts):
+    with pytest.raises(ValueError, match='different measurements'):
+        partial_results(texts, ['word_count']).merge(partial_results(texts, ['yule_k']))
+    with pytest.raises(ValueError, match='different measurements or params'):
+        partial_results(texts, ['word_ngrams']).merge(partial_results(texts, ['word_ngrams'],
+                                                                      {'word_ngrams': {'n_max': 3}}))
+
+
+def test_statistics():
+    histogram = Histogram.merge_all([Histogram.from_values(np.array([3, 1, 3])),
+                                     Histogram.from_values(np.array([2]))])
+    assert list(histogram.counts.items()) == [(3, 2), (1, 1), (2, 1)]
+    assert histogram.sum() == 9 and histogram.total == 4
+    assert histogram.distribution(min_value=2) == [(3, 2 / 3), (2, 1 / 3)]
+    assert histogram.range_distribution(2) == [(3, 4, 0.75), (1, 2, 0.25)]
+    assert Histogram.from_state(histogram.to_state()) == histogram
+    assert Count.merge_all([Count(2), Count(3)]) == Count(5)
+    vector = CountVector.merge_all([CountVector([0, 1, 0]), CountVector([2, 0, 0])])
+    assert vector == CountVector([2, 1, 0]) == CountVector.from_state(vector.to_state())
+
+
+def test_merge_vocabularies():
+    first = Vocabulary.from_counter(Counter({'b': 2, 'a': 1}))
+    second = Vocabulary.from_counter(Counter({'c': 1, 'a': 4}))
+    merged = Vocabulary.merge_all([first, second])
+    assert list(merged.to_counter().items()) == [('b', 2), ('a', 5), ('c', 1)]
+    assert Vocabulary.merge_all([first, first]).strings is first.strings
+    assert len(Vocabulary.merge_all([])) == 0
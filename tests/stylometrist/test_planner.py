@@ -0,0 +1,109 @@
+from concurrent.futures import ThreadPoolExecutor
+import math
+
+import pytest
+
+from src.stylometrist import sentence_length, vocabulary_richness, word_length
+from src.stylometrist.common import ModelRouter, Registry, Text, registry
+from src.stylometrist.config import TOKENS, SENTENCES, TOKEN_STREAM, VOCABULARY, SPECTRUM, SENTENCE_LENGTHS
+from src.stylometrist.planner import Plan, report
+
+text = 'This is a very, very, very long sentence that is being used to test sentence distributions. Here\'s ' \
+       'another sentence that is also pretty long.  This is short. This too. I. That was a really short sentence.'
+
+
+def test_registry_metadata():
+    entry = registry['word_length_distribution']
+    assert entry['function'].__name__ == 'word_length_distribution'
+    assert entry['requires'] == {TOKENS}
+    assert entry['uses'] == {TOKEN_STREAM}
+    assert entry['params'] == {'min_length': 1, 'max_length': 100}
+    assert registry['yule_k']['uses'] == {SPECTRUM}
+    assert registry['get_entropy']['params'] == {'base': math.e}
+    assert registry['average_sentence_length_in_words']['requires'] == {SENTENCES}
+    assert registry['average_sentence_length_in_words']['uses'] == {SENTENCE_LENGTHS}
+    assert 'yule_k' in registry and 'no_such_measurement' not in registry
+
+
+def test_registry_threads():
+    local = Registry()
+
+    def register(i):
+        def f(text, a=i):
+            return a
+        f.__name__ = f'measurement_{i}'
+        local.register(f, [TOKENS], [TOKEN_STREAM])
+
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(register, range(200)))
+    assert len(local) == 200
+    assert local['measurement_7']['params'] == {'a': 7}
+
+
+def test_plan_order():
+    plan = Plan(['yule_k', 'average_sentence_length_in_words', 'word_count'])
+    assert plan.requirements == {TOKENS, SENTENCES}
+    assert plan.intermediates.index(TOKEN_STREAM) < plan.intermediates.index(VOCABULARY) < \
+           plan.intermediates.index(SPECTRUM)
+    assert set(plan.intermediates) == {TOKEN_STREAM, VOCABULARY, SPECTRUM, SENTENCE_LENGTHS}
+    assert Plan(['average_word_length']).intermediates == [TOKEN_STREAM]
+    assert set(Plan().functions) == set(registry.names())
+
+
+def test_plan_run():
+    plan = Plan(['word_count', 'yule_k', 'honore_r', 'sentence_length_in_words_distribution'],
+                params={'honore_r': {'base': 2}, 'sentence_length_in_words_distribution': {'max_length': 10}})
+    results = plan.run(Text(text))
+    parsed = Text(text)
+    assert results == {'word_count': word_length.word_count(parsed),
+                       'yule_k': vocabulary_richness.yule_k(parsed),
+                       'honore_r': vocabulary_richness.honore_r(parsed, base=2),
+                       'sentence_length_in_words_distribution':
+                           sentence_length.sentence_length_in_words_distribution(parsed, max_length=10)}
+    assert list(plan.run_many([text, text])) == [results, results]
+
+
+def test_plan_shares_intermediates(monkeypatch):
+    calls = []
+    from_vocabulary = vocabulary_richness.Spectrum.from_vocabulary.__func__
+
+    def counting(cls, vocab):
+        calls.append(vocab)
+        return from_vocabulary(cls, vocab)
+
+    monkeypatch.setattr(vocabulary_richness.Spectrum, 'from_vocabulary', classmethod(counting))
+    results = report(text, vocabulary_richness.RICHNESS_MEASURES)
+    assert len(results) == len(vocabulary_richness.RICHNESS_MEASURES)
+    assert len(calls) == 1
+
+
+def test_plan_errors():
+    with pytest.raises(ValueError):
+        Plan(['no_such_measurement'])
+    with pytest.raises(ValueError):
+        Plan(['yule_k'], params={'honore_r': {'base': 2}})
+    with pytest.raises(ValueError):
+        Plan(['honore_r'], params={'honore_r': {'bass': 2}})
+
+
+def test_report_everything():
+    results = report(text)
+    assert list(results) == registry.names()
+    assert results['word_count'] == word_length.word_count(Text(text))
+
+
+def test_plan_run_catch():
+    plan = Plan(['word_count', 'average_sentence_length_in_words'])
+    with pytest.raises(ZeroDivisionError):
+        plan.run(Text(''))
+    results = plan.run(Text(''), catch=(ZeroDivisionError,))
+    assert results['word_count'] == 0
+    assert isinstance(results['average_sentence_length_in_words'], ZeroDivisionError)
+
+
+def test_plan_run_many_languages():
+    plan = Plan(['word_count', 'average_sentence_length_in_words'])
+    router = ModelRouter(plan.config(), models={'el': 'el_core_news_sm'})
+    results = list(plan.run_many(['One text. Two.', 'Ἐν ἀρχῇ ἦν ὁ λόγος.'], model=router))
+    assert [r['word_count'] for r in results] == [3, 5]
+    assert router.loaded() == ['en', 'el']
@@ -1,5 +1,8 @@
 import pytest
 
+from src.stylometrist.common import registry
+from src.stylometrist.config import SENTENCES
+
 from src.stylometrist.sentence_length import average_sentence_length_in_words, sentence_length_in_words_distribution, \
     average_sentence_length_in_characters, \
     sentence_length_in_characters_distribution
@@ -54,3 +57,8 @@ def test_sentence_length_in_characters_distribution(min_, max_, interval, exclud
                                                       interval=interval,
                                                       exclude_combining=exclude_combining)
     assert dist == result
+
+
+def test_sentence_measurements_require_sentences():
+    assert SENTENCES in registry['average_sentence_length_in_words']['requires']
+    assert SENTENCES in registry['sentence_length_in_characters_distribution']['requires']
@@ -0,0 +1,96 @@
+import asyncio
+import time
+
+import pytest
+
+from src.stylometrist.common import Model
+from src.stylometrist.config import Config, TOKENS
+from src.stylometrist.corpus import analyze_many
+from src.stylometrist.service import AsyncAnalyzer
+
+texts = ['This is the first sentence. This is another sentence.',
+         'a a bbb bbb bbb θεὸσ 999.99 eee888 _99999_',
+         'The The hello The hello 123 321 $.$.'] * 10
+measurements = ['word_count', 'average_word_length', 'yule_k']
+
+
+def test_async_analyzer_results():
+    async def run():
+        async with AsyncAnalyzer() as analyzer:
+            single = await analyzer.analyze(texts[0], measurements)
+            many = await analyzer.analyze_many(texts, measurements)
+            sentences = await analyzer.analyze(texts[0], ['average_sentence_length_in_words'])
+        return single, many, sentences
+
+    single, many, sentences = asyncio.run(run())
+    expected = list(analyze_many(texts, measurements))
+    assert single == expected[0]
+    assert many == expected
+    assert sentences == {'average_sentence_length_in_words': 4.5}
+
+
+def test_async_analyzer_batches():
+    async def run():
+        async with AsyncAnalyzer(batch_size=8, max_delay=0.05) as analyzer:
+            await analyzer.analyze_many(texts, measurements)
+        return analyzer
+
+    analyzer = asyncio.run(run())
+    assert analyzer.requests == len(texts)
+    assert analyzer.batches <= len(texts) // 8 + 1
+
+
+def test_async_analyzer_backpressure():
+    async def run():
+        analyzer = AsyncAnalyzer(model=Model(Config.for_requirements([TOKENS])), batch_size=2, max_queue=3)
+        depths = []
+
+        async def request(text):
+            depths.append(analyzer.queued)
+            return await analyzer.analyze(text, ['word_count'])
+
+        results = await asyncio.gather(*(request(t) for t in texts))
+        await analyzer.close()
+        return depths, results
+
+    depths, results = asyncio.run(run())
+    assert max(depths) == 3
+    assert [r['word_count'] for r in results] == [r['word_count'] for r in analyze_many(texts, ['word_count'])]
+
+
+def test_async_analyzer_errors():
+    async def run():
+        async with AsyncAnalyzer() as analyzer:
+            with pytest.raises(ValueError):
+                await analyzer.analyze(texts[0], ['no_such_measurement'])
+            failing, ok = await asyncio.gather(analyzer.analyze('', ['average_sentence_length_in_words']),
+                                               analyzer.analyze(texts[0], ['word_count']),
+                                               return_exceptions=True)
+        return failing, ok
+
+    failing, ok = asyncio.run(run())
+    assert isinstance(failing, ZeroDivisionError)
+    assert ok == {'word_count': 9}
+
+
+def test_async_analyzer_workers_take_turns():
+    model = Model(Config.for_requirements([TOKENS]))
+    pipe, active, overlaps = model.pipe, [], []
+
+    def one_at_a_time(*args, **kw):
+        active.append(None)
+        overlaps.append(len(active))
+        time.sleep(0.01)
+        docs = list(pipe(*args, **kw))
+        active.pop()
+        return docs
+
+    model.pipe = one_at_a_time
+
+    async def run():
+        async with AsyncAnalyzer(model=model, batch_size=4, max_delay=0, workers=4) as analyzer:
+            return await analyzer.analyze_many(texts, ['word_count'])
+
+    results = asyncio.run(run())
+    assert max(overlaps) == 1
+    assert results == list(analyze_many(texts, ['word_count']))
@@ -0,0 +1,84 @@
+import json
+import os
+
+import pytest
+
+from src.stylometrist.shards import main, map_files, map_shard, reduce, run, shard_files, split
+
+MEASUREMENTS = ['word_count', 'honore_r', 'word_length_distribution', 'sentence_length_in_words_distribution']
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    root = tmp_path / 'corpus'
+    root.mkdir()
+    (root / 'a.txt').write_text('This is one text. It is short, and it is.', encoding='utf-8')
+    (root / 'b.txt').write_text('Another text here! With more words, words, words.', encoding='utf-8')
+    (root / 'c.jsonl').write_text('{"text": "The last one. The THE the."}\n'
+                                  '{"text": "Ἐν ἀρχῇ ἐποίησεν ὁ θεὸς."}\n', encoding='utf-8')
+    return root
+
+
+def test_split():
+    assert split(list(range(5)), 3) == [[0, 1], [2, 3], [4]]
+    assert split([1], 3) == [[1], [], []]
+    with pytest.raises(ValueError):
+        split([1], 0)
+
+
+def test_shard_files(corpus):
+    assert shard_files([str(corpus)], 1, 2) == [str(corpus / 'c.jsonl')]
+    with pytest.raises(ValueError, match='No shard 2 of 2'):
+        shard_files([str(corpus)], 2, 2)
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_run(corpus, tmp_path, processes):
+    whole = map_files(shard_files([str(corpus)], 0, 1), MEASUREMENTS)
+    expected = whole.finish()
+    assert run([str(corpus)], 3, processes, measurements=MEASUREMENTS).finish() == expected
+    directory = str(tmp_path / 'shards')
+    results = run([str(corpus)], 3, processes, directory, measurements=MEASUREMENTS)
+    assert results.finish() == expected and results.documents == whole.documents == 4
+    assert len(os.listdir(directory)) == 3
+
+
+def test_map_reduce(corpus, tmp_path, capsys):
+    directory = str(tmp_path / 'shards')
+    for shard in range(3):
+        main(['map', str(corpus), '--shard', str(shard), '--shards', '3', '-d', directory, '-m',
+              ','.join(MEASUREMENTS)])
+    main(['reduce', directory])
+    printed = json.loads(capsys.readouterr().out.splitlines()[-1])
+    assert printed['documents'] == 4 and printed['word_count'] == 29
+    assert printed['word_count'] == reduce(directory).finish()['word_count']
+
+    os.remove(os.path.join(directory, 'shard-00001-of-00003.json.gz'))
+    with pytest.raises(ValueError, match='Missing shards of 3 .*: 1'):
+        reduce(directory)
+    map_shard([str(corpus)], 1, 2, directory, measurements=MEASUREMENTS)
+    with pytest.raises(ValueError, match='different runs'):
+        reduce(directory)
+
+
+def test_reduce_other_measurements(corpus, tmp_path, capsys):
+    directory = str(tmp_path / 'shards')
+    map_shard([str(corpus)], 0, 2, directory, measurements=['word_count'])
+    map_shard([str(corpus)], 1, 2, directory, measurements=['yule_k'])
+    with pytest.raises(SystemExit):
+        main(['reduce', directory])
+    assert 'different measurements' in capsys.readouterr().err
+
+
+def test_run_default_measurements(corpus, capsys):
+    # A few thousand distinct words make get_W of the corpus an integer of thousands of digits
+    words = [f'x{chr(97 + i % 26)}{chr(97 + i // 26 % 26)}{chr(97 + i // 676)}' for i in range(3000)]
+    (corpus / 'long.txt').write_text(' '.join(words * 2) + '.', encoding='utf-8')
+    main(['run', str(corpus), '-p', '1'])
+    printed = json.loads(capsys.readouterr().out)
+    assert printed['documents'] == 5 and printed['word_count'] == 6029
+    assert printed['get_W'] is None and 'OverflowError' in printed['errors']['get_W']
+    # The n-gram vectors are left out unless asked for, as in the stylometrist command
+    assert 'character_ngrams' not in printed and 'word_ngrams' not in printed
+    main(['run', str(corpus), '-p', '1', '-m', 'character_ngrams'])
+    assert len(json.loads(capsys.readouterr().out)['character_ngrams']) == 2 ** 14
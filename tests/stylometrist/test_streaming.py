@@ -0,0 +1,56 @@
+import pytest
+
+from src.stylometrist.common import Model, Text, get_vocabulary_items
+from src.stylometrist.config import Config
+from src.stylometrist.streaming import VocabularyAccumulator
+from src.stylometrist.vocabulary_richness import type_token_ratio, yule_k, honore_r, sichel_s, get_entropy
+
+text = 'This is a very, very, very long sentence that is being used to test sentence distributions. Here\'s ' \
+       'another sentence that is also pretty long.  This is short. This too. I. That was a really short sentence.\n' \
+       'Here is one more sentence. ἐν ἀρχῇ ἐποίησεν.  בְּרֵאשִׁית, בָּרָא אֱלֹהִים, אֵת הַשָּׁמַיִם -99.99 +12.34 '
+
+
+def chunks(string, size):
+    return [string[i:i + size] for i in range(0, len(string), size)]
+
+
+@pytest.mark.parametrize('chunk_size, piece_size', [(1, 100_000), (7, 100_000), (50, 20), (1000, 100_000)])
+def test_accumulator_matches_text(chunk_size, piece_size):
+    accumulator = VocabularyAccumulator(piece_size=piece_size).add_all(chunks(text, chunk_size)).flush()
+    vocab, _, _, _ = get_vocabulary_items(Text(text))
+    assert accumulator.vocab == vocab
+    spectrum = accumulator.spectrum()
+    assert spectrum.type_token_ratio() == type_token_ratio(text)
+    assert spectrum.yule_k() == yule_k(text)
+    assert spectrum.honore_r() == honore_r(text)
+    assert spectrum.sichel_s() == sichel_s(text)
+    assert spectrum.get_entropy() == pytest.approx(get_entropy(text))
+
+
+def test_accumulator_spectrum_before_flush():
+    accumulator = VocabularyAccumulator().add('The The hello The hel')
+    assert accumulator.spectrum().n == 5
+    accumulator.add('lo')
+    assert accumulator.flush().vocab['hello'] == 2
+
+
+def test_accumulator_merge():
+    middle = text.index(' ', len(text) // 2) + 1
+    first = VocabularyAccumulator().add(text[:middle])
+    second = VocabularyAccumulator().add(text[middle:])
+    first += second
+    assert first.vocab == VocabularyAccumulator().add(text).flush().vocab
+    assert first.word_count == first.spectrum().n
+
+
+def test_accumulator_merge_different_tokenizers():
+    with pytest.raises(ValueError):
+        VocabularyAccumulator().merge(VocabularyAccumulator(model=Model(Config('el_core_news_sm'))))
+
+
+def test_accumulator_file(tmp_path):
+    path = tmp_path / 'text.txt'
+    path.write_text(text * 10, encoding='utf-8')
+    accumulator = VocabularyAccumulator(piece_size=64).add_file(path, chunk_size=100)
+    vocab, _, _, _ = get_vocabulary_items(Text(text * 10))
+    assert accumulator.vocab == vocab
@@ -0,0 +1,144 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from src.stylometrist import sentence_length, word_length
+from src.stylometrist.common import Model, Text, Summary, isword, word_length as common_word_length, \
+    get_vocabulary_items, get_word_count, sentence_length_in_characters, sentence_length_in_words, distribution, \
+    range_distribution
+from src.stylometrist.config import Config, TOKENS
+
+texts = ['This is the first sentence. This is another sentence. ἐν ἀρχῇ ἐποίησεν.',
+         'a a bbb bbb bbb θεὸσ 999.99 eee888 _99999_',
+         'The The hello The hello 123 321 $.$.',
+         'This is a very, very, very long sentence that is being used to test sentence distributions. Here\'s '
+         'another sentence that is also pretty long.  This is short. This too. I. That was a really short sentence. '
+         'Here is one more sentence. ἐν ἀρχῇ ἐποίησεν.  בְּרֵאשִׁית, בָּרָא אֱלֹהִים, אֵת הַשָּׁמַיִם',
+         '¿Es el comienzo? ¡Al principio! -99.99 +12.34 12/34 abc_123 abc1\n\nA new paragraph...!?']
+
+
+# Reference implementations: each walks the tokens of the Doc on its own, as the measurements used to
+
+def reference_word_count(doc):
+    return len([t for t in doc if isword(t.text)])
+
+
+def reference_average_word_length(doc):
+    total_len = words = 0
+    for token in doc:
+        total_len += common_word_length(token.text)
+        if isword(token.text):
+            words += 1
+    if words == 0:
+        return 0
+    return total_len / words
+
+
+def reference_word_length_distribution(doc, min_length=1, max_length=100):
+    dist = Counter()
+    for token in doc:
+        wlen = common_word_length(token.text)
+        if min_length <= wlen < max_length:
+            dist[wlen] += 1
+    return distribution(dist)
+
+
+def reference_average_sentence_length_in_words(doc):
+    sent_cnt = word_cnt = 0
+    for sent in doc.sents:
+        sent_cnt += 1
+        word_cnt += sentence_length_in_words(sent)
+    return word_cnt / sent_cnt
+
+
+def reference_sentence_length_in_words_distribution(doc, min_length=1, max_length=100):
+    dist = Counter()
+    for sent in doc.sents:
+        slen = sentence_length_in_words(sent)
+        if min_length <= slen < max_length:
+            dist[slen] += 1
+    return distribution(dist)
+
+
+def reference_average_sentence_length_in_characters(doc, exclude_combining=True):
+    return np.mean([sentence_length_in_characters(sent.text, exclude_combining) for sent in doc.sents])
+
+
+def reference_sentence_length_in_characters_distribution(doc, min_length=1, max_length=100_000, interval=1,
+                                                         exclude_combining=True):
+    dist = Counter()
+    for sent in doc.sents:
+        slen = sentence_length_in_characters(sent.text, exclude_combining)
+        if min_length <= slen < max_length:
+            dist[(slen // interval * interval + 1, (slen // interval + 1) * interval)] += 1
+    return range_distribution(dist)
+
+
+def reference_vocabulary_items(doc):
+    vocab = Counter([t.text for t in doc if isword(t.text)])
+    vocab_i = Counter()
+    for k, v in vocab.items():
+        vocab_i[v] += 1
+    vocab_len = len(vocab)
+    prob_i = {k: v / vocab_len for k, v in vocab_i.items()}
+    return vocab, vocab_i, prob_i, vocab_len
+
+
+@pytest.mark.parametrize('string', texts)
+def test_word_parity(string):
+    text = Text(string)
+    doc = text.nlp()
+    assert word_length.word_count(text) == get_word_count(text) == reference_word_count(doc)
+    assert word_length.average_word_length(text) == reference_average_word_length(doc)
+    assert word_length.word_length_distribution(text) == reference_word_length_distribution(doc)
+    assert word_length.word_length_distribution(text, min_length=3, max_length=5) == \
+           reference_word_length_distribution(doc, min_length=3, max_length=5)
+
+
+@pytest.mark.parametrize('string', texts)
+def test_sentence_parity(string):
+    text = Text(string)
+    doc = text.nlp()
+    assert sentence_length.average_sentence_length_in_words(text) == \
+           reference_average_sentence_length_in_words(doc)
+    assert sentence_length.sentence_length_in_words_distribution(text) == \
+           reference_sentence_length_in_words_distribution(doc)
+    assert sentence_length.sentence_length_in_words_distribution(text, min_length=2, max_length=6) == \
+           reference_sentence_length_in_words_distribution(doc, min_length=2, max_length=6)
+    for exclude_combining in (True, False):
+        assert sentence_length.average_sentence_length_in_characters(text, exclude_combining) == \
+               reference_average_sentence_length_in_characters(doc, exclude_combining)
+        for interval in (1, 2, 5, 10):
+            assert sentence_length.sentence_length_in_characters_distribution(
+                text, interval=interval, exclude_combining=exclude_combining) == \
+                   reference_sentence_length_in_characters_distribution(
+                       doc, interval=interval, exclude_combining=exclude_combining)
+
+
+@pytest.mark.parametrize('string', texts)
+def test_vocabulary_parity(string):
+    text = Text(string)
+    assert get_vocabulary_items(text) == reference_vocabulary_items(text.nlp())
+
+
+def test_summary_single_pass():
+    text = Text(texts[0])
+    summary = text.summary()
+    assert text.summary() is summary
+    assert len(summary.token_lengths) == len(summary.word_flags) == len(text.nlp())
+    assert summary.sentence_word_counts.tolist() == [5, 4, 3]
+    assert summary.sentence_offsets.tolist() == [0, 6, 11, len(text.nlp())]
+    assert summary.token_lengths.dtype == np.int32
+    assert summary.word_flags.dtype == bool
+    text.text = texts[1]
+    assert text.summary() is not summary
+
+
+def test_summary_without_sentences():
+    model = Model(Config.for_requirements([TOKENS]))
+    summary = Summary.from_doc(model.nlp(texts[0]))
+    assert not summary.has_sentences
+    assert summary.word_count == 12
+    with pytest.raises(ValueError):
+        summary.sentence_lengths()
@@ -0,0 +1,60 @@
+import pytest
+import spacy
+
+from src.stylometrist import vocabulary_richness, word_length
+from src.stylometrist.common import Model, Text, isword
+from src.stylometrist.config import Config, TOKENS, BLANK_TOKENIZER, REGEX_TOKENIZER
+from src.stylometrist.tokenizers import RegexTokenizer
+
+texts = ['This is the first sentence. This is another sentence. ἐν ἀρχῇ ἐποίησεν.',
+         'a a bbb bbb bbb θεὸσ 999.99 eee888 _99999_',
+         'The The hello The hello 123 321 $.$.',
+         'This is a very, very, very long sentence that is being used to test sentence distributions. Here\'s '
+         'another sentence that is also pretty long.  This is short. This too. I. That was a really short sentence. '
+         'Here is one more sentence. ἐν ἀρχῇ ἐποίησεν.  בְּרֵאשִׁית, בָּרָא אֱלֹהִים, אֵת הַשָּׁמַיִם',
+         '¿Es el comienzo? ¡Al principio! -99.99 +12.34 12/34 abc_123 abc1\n\nA new paragraph...!?',
+         'We can\'t say (for sure) whether well-known e-mail addresses like someone@example.com, or $99.99 and '
+         '-12.5% count, e.g. in the U.S.A. --- Dr. Smith cannot tell.',
+         'i dont know why u cant do it, im tired and ive seen worse lol. Its fine, whats up? Thats it. Dont (wont).']
+
+
+@pytest.mark.parametrize('string', texts)
+def test_regex_tokenizer_agrees_on_words(string):
+    nlp = spacy.blank('en')
+    doc = RegexTokenizer(nlp.vocab)(string)
+    assert doc.text == string
+    assert [t.text for t in doc if isword(t.text)] == [t.text for t in nlp(string) if isword(t.text)]
+
+
+def test_regex_tokenizer_splits():
+    tokenizer = RegexTokenizer(spacy.blank('en').vocab)
+    assert tokenizer.split('(hello),') == ['(', 'hello', ')', ',']
+    assert tokenizer.split("Here's") == ['Here', "'s"]
+    assert tokenizer.split("don't") == ['do', "n't"]
+    assert tokenizer.split('dont') == ['do', 'nt'] and tokenizer.split('im,') == ['i', 'm', ',']
+    assert tokenizer.split('mother-in-law') == ['mother', '-', 'in', '-', 'law']
+    assert tokenizer.split('-99.99') == ['-99.99']
+    assert tokenizer.split('someone@example.com') == ['someone@example.com']
+    assert tokenizer.split('ἐποίησεν.') == ['ἐποίησεν', '.']
+
+
+@pytest.mark.parametrize('tokenizer', [BLANK_TOKENIZER, REGEX_TOKENIZER])
+@pytest.mark.parametrize('string', texts)
+def test_fast_tokenizer_measurements(tokenizer, string):
+    fast = Text(string, model=Model(Config.for_requirements([TOKENS], tokenizer=tokenizer)))
+    full = Text(string)
+    assert word_length.word_count(fast) == word_length.word_count(full)
+    assert word_length.average_word_length(fast) == word_length.average_word_length(full)
+    assert word_length.word_length_distribution(fast) == word_length.word_length_distribution(full)
+    assert vocabulary_richness.Spectrum.from_text(fast).prob_i == vocabulary_richness.Spectrum.from_text(full).prob_i
+    assert vocabulary_richness.yule_k(fast) == vocabulary_richness.yule_k(full)
+    assert vocabulary_richness.get_entropy(fast) == vocabulary_richness.get_entropy(full)
+
+
+def test_fast_tokenizer_model():
+    model = Model(Config(tokenizer=REGEX_TOKENIZER))
+    assert model._nlp.pipe_names == []
+    assert model.model_id.endswith('|regex')
+    assert isinstance(model._nlp.tokenizer, RegexTokenizer)
+    sentences = Model(Config.for_requirements(['sentences'], tokenizer=REGEX_TOKENIZER, rule_based_sentences=True))
+    assert len(list(sentences.nlp(texts[0]).sents)) == 3
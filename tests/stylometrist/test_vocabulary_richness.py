@@ -0,0 +1,40 @@
+from collections import Counter
+
+import pytest
+
+from src.stylometrist.common import vocabulary_cache
+from src.stylometrist.vocabulary_richness import Spectrum, richness_report, type_token_ratio, yule_k, sichel_s, \
+    get_entropy
+
+text = 'The The hello The hello 123 321 $.$. And then the world said hello to the other world.'
+
+
+def test_richness_report():
+    vocabulary_cache.clear()
+    report = richness_report(text)
+    assert vocabulary_cache.stats()['misses'] == 1
+    assert report['type_token_ratio'] == type_token_ratio(text)
+    assert report['yule_k'] == yule_k(text)
+    assert report['sichel_s'] == sichel_s(text)
+    assert report['get_entropy'] == get_entropy(text)
+    assert 'get_W' not in report
+
+
+def test_richness_report_measures():
+    assert list(richness_report(text, measures=[yule_k])) == ['yule_k']
+
+
+def test_type_token_ratio():
+    assert type_token_ratio('The The hello The hello 123 321 $.$.') == pytest.approx(4 / 7)
+
+
+def test_spectrum():
+    vocab = Counter({'a': 5, 'b': 2, 'c': 2, 'd': 1, 'e': 1, 'f': 1})
+    spectrum = Spectrum.from_vocabulary(vocab)
+    assert spectrum.vocab_i.tolist() == [0, 3, 2, 0, 0, 1]
+    assert Spectrum(Counter({1: 3, 2: 2, 5: 1})).vocab_i.tolist() == spectrum.vocab_i.tolist()
+    assert spectrum.n == 12
+    assert spectrum.v == 6
+    assert spectrum.prob_i == {1: 0.5, 2: 2 / 6, 5: 1 / 6}
+    assert spectrum.count(2) == 2 and spectrum.count(9) == 0
+    assert spectrum.yule_k() == 10_000 * (3 + 2 * 4 + 25 - 12) / 144
@@ -0,0 +1,48 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from src.stylometrist.common import Text
+from src.stylometrist.vocabulary_richness import Spectrum, type_token_ratio
+from src.stylometrist.windows import richness_profile
+
+text = 'This is a very, very, very long sentence that is being used to test sentence distributions. Here\'s ' \
+       'another sentence that is also pretty long.  This is short. This too. I. That was a really short sentence. ' \
+       'Here is one more sentence. ἐν ἀρχῇ ἐποίησεν.  בְּרֵאשִׁית, בָּרָא אֱלֹהִים, אֵת הַשָּׁמַיִם'
+
+
+@pytest.mark.parametrize('window, stride', [(10, 1), (10, 3), (7, 5), (20, 20), (1000, 250)])
+def test_richness_profile(window, stride):
+    t = Text(text)
+    words = t.summary().word_ids.tolist()
+    profile = richness_profile(t, window=window, stride=stride)
+    window = min(window, len(words))
+    starts = list(range(0, len(words) - window + 1, stride))
+    assert profile.starts.tolist() == starts
+    assert len(profile) == len(starts)
+    for i, start in enumerate(starts):
+        spectrum = Spectrum.from_vocabulary(Counter(words[start:start + window]))
+        assert profile.type_token_ratio[i] == spectrum.type_token_ratio()
+        assert profile.yule_k[i] == spectrum.yule_k()
+        if spectrum.count(1) == spectrum.v:
+            assert profile.honore_r[i] == np.inf
+        else:
+            assert profile.honore_r[i] == spectrum.honore_r()
+
+    ttrs = [Spectrum.from_vocabulary(Counter(words[s:s + window])).type_token_ratio()
+            for s in range(len(words) - window + 1)]
+    assert profile.mattr == pytest.approx(np.mean(ttrs))
+
+
+def test_richness_profile_short_text():
+    profile = richness_profile('The The hello The hello 123 321', window=100)
+    assert len(profile) == 1
+    assert profile.mattr == profile.type_token_ratio[0] == type_token_ratio('The The hello The hello 123 321')
+
+
+def test_richness_profile_invalid():
+    with pytest.raises(ValueError):
+        richness_profile(text, window=0)
+    with pytest.raises(ValueError):
+        richness_profile('$.$.')
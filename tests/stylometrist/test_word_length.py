@@ -1,7 +1,7 @@
 import pytest
 
 import src.stylometrist
-from src.stylometrist.common import registry
+from src.stylometrist.common import registry, Text
 from src.stylometrist.word_length import average_word_length, word_length_distribution
 
 
@@ -22,4 +22,8 @@ def test_word_length_distribution():
                                   'בְּרֵאשִׁית, בָּרָא אֱלֹהִים, אֵת הַשָּׁמַיִם'])
 def test_word_count(text):
     assert src.stylometrist.word_length.word_count(text) == 5
-    assert registry['word_count']
\ No newline at end of file
+    assert registry['word_count']
+
+
+def test_word_count_text_positional():
+    assert src.stylometrist.word_length.word_count(Text('This is a parsing test')) == 5